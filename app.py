@@ -14,9 +14,10 @@ sys.path.insert(0, os.path.join(BASE_DIR, 'core'))
 # ---------------------------------------------------------
 # 2. 모듈 불러오기
 # ---------------------------------------------------------
-from config import kiwoom_login, load_secrets, save_token
+from config import kiwoom_login, load_secrets, save_token, get_token_provider
 from core import account_manager as am
 from core.strategy import StrategyManager
+from core.tracing import load_trace, DEFAULT_DUMP_PATH, STAGES
 
 try:
     from core.backtester import Backtester
@@ -88,7 +89,7 @@ def main():
     # =========================================================
     # 메인 화면: 탭 구성
     # =========================================================
-    tab1, tab2, tab3, tab4 = st.tabs(["💰 계좌/자산", "⚙️ AI 전략", "⚡ 간편 주문", "🧪 백테스팅"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["💰 계좌/자산", "⚙️ AI 전략", "⚡ 간편 주문", "🧪 백테스팅", "⏱️ 지연 추적"])
 
     # -----------------------------------------------------
     # TAB 1: 계좌 조회
@@ -102,13 +103,16 @@ def main():
                 acc = st.session_state['my_account']
                 try:
                     current_mode = '1' if st.session_state.get('is_real') else '2'
-                    manager = am.AccountManager(token=token, account_num=acc, mode=current_mode)
-                    deposit = manager.get_deposit()  # 예수금 조회
-                    stocks = manager.get_balance()   # 잔고 조회
-                    #deposit = am.fn_kt00001(token, url, acc)
-                    #stocks = am.fn_kt00018(token, url, acc)
-                    st.session_state['deposit'] = deposit
-                    st.session_state['stocks'] = stocks
+                    # 같은 토큰/계좌면 관리자(연결 풀)를 재사용 -> 재조회 시 TLS 핸드셰이크 생략
+                    # 토큰은 모드별 TokenProvider가 만료 전에 갱신하므로 재로그인 없이 계속 조회 가능
+                    manager = st.session_state.get('account_mgr')
+                    if manager is None or manager.token != token or manager.account_num != acc:
+                        manager = am.AccountManager(token=token, account_num=acc, mode=current_mode, base_url=url,
+                                                    token_provider=get_token_provider(current_mode))
+                        st.session_state['account_mgr'] = manager
+                    snap = manager.snapshot()  # 예수금 + 잔고 동시 조회
+                    st.session_state['deposit'] = snap.deposit.to_frame() if snap.deposit else None
+                    st.session_state['stocks'] = snap.balance.to_frame() if snap.balance else None
                 except Exception as e:
                     st.error(f"조회 실패: {e}")
             
@@ -202,6 +206,11 @@ def main():
                 target_code = st.text_input("종목코드", "005930")
             else:
                 st.info("📂 저장된 모든 데이터(.jsonl)를 분석합니다.")
+                max_workers = os.cpu_count() or 1
+                if max_workers > 1:
+                    sim_workers = st.slider("병렬 워커 수", 1, max_workers, max_workers, help="1이면 순차 실행")
+                else:
+                    sim_workers = 1  # 코어가 하나면 슬라이더 범위가 없음 (최소 = 최대)
             
             seed_money = st.number_input("시작 투자금", 10000000, step=1000000)
             
@@ -238,6 +247,8 @@ def main():
                         k1.metric("최종 자산", f"{res['final_balance']:,} 원")
                         k2.metric("수익률", f"{res['return_rate']}%", delta=f"{res['return_rate']}%")
                         k3.metric("거래 횟수", f"{res['trade_count']} 회")
+                        if res.get('ai_cache'):
+                            st.caption(f"🗂️ AI 판단 캐시: 적중 {res['ai_cache']['hits']}회 / 미적중 {res['ai_cache']['misses']}회")
                         
                         st.subheader("📝 매매 상세 일지")
                         st.dataframe(pd.DataFrame(res['trade_log']), use_container_width=True)
@@ -248,13 +259,21 @@ def main():
 
             # B. 전체 종목 시뮬레이션
             else:
+                progress_bar = st.progress(0.0, text="백테스트 준비 중...")
+
+                def on_progress(done, total, code, row):
+                    status = f"{row['Return(%)']}%" if row else "결과 없음"
+                    progress_bar.progress(done / total, text=f"[{done}/{total}] {code} - {status}")
+
                 with st.spinner("데이터베이스의 모든 종목을 분석 중입니다... (시간이 걸릴 수 있습니다)"):
                     summary = tester.run_all_simulation(
                         timeframe='daily',
                         strategy_name=selected_strategy,
                         use_ai_filter=use_ai,
                         start_date=start_dt,
-                        end_date=end_dt
+                        end_date=end_dt,
+                        workers=sim_workers,
+                        progress_callback=on_progress
                     )
                 
                 if summary is not None and not summary.empty:
@@ -268,11 +287,48 @@ def main():
                     m1.metric("평균 수익률", f"{avg_ret:.2f}%")
                     m2.metric("최고 수익 종목", f"{best_stock['Code']}", f"{best_stock['Return(%)']}%")
                     m3.metric("분석 종목 수", f"{len(summary)}개")
+                    if 'AI_Hits' in summary.columns:
+                        st.caption(f"🗂️ AI 판단 캐시: 적중 {int(summary['AI_Hits'].sum())}회 / 미적중 {int(summary['AI_Misses'].sum())}회")
                     
                     st.subheader("📊 전체 수익률 순위")
                     st.dataframe(summary, use_container_width=True)
                 else:
                     st.warning("분석할 데이터가 없거나 결과가 없습니다.")
 
+    # -----------------------------------------------------
+    # TAB 5: 주문 지연 추적 (core.tracing 덤프 파일 보기)
+    # -----------------------------------------------------
+    with tab5:
+        st.subheader("⏱️ 신호 → 주문 → 접수 → 체결 지연")
+        st.caption("ORDER_TRACE=1 로 트레이더를 실행하거나 `python -m simulator.load_driver --trace` 로 만든 파일을 읽습니다.")
+        trace_path = st.text_input("추적 파일 경로", value=DEFAULT_DUMP_PATH)
+        trace = load_trace(trace_path)
+
+        if trace is None:
+            st.info("추적 파일이 없습니다.")
+        else:
+            spans = trace.get('spans', {})
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("시작", spans.get('started', 0))
+            c2.metric("완료", spans.get('completed', 0))
+            c3.metric("체결 대기", spans.get('open', 0))
+            c4.metric("버림", spans.get('dropped', 0))
+            st.caption(f"저장 시각: {trace.get('timestamp')}")
+
+            stages = trace.get('stages', {})
+            rows = [{'구간': name, **{k: v for k, v in stages.get(name, {}).items() if k != 'buckets'}}
+                    for name, _, _ in STAGES]
+            st.dataframe(pd.DataFrame(rows).set_index('구간'), use_container_width=True)
+
+            stage_name = st.selectbox("히스토그램 구간", [name for name, _, _ in STAGES])
+            buckets = stages.get(stage_name, {}).get('buckets', [])
+            if buckets:
+                hist_df = pd.DataFrame(buckets, columns=['상한(ms)', '건수'])
+                # 문자열 축은 사전순으로 정렬되므로 순번을 앞에 붙여 구간 순서를 유지
+                hist_df['상한(ms)'] = [f"{k:02d} ≤{v:,.3f}" for k, v in enumerate(hist_df['상한(ms)'])]
+                st.bar_chart(hist_df.set_index('상한(ms)'))
+            else:
+                st.info("이 구간에는 기록이 없습니다.")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+
+# 합성 데이터 생성기와 벤치마크 실행기
+# 실행: python -m benchmarks.run_benchmarks / 비교: python -m benchmarks.compare
@@ -0,0 +1,57 @@
+"""
+[벤치마크 비교] 두 결과 JSON의 같은 시나리오끼리 median 시간을 비교합니다.
+
+사용 예:
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+    python -m benchmarks.compare old.json new.json --threshold 1.10   # 10% 넘게 느려지면 종료 코드 1
+"""
+import sys
+import json
+import argparse
+
+
+def _key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return report.get('meta', {}), {_key(r): r for r in report.get('results', [])}
+
+def compare(base_path, new_path, threshold=None):
+    base_meta, base = load_results(base_path)
+    new_meta, new = load_results(new_path)
+
+    print(f"기준: {base_meta.get('git_commit')} ({base_meta.get('timestamp')})")
+    print(f"비교: {new_meta.get('git_commit')} ({new_meta.get('timestamp')})")
+    print("-" * 96)
+    print(f"{'시나리오':<64}{'기준(ms)':>10}{'비교(ms)':>10}{'배율':>10}")
+
+    regressions = []
+    for key in sorted(set(base) | set(new)):
+        if key not in base or key not in new:
+            print(f"{key:<64}{'-':>10}{'-':>10}{'(한쪽만)':>10}")
+            continue
+        b = base[key]['median'] * 1000
+        n = new[key]['median'] * 1000
+        ratio = n / b if b > 0 else float('inf')
+        mark = ""
+        if threshold and ratio > threshold:
+            regressions.append(key)
+            mark = " ⚠️"
+        print(f"{key:<64}{b:>10.1f}{n:>10.1f}{ratio:>9.2f}x{mark}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)}개 시나리오가 기준 대비 {threshold}배 넘게 느려졌습니다.")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=None, help="이 배율을 넘으면 회귀로 판단")
+    args = parser.parse_args()
+
+    sys.exit(1 if compare(args.base, args.new, args.threshold) else 0)
@@ -0,0 +1,169 @@
+"""
+[주문 경로 벤치마크] 동기(블로킹) 주문 vs 비동기(연결 풀) 주문
+- 로컬 HTTP 스텁 서버가 /api/dostk/ordr 에 지정한 지연 후 접수 응답을 돌려줍니다.
+- 같은 이벤트 루프에서 LoopLagMonitor를 돌려, 주문 중 루프가 얼마나 멈췄는지 함께 측정합니다.
+    sync  : 코루틴 안에서 send_sell_order() 직접 호출 (기존 send_order 방식)
+    async : await send_order("SELL", ...) (비동기 경로)
+- --server-rate를 주면 스텁이 초당 한도를 넘는 요청에 429를 돌려줍니다.
+  --rate(클라이언트 스케줄러 한도)와 함께 써서 거부 없이 한도까지 전송되는지 확인합니다.
+
+사용 예:
+    python -m benchmarks.order_path --orders 200 --concurrency 10 --delay-ms 20
+    python -m benchmarks.order_path --orders 100 --server-rate 20 --rate 19 --burst 1
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import atexit
+import argparse
+import tempfile
+import threading
+import contextlib
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+root_path = os.path.dirname(BENCH_DIR)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from core.metrics import LoopLagMonitor
+from core.request_scheduler import RequestScheduler
+from core.trader.order_manager import KiwoomOrderManager
+
+
+class _OrderStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive 허용
+    delay = 0.0
+    rate = None        # 초당 허용 요청 수 (None이면 무제한)
+    counter = 0
+    rejected = 0
+    recent = deque()
+    lock = threading.Lock()
+
+    def _over_limit(self):
+        if not self.rate: return False
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] >= 1.0:
+            self.recent.popleft()
+        if len(self.recent) >= self.rate:
+            return True
+        self.recent.append(now)
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with _OrderStub.lock:
+            limited = self._over_limit()
+            if limited: _OrderStub.rejected += 1
+        if limited:
+            self._reply(429, {'rt_cd': '1', 'msg1': '허용된 요청 개수를 초과하였습니다'})
+            return
+        time.sleep(self.delay)
+        with _OrderStub.lock:
+            _OrderStub.counter += 1
+            ord_no = f"{_OrderStub.counter:07d}"
+        self._reply(200, {'rt_cd': '0', 'ord_no': ord_no, 'msg1': 'OK'})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 동시 접속 폭주 시 SYN 재전송(1초) 방지
+
+@contextlib.contextmanager
+def stub_server(delay, rate=None):
+    _OrderStub.delay = delay
+    _OrderStub.rate = rate
+    server = _StubServer(('127.0.0.1', 0), _OrderStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def _make_manager(host, rate=None, burst=1):
+    # rate가 없으면 호출 제한 없이 전송 경로 자체만 측정
+    scheduler = RequestScheduler(default_limit=None, global_limit=(rate, burst) if rate else None)
+    # 매수 기록은 임시 폴더에 (실제 매매 기록을 읽거나 덮어쓰지 않음)
+    journal_dir = tempfile.mkdtemp(prefix='order_path_')
+    atexit.register(shutil.rmtree, journal_dir, True)
+    mgr = KiwoomOrderManager(mode='2', account_no='00000000', host=host, scheduler=scheduler,
+                             journal=os.path.join(journal_dir, 'trading_history.json'))
+    mgr.access_token = 'bench-token'
+    mgr.app_key = 'bench-key'
+    mgr.app_secret = 'bench-secret'
+    return mgr
+
+async def _run(mode, host, orders, concurrency, rate=None, burst=1):
+    mgr = _make_manager(host, rate, burst)
+    rejected_before = _OrderStub.rejected
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor_task = asyncio.create_task(monitor.run())
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(k):
+        async with sem:
+            if mode == 'sync':
+                return mgr.send_sell_order('005930', 1)  # 루프를 막는 기존 호출 방식
+            return await mgr.send_order('SELL', '005930', 1)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(k) for k in range(orders)))
+    elapsed = time.perf_counter() - start
+
+    monitor.stop()
+    await monitor_task
+    await mgr.close()
+
+    return {
+        'mode': mode,
+        'orders': orders,
+        'ok': sum(1 for r in results if r),
+        'rejected': _OrderStub.rejected - rejected_before,
+        'elapsed_s': round(elapsed, 3),
+        'orders_per_s': round(orders / elapsed, 1),
+        'ack_latency': mgr.latency_report(),
+        'loop_lag': monitor.summary(),
+        'scheduler': mgr.scheduler.stats()
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="주문 경로 지연/루프 정지 측정")
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--delay-ms', type=float, default=20.0, help="스텁 서버 응답 지연")
+    parser.add_argument('--server-rate', type=float, default=None, help="스텁 서버 초당 허용 요청 수 (초과 시 429)")
+    parser.add_argument('--rate', type=float, default=None, help="클라이언트 스케줄러 초당 한도")
+    parser.add_argument('--burst', type=float, default=1, help="클라이언트 스케줄러 버스트 (1초 창 한도 = burst + rate)")
+    args = parser.parse_args(argv)
+
+    reports = []
+    with stub_server(args.delay_ms / 1000.0, args.server_rate) as host:
+        for mode in ('sync', 'async'):
+            time.sleep(1.0 if args.server_rate else 0.0)  # 서버 측 1초 창 초기화
+            report = asyncio.run(_run(mode, host, args.orders, args.concurrency, args.rate, args.burst))
+            reports.append(report)
+            print(f"[{mode:>5}] {report['orders_per_s']} 주문/초 | 성공 {report['ok']} 거부 {report['rejected']} | "
+                  f"접수 p50 {report['ack_latency']['p50_ms']}ms p99 {report['ack_latency']['p99_ms']}ms | "
+                  f"루프 정지 p99 {report['loop_lag']['p99_ms']}ms max {report['loop_lag']['max_ms']}ms")
+    return reports
+
+
+if __name__ == "__main__":
+    main()
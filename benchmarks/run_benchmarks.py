@@ -0,0 +1,227 @@
+"""
+[벤치마크 실행기]
+- 합성 데이터베이스(benchmarks.synthetic)를 만들고 주요 경로의 실행 시간을 측정합니다.
+    1. Backtester.load_data (캐시 없음 / 캐시 적중)
+    2. Backtester.run_simulation (Cases_v1 / v2 / v3)
+    3. Backtester.run_all_simulation (100 / 1,000 / 3,000 종목)
+    4. StrategyManager.calculate_buy_amount
+- 결과는 JSON 파일로 저장 -> benchmarks.compare 로 커밋 간 비교
+
+사용 예:
+    python -m benchmarks.run_benchmarks                         # 전체 (3,000종목 포함, 오래 걸림)
+    python -m benchmarks.run_benchmarks --sizes 100 --repeat 3  # 빠른 확인
+    python -m benchmarks.compare old.json new.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+root_path = os.path.dirname(BENCH_DIR)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from benchmarks.synthetic import write_universe, symbol_codes
+from core.backtester import Backtester
+from core.indicators import indicators
+from core.strategy import StrategyManager
+
+STRATEGIES = ['Cases_v1', 'Cases_v2', 'Cases_v3']
+
+
+# -----------------------------------------------------------
+# 측정 도구
+# -----------------------------------------------------------
+@contextlib.contextmanager
+def _quiet():
+    """백테스터의 진행 로그가 측정 결과를 가리지 않도록 stdout을 버림"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def measure(name, fn, repeat=3, setup=None, warmup=1, **params):
+    """
+    fn()을 repeat번 실행해 초 단위 시간을 기록합니다. setup()은 측정 시간에서 제외됩니다.
+    warmup번은 모듈 import 등 첫 실행 비용을 빼기 위해 측정 없이 먼저 실행합니다.
+    """
+    for _ in range(warmup):
+        if setup: setup()
+        with _quiet(): fn()
+
+    times = []
+    for _ in range(repeat):
+        if setup: setup()
+        with _quiet():
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+    result = {
+        'name': name,
+        'params': params,
+        'repeat': repeat,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times)
+    }
+    print(f"  ⏱️ {name} {params if params else ''} -> median {result['median'] * 1000:.1f} ms (min {result['min'] * 1000:.1f} ms)")
+    return result
+
+def _git_info():
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=root_path, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root_path, text=True).strip())
+        return sha, dirty
+    except Exception:
+        return None, None
+
+def _link_universe(pool_dir, target_dir, codes):
+    """공용 데이터 풀에서 종목 파일을 하드링크(실패 시 복사)해 크기별 데이터베이스를 구성"""
+    src = os.path.join(pool_dir, '02_daily')
+    dst = os.path.join(target_dir, '02_daily')
+    os.makedirs(dst, exist_ok=True)
+    for code in codes:
+        path = os.path.join(dst, f"{code}.jsonl")
+        if os.path.exists(path): continue
+        try:
+            os.link(os.path.join(src, f"{code}.jsonl"), path)
+        except OSError:
+            shutil.copyfile(os.path.join(src, f"{code}.jsonl"), path)
+
+
+# -----------------------------------------------------------
+# 시나리오
+# -----------------------------------------------------------
+def bench_load_data(db_dir, codes, repeat):
+    cold = Backtester(use_cache=False, data_dir=db_dir)
+    warm = Backtester(use_cache=True, data_dir=db_dir)
+    for code in codes: warm.load_data(code) # 캐시 미리 생성
+
+    return [
+        measure('load_data.cold', lambda: [cold.load_data(c) for c in codes], repeat, symbols=len(codes)),
+        measure('load_data.cached', lambda: [warm.load_data(c) for c in codes], repeat, symbols=len(codes))
+    ]
+
+def bench_run_simulation(db_dir, code, repeat):
+    tester = Backtester(data_dir=db_dir, use_ai_cache=False)
+    df = tester.load_data(code)
+    results = []
+    for name in STRATEGIES:
+        # 지표 메모 캐시를 비워야 매 반복이 같은 일을 함
+        results.append(measure(
+            'run_simulation', lambda: tester.run_simulation(df.copy(), strategy_name=name, silent=True),
+            repeat, setup=indicators.clear, strategy=name, rows=len(df)
+        ))
+    return results
+
+def bench_run_all(work_dir, pool_dir, sizes, workers_list, repeat):
+    results = []
+    for size in sizes:
+        db_dir = os.path.join(work_dir, f"u{size}")
+        codes = symbol_codes(size)
+        _link_universe(pool_dir, db_dir, codes)
+
+        # 컬럼형 캐시를 미리 만들어 두고 캐시 적중 상태의 실행 시간을 측정
+        tester = Backtester(data_dir=db_dir, use_ai_cache=False)
+        for code in codes: tester.load_data(code)
+
+        for workers in workers_list:
+            results.append(measure(
+                'run_all_simulation',
+                lambda: tester.run_all_simulation(strategy_name='Cases_v1', workers=workers),
+                repeat, setup=indicators.clear, symbols=size, workers=workers, strategy='Cases_v1'
+            ))
+    return results
+
+def bench_buy_amount(repeat, calls=100000):
+    sm = StrategyManager()
+    tiers = ['S', 'A', 'B']
+    prices = np.random.default_rng(0).integers(1000, 500000, calls).tolist()
+
+    def run():
+        for k, price in enumerate(prices):
+            sm.calculate_buy_amount(tiers[k % 3], price)
+
+    return [measure('calculate_buy_amount', run, repeat, calls=calls)]
+
+
+# -----------------------------------------------------------
+# 실행
+# -----------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="백테스터/전략 벤치마크")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'notion_ai_bench'),
+                        help="합성 데이터베이스 폴더 (재실행 시 재사용)")
+    parser.add_argument('--sizes', default='100,1000,3000', help="run_all_simulation 종목 수 목록")
+    parser.add_argument('--days', type=int, default=2500, help="종목당 일봉 수")
+    parser.add_argument('--workers', default=f"1,{os.cpu_count() or 1}", help="run_all_simulation 워커 수 목록")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None, help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args(argv)
+
+    args.work_dir = os.path.abspath(args.work_dir)
+    sizes = sorted({int(x) for x in args.sizes.split(',') if x})
+    workers_list = sorted({int(x) for x in args.workers.split(',') if x})
+
+    pool_dir = os.path.join(args.work_dir, f"pool_d{args.days}")
+    print(f"📂 합성 데이터 준비: {max(sizes)}종목 x {args.days}일 -> {pool_dir}")
+    codes = write_universe(pool_dir, max(sizes), n_days=args.days)
+
+    # StrategyManager는 현재 폴더의 master_config.json을 읽으므로 기본 설정이 쓰이도록 작업 폴더로 이동
+    os.makedirs(args.work_dir, exist_ok=True)
+    prev_cwd = os.getcwd()
+    os.chdir(args.work_dir)
+    try:
+        results = []
+        print("🧪 [1] load_data")
+        results += bench_load_data(pool_dir, codes[:20], args.repeat)
+        print("🧪 [2] run_simulation")
+        results += bench_run_simulation(pool_dir, codes[0], args.repeat)
+        print("🧪 [3] run_all_simulation")
+        results += bench_run_all(args.work_dir, pool_dir, sizes, workers_list, max(1, args.repeat // 3))
+        print("🧪 [4] calculate_buy_amount")
+        results += bench_buy_amount(args.repeat)
+    finally:
+        os.chdir(prev_cwd)
+
+    sha, dirty = _git_info()
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': sha,
+            'git_dirty': dirty,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'days': args.days
+        },
+        'results': results
+    }
+
+    out = args.out
+    if out is None:
+        out_dir = os.path.join(BENCH_DIR, 'results')
+        os.makedirs(out_dir, exist_ok=True)
+        out = os.path.join(out_dir, f"{datetime.now():%Y%m%d_%H%M%S}_{sha or 'nogit'}.json")
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과 저장: {out}")
+    return out
+
+
+if __name__ == "__main__":
+    main()
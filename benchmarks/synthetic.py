@@ -0,0 +1,88 @@
+"""
+[합성 OHLCV 생성기]
+- 종목 코드와 시드만으로 항상 같은 일봉 데이터를 만듭니다. (커밋 간 벤치마크 비교용)
+- database/02_daily/{code}.jsonl 과 같은 형식(한 줄에 한 봉)으로 저장합니다.
+
+사용 예:
+    python -m benchmarks.synthetic --out /tmp/bench_db --symbols 1000 --days 2500
+"""
+import os
+import zlib
+import argparse
+import functools
+
+import numpy as np
+import pandas as pd
+
+
+def generate_ohlcv(code, n_days=2500, seed=0, start='2010-01-04'):
+    """
+    기하 브라운 운동 + 거래량 난수로 일봉 DataFrame을 생성합니다.
+    같은 (code, n_days, seed, start)면 항상 같은 결과가 나옵니다.
+    """
+    rng = np.random.default_rng(zlib.crc32(f"{code}:{seed}".encode('utf-8')))
+
+    base_price = rng.uniform(2000, 200000)
+    drift = rng.normal(0.0002, 0.0005)
+    vol = rng.uniform(0.01, 0.04)
+
+    close = base_price * np.exp(np.cumsum(rng.normal(drift, vol, n_days)))
+    open_ = close * (1 + rng.normal(0, vol / 3, n_days))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n_days)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n_days)))
+
+    # 거래량: 평소 수준 + 가끔 급감/급증 (Cases_v2 같은 거래량 조건이 발동하도록)
+    base_volume = rng.uniform(5e4, 5e6)
+    volume = base_volume * np.exp(rng.normal(0, 0.6, n_days))
+
+    return pd.DataFrame({
+        'Date': _business_dates(start, n_days).copy(),
+        'Open': np.round(open_).astype(np.int64),
+        'High': np.round(high).astype(np.int64),
+        'Low': np.round(low).astype(np.int64),
+        'Close': np.round(close).astype(np.int64),
+        'Volume': np.round(volume).astype(np.int64)
+    })
+
+@functools.lru_cache(maxsize=8)
+def _business_dates(start, n_days):
+    """영업일 날짜 문자열 (종목마다 같으므로 한 번만 만듦)"""
+    dates = pd.bdate_range(start, periods=n_days).strftime('%Y-%m-%d').to_numpy()
+    dates.setflags(write=False)
+    return dates
+
+def symbol_codes(n_symbols):
+    """6자리 종목 코드 목록 (000001 ~)"""
+    return [f"{i:06d}" for i in range(1, n_symbols + 1)]
+
+def write_jsonl(df, path):
+    df.to_json(path, orient='records', lines=True, force_ascii=False)
+
+def write_universe(db_dir, n_symbols, n_days=2500, seed=0, timeframe='daily'):
+    """
+    db_dir/02_daily (또는 03_minute) 아래에 n_symbols개 종목 파일을 씁니다.
+    이미 같은 파일이 있으면 건너뛰므로 여러 번 호출해도 비용이 적습니다.
+    :return: 종목 코드 목록
+    """
+    folder_name = "02_daily" if timeframe == 'daily' else "03_minute"
+    target_dir = os.path.join(db_dir, folder_name)
+    os.makedirs(target_dir, exist_ok=True)
+
+    codes = symbol_codes(n_symbols)
+    for code in codes:
+        path = os.path.join(target_dir, f"{code}.jsonl")
+        if os.path.exists(path): continue
+        write_jsonl(generate_ohlcv(code, n_days, seed), path)
+    return codes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 OHLCV 데이터베이스 생성")
+    parser.add_argument('--out', required=True, help="database 폴더 경로 (02_daily가 이 아래 생성됨)")
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    codes = write_universe(args.out, args.symbols, args.days, args.seed)
+    print(f"✅ {len(codes)}종목 x {args.days}일 생성 완료: {args.out}")
@@ -2,5 +2,6 @@
 
 # 설정 로드 함수 노출
 from .config import load_secrets, kiwoom_login, save_token  # (config.py 안에 이 함수가 있다고 가정)
+from .config import request_token, TokenProvider, get_token_provider
 
-__all__ = ['load_secrets', 'kiwoom_login', 'save_token']
\ No newline at end of file
+__all__ = ['load_secrets', 'kiwoom_login', 'save_token', 'request_token', 'TokenProvider', 'get_token_provider']
\ No newline at end of file
@@ -2,11 +2,17 @@ import requests
 import json
 import yaml
 import os
+import time
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
 
 # 현재 파일(config.py)이 있는 경로를 기준으로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SECRETS_FILE = os.path.join(BASE_DIR, 'secrets.yaml')
 TOKEN_FILE = os.path.join(BASE_DIR, 'ACCESS_TOKEN.txt')
+TOKEN_META_FILE = os.path.join(BASE_DIR, 'ACCESS_TOKEN.meta.json')  # 토큰을 쓴 모드 / 만료 시각
 
 def load_secrets():
     """
@@ -23,20 +29,31 @@ def load_secrets():
         print(f"[오류] 설정 파일 로드 중 문제 발생: {e}")
         return None
 
-def save_token(token):
+def _token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+def save_token(token, invest_type=None, expires_at=None):
     """
     발급받은 토큰을 ACCESS_TOKEN.txt 파일에 저장합니다.
+    invest_type을 주면 ACCESS_TOKEN.meta.json에 (모드, 만료 시각)을 함께 남겨
+    다음 실행에서 같은 모드의 TokenProvider만 이 토큰을 재사용합니다.
     """
     try:
         with open(TOKEN_FILE, 'w', encoding='utf-8') as f:
             f.write(token)
+        if invest_type is not None:
+            with open(TOKEN_META_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'invest_type': invest_type, 'expires_at': expires_at, 'digest': _token_digest(token)}, f)
+        elif os.path.exists(TOKEN_META_FILE):
+            os.remove(TOKEN_META_FILE)  # 모드를 모르는 토큰 -> 이전 모드 정보는 무효
         print(f"✅ 토큰이 저장되었습니다: {TOKEN_FILE}")
     except Exception as e:
         print(f"❌ 토큰 파일 저장 실패: {e}")
 
-def kiwoom_login(invest_type):
+def request_token(invest_type):
     """
-    키움증권 REST API 로그인 프로세스
+    키움증권 REST API 토큰 발급 요청 (파일 저장 없음)
+    :return: (token, expires_at[epoch 초]) 또는 None
     """
     # 1. 시크릿 파일 로드
     secrets = load_secrets()
@@ -76,13 +93,195 @@ def kiwoom_login(invest_type):
 
     # requests.post 호출
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = requests.post(url, headers=headers, json=data, timeout=(3.0, 10.0))
         if response.status_code == 200:
             res_json = response.json()
             if res_json.get('return_code') in ['0', 0]:
                 token = res_json.get('token')
-                save_token(token)
-                return token
+                return token, _parse_expiry(res_json.get('expires_dt'))
     except Exception as e:
         print(f"로그인 요청 중 에러: {e}")
-    return None
\ No newline at end of file
+    return None
+
+def _parse_expiry(expires_dt):
+    """'YYYYMMDDHHMMSS' -> epoch 초 (없거나 형식이 다르면 발급 시각 + 기본 유효시간)"""
+    try:
+        return datetime.strptime(str(expires_dt), "%Y%m%d%H%M%S").timestamp()
+    except (TypeError, ValueError):
+        return time.time() + TokenProvider.DEFAULT_TTL
+
+def kiwoom_login(invest_type):
+    """
+    키움증권 REST API 로그인 프로세스
+    - 발급받은 토큰은 모드별 TokenProvider에 등록되어 주문/조회에서 메모리로 재사용되고,
+      다른 프로세스를 위해 ACCESS_TOKEN.txt 에도 저장됩니다.
+    """
+    if invest_type not in ('1', '2'):
+        print("잘못된 입력입니다.")
+        return None
+    return get_token_provider(invest_type).refresh()
+
+
+class TokenProvider:
+    """
+    [토큰 수명 관리자]
+    - 토큰과 만료 시각을 메모리에 보관 -> get_token()은 유효한 동안 디스크/네트워크를 건드리지 않음
+    - 만료 refresh_margin초 전에 백그라운드 스레드가 미리 재발급
+    - 재발급 실패 시 retry_interval초 뒤 재시도, 그 사이 get_token()은 로그인을 다시 시도하지 않음
+    - 이벤트 루프에서는 get_token_async() / peek_token()을 사용 (발급을 기다려도 루프를 막지 않음)
+    """
+    DEFAULT_TTL = 24 * 3600  # 만료 시각을 모를 때 가정하는 유효시간
+
+    def __init__(self, invest_type='2', refresh_margin=600, retry_interval=30, fetcher=None, persist=True):
+        self.invest_type = invest_type
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.persist = persist
+        self._fetcher = fetcher or (lambda: request_token(invest_type))
+
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._next_retry = 0.0
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()  # 백그라운드 스레드 시작 전용 (네트워크 호출 중에는 잡지 않음)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -----------------------------------------------------------
+    # 조회 (핫패스)
+    # -----------------------------------------------------------
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    def is_valid(self):
+        return bool(self._token) and time.time() < self._expires_at
+
+    def get_token(self):
+        """유효한 토큰을 즉시 반환. 토큰이 없을 때만 (재시도 간격을 지켜) 동기 로그인"""
+        token = self._token
+        if token and time.time() < self._expires_at:
+            return token
+        if time.time() < self._next_retry:
+            return None
+        return self.refresh(force=False)
+
+    def peek_token(self):
+        """락/네트워크 없이 메모리의 토큰만 반환. 없거나 만료됐으면 백그라운드 재발급을 요청하고 None"""
+        token = self._token
+        if token and time.time() < self._expires_at:
+            return token
+        self.request_refresh()
+        return None
+
+    async def get_token_async(self):
+        """이벤트 루프용 get_token: 유효하면 즉시 반환, 발급이 필요하면 스레드에서 기다림"""
+        token = self._token
+        if token and time.time() < self._expires_at:
+            return token
+        return await asyncio.to_thread(self.get_token)
+
+    def request_refresh(self):
+        """백그라운드 스레드에 지금 재발급하라고 알림 (블로킹 없음)"""
+        self._refresh_at = min(self._refresh_at, time.time())
+        self._ensure_refresher()
+        self._wake.set()
+
+    # -----------------------------------------------------------
+    # 발급 / 등록
+    # -----------------------------------------------------------
+    def refresh(self, force=True):
+        """
+        토큰을 새로 발급받아 등록하고 반환 (실패 시 None, 기존 토큰은 유지)
+        force=False면 락을 기다리는 동안 다른 스레드가 이미 발급한 토큰을 그대로 사용
+        """
+        with self._lock:
+            if not force and self.is_valid():
+                return self._token
+            result = self._fetcher()
+            if not result:
+                self._next_retry = time.time() + self.retry_interval
+                return None
+            token, expires_at = result
+            self._set(token, expires_at)
+        if self.persist:
+            save_token(token, self.invest_type, expires_at)
+        return token
+
+    def set_token(self, token, expires_at=None):
+        """외부에서 받은 토큰 등록 (만료 시각을 모르면 DEFAULT_TTL 가정)"""
+        with self._lock:
+            self._set(token, expires_at or time.time() + self.DEFAULT_TTL)
+
+    def load_saved(self):
+        """
+        ACCESS_TOKEN.txt 가 이 모드에서 저장한 토큰이면 1회 읽어 등록
+        (ACCESS_TOKEN.meta.json의 모드/토큰 지문이 맞아야 함, 만료 시각을 모르면 파일 수정 시각 + DEFAULT_TTL)
+        """
+        try:
+            with open(TOKEN_FILE, 'r', encoding='utf-8') as f:
+                token = f.read().strip()
+            with open(TOKEN_META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            expires_at = meta.get('expires_at') or os.path.getmtime(TOKEN_FILE) + self.DEFAULT_TTL
+        except (OSError, ValueError):
+            return None
+        if not token or meta.get('invest_type') != self.invest_type or meta.get('digest') != _token_digest(token):
+            return None
+        if expires_at <= time.time():
+            return None
+        with self._lock:
+            if not self.is_valid():
+                self._set(token, expires_at)
+        return token
+
+    def _set(self, token, expires_at):
+        now = time.time()
+        self._token = token
+        self._expires_at = float(expires_at)
+        # 유효시간이 여유(margin)보다 짧은 토큰은 남은 시간의 절반이 지나면 재발급
+        self._refresh_at = self._expires_at - min(self.refresh_margin, max(0.0, self._expires_at - now) / 2)
+        self._next_retry = 0.0
+        self._ensure_refresher()
+        self._wake.set()  # 백그라운드 스레드가 새 만료 시각 기준으로 다시 대기
+
+    # -----------------------------------------------------------
+    # 백그라운드 선제 재발급
+    # -----------------------------------------------------------
+    def _ensure_refresher(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._refresh_loop, name=f"token-{self.invest_type}", daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            # 먼저 지우고 나서 대기 시간을 계산해야 그 사이 _set()/request_refresh()의 알림을 놓치지 않음
+            self._wake.clear()
+            wait = self._refresh_at - time.time()
+            if wait > 0:
+                self._wake.wait(wait)
+                continue
+            if self.refresh() is None:
+                self._stop.wait(self.retry_interval)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+def get_token_provider(invest_type='2'):
+    """모드('1' 실전 / '2' 모의)별 공용 TokenProvider (처음 만들 때 저장된 토큰을 1회 읽음)"""
+    with _providers_lock:
+        provider = _providers.get(invest_type)
+        if provider is None:
+            provider = TokenProvider(invest_type)
+            provider.load_saved()
+            _providers[invest_type] = provider
+        return provider
@@ -1,18 +1,140 @@
+import asyncio
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from core.request_scheduler import get_request_scheduler
+
+
+def _to_int(value):
+    """API 숫자 문자열('000012345', '-00340', '') -> int, 해석 불가 시 0"""
+    try:
+        return int(str(value).strip() or 0)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+def _to_float(value):
+    try:
+        return float(str(value).strip() or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(frozen=True)
+class Holding:
+    """보유 종목 한 건 (kt00018 acnt_evlt_remn_indv_tot)"""
+    code: str
+    name: str = ""
+    qty: int = 0          # 보유수량
+    avg_price: int = 0    # 매입가
+    cur_price: int = 0    # 현재가
+
+    @classmethod
+    def from_response(cls, row):
+        return cls(
+            code=str(row.get("stk_cd", "")).strip().replace('A', ''),
+            name=str(row.get("stk_nm", "")).strip(),
+            qty=_to_int(row.get("rmnd_qty")),
+            avg_price=abs(_to_int(row.get("pur_pric"))),
+            cur_price=abs(_to_int(row.get("cur_prc")))
+        )
+
+
+@dataclass(frozen=True)
+class BalanceSummary:
+    """주식 잔고 요약 (kt00018)"""
+    total_purchase: int = 0      # 총매입금액
+    total_eval: int = 0          # 총평가금액
+    total_pl: int = 0            # 총평가손익
+    total_return_pct: float = 0.0  # 총수익률(%)
+    est_deposit_asset: int = 0   # 추정예탁자산
+    holdings: tuple = ()         # 보유 종목 (Holding)
+
+    COLUMNS = {
+        'total_purchase': "총매입금액",
+        'total_eval': "총평가금액",
+        'total_pl': "총평가손익",
+        'total_return_pct': "총수익률(%)",
+        'est_deposit_asset': "추정예탁자산"
+    }
+
+    @classmethod
+    def from_response(cls, res_json):
+        return cls(
+            total_purchase=_to_int(res_json.get("tot_pur_amt")),
+            total_eval=_to_int(res_json.get("tot_evlt_amt")),
+            total_pl=_to_int(res_json.get("tot_evlt_pl")),
+            total_return_pct=_to_float(res_json.get("tot_prft_rt")),
+            est_deposit_asset=_to_int(res_json.get("prsm_dpst_aset_amt")),
+            holdings=tuple(Holding.from_response(row) for row in res_json.get("acnt_evlt_remn_indv_tot") or [])
+        )
+
+    def to_frame(self):
+        """기존 화면과 같은 한글 컬럼의 1행 DataFrame"""
+        return pd.DataFrame([{label: getattr(self, k) for k, label in self.COLUMNS.items()}])
+
+
+@dataclass(frozen=True)
+class DepositSummary:
+    """예수금 현황 (kt00001)"""
+    deposit: int = 0           # 예수금
+    withdrawable: int = 0      # 출금가능금액
+    orderable: int = 0         # 주문가능금액
+    d2_deposit: int = 0        # D+2예수금
+
+    COLUMNS = {
+        'deposit': "예수금",
+        'withdrawable': "출금가능금액",
+        'orderable': "주문가능금액",
+        'd2_deposit': "D+2예수금"
+    }
+
+    @classmethod
+    def from_response(cls, res_json):
+        return cls(
+            deposit=_to_int(res_json.get("entr")),
+            withdrawable=_to_int(res_json.get("pymn_alow_amt")),
+            orderable=_to_int(res_json.get("ord_alow_amt")),
+            d2_deposit=_to_int(res_json.get("d2_entra"))
+        )
+
+    def to_frame(self):
+        return pd.DataFrame([{label: getattr(self, k) for k, label in self.COLUMNS.items()}])
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    """잔고 + 예수금을 한 번에 조회한 결과 (실패한 쪽은 None)"""
+    balance: BalanceSummary = None
+    deposit: DepositSummary = None
+
 
 class AccountManager:
     """
     [계좌 관리자]
     - 역할: 주식 잔고 조회, 예수금 조회 등 계좌 관련 정보 처리
     - 관리: 토큰(Token), 계좌번호, 접속 URL(실전/모의) 자동 관리
+    - 연결: keep-alive 세션을 재사용하고, snapshot()은 잔고/예수금을 동시에 조회
     """
-    def __init__(self, token, account_num, mode='2'):
+    ENDPOINT = '/api/dostk/acnt'
+
+    def __init__(self, token, account_num, mode='2', base_url=None, timeout=(3.0, 10.0), session=None,
+                 token_provider=None, scheduler=None):
         self.token = token
+        self.token_provider = token_provider  # 있으면 조회마다 최신 토큰을 메모리에서 가져옴
         self.account_num = account_num
-        
-        # 모드에 따른 URL 설정
-        if mode == '1':  # 실전
+        self.timeout = timeout
+
+        # 모드에 따른 URL 설정 (base_url을 주면 그 주소를 사용)
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+        elif mode == '1':  # 실전
             self.base_url = "https://openapi.koreainvestment.com:9443"
         else:            # 모의 (기본값)
             self.base_url = "https://openapivts.koreainvestment.com:29443"
@@ -25,99 +147,94 @@ class AccountManager:
             'next-key': ''
         }
 
-    # -----------------------------------------------------------
-    # 1. 주식 잔고 조회 (API ID: kt00018)
-    # -----------------------------------------------------------
-    def get_balance(self):
-        """보유 종목 및 계좌 평가 현황 조회"""
-        endpoint = '/api/dostk/acnt'
-        url = f"{self.base_url}{endpoint}"
+        # 🔌 [연결 풀] 조회마다 TLS 핸드셰이크를 새로 하지 않도록 세션 재사용
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self._executor = None
 
-        headers = self.common_headers.copy()
-        headers['api-id'] = 'kt00018'
+        # 🚦 [호출 제한] 주문과 같은 한도를 나눠 씀 (조회는 주문보다 후순위)
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler(mode)
 
-        body_data = {
-            "vt_acc_no": self.account_num,
-            "qry_tp": "1",
-            "dmst_stex_tp": "KRX"
-        }
+    def _post(self, api_id, body_data, tag):
+        """공통 POST: 성공 시 응답 JSON, 실패 시 None"""
+        headers = self.common_headers.copy()
+        headers['api-id'] = api_id
+        if self.token_provider is not None:
+            token = self.token_provider.get_token() or self.token
+            headers['authorization'] = f'Bearer {token}'
 
         try:
-            response = requests.post(url, headers=headers, json=body_data)
-            
+            self.scheduler.acquire(api_id)
+            response = self.session.post(f"{self.base_url}{self.ENDPOINT}", headers=headers,
+                                         json=body_data, timeout=self.timeout)
+            if response.status_code == 429:
+                self.scheduler.penalize()
             if response.status_code == 200:
-                res_json = response.json()
-                
-                # 1. 계좌 요약 정보 추출
-                summary_data = {
-                    "총매입금액": res_json.get("tot_pur_amt", "0"),
-                    "총평가금액": res_json.get("tot_evlt_amt", "0"),
-                    "총평가손익": res_json.get("tot_evlt_pl", "0"),
-                    "총수익률(%)": res_json.get("tot_prft_rt", "0"),
-                    "추정예탁자산": res_json.get("prsm_dpst_aset_amt", "0")
-                }
-                
-                # 2. 정수/실수 형변환
-                for key, val in summary_data.items():
-                    try:
-                        if key == "총수익률(%)":
-                            summary_data[key] = float(val)
-                        else:
-                            summary_data[key] = int(val)
-                    except:
-                        pass
-
-                return pd.DataFrame([summary_data])
-            else:
-                print(f"❌ [Balance] 에러: {response.text}")
-                return None
-                
+                return response.json()
+            print(f"❌ [{tag}] 에러: {response.text}")
+            return None
         except Exception as e:
-            print(f"❌ [Balance] 시스템 예외: {e}")
+            print(f"❌ [{tag}] 시스템 예외: {e}")
             return None
 
     # -----------------------------------------------------------
-    # 2. 예수금 조회 (API ID: kt00001)
+    # 1. 주식 잔고 조회 (API ID: kt00018)
     # -----------------------------------------------------------
-    def get_deposit(self):
-        """주문 가능 금액 및 예수금 조회"""
-        endpoint = '/api/dostk/acnt'
-        url = f"{self.base_url}{endpoint}"
+    def fetch_balance(self):
+        """보유 종목 및 계좌 평가 현황 조회 -> BalanceSummary (실패 시 None)"""
+        res_json = self._post('kt00018', {
+            "vt_acc_no": self.account_num,
+            "qry_tp": "1",
+            "dmst_stex_tp": "KRX"
+        }, 'Balance')
+        return None if res_json is None else BalanceSummary.from_response(res_json)
 
-        headers = self.common_headers.copy()
-        headers['api-id'] = 'kt00001'
+    def get_balance(self):
+        """fetch_balance()의 DataFrame 버전 (기존 화면 호환)"""
+        summary = self.fetch_balance()
+        return None if summary is None else summary.to_frame()
 
-        body_data = {
+    # -----------------------------------------------------------
+    # 2. 예수금 조회 (API ID: kt00001)
+    # -----------------------------------------------------------
+    def fetch_deposit(self):
+        """주문 가능 금액 및 예수금 조회 -> DepositSummary (실패 시 None)"""
+        res_json = self._post('kt00001', {
             "vt_acc_no": self.account_num,
-            "qry_tp": "2" 
-        }
+            "qry_tp": "2"
+        }, 'Deposit')
+        return None if res_json is None else DepositSummary.from_response(res_json)
 
-        try:
-            response = requests.post(url, headers=headers, json=body_data)
-
-            if response.status_code == 200:
-                res_json = response.json()
-                
-                data_map = {
-                    "예수금": res_json.get("entr", "0"),
-                    "출금가능금액": res_json.get("pymn_alow_amt", "0"),
-                    "주문가능금액": res_json.get("ord_alow_amt", "0"),
-                    "D+2예수금": res_json.get("d2_entra", "0")
-                }
-                
-                for key, val in data_map.items():
-                    try:
-                        data_map[key] = int(val)
-                    except:
-                        pass
-
-
-                return pd.DataFrame([data_map])
-
-            else:
-                print(f"❌ [Deposit] 에러: {response.text}")
-                return None
+    def get_deposit(self):
+        """fetch_deposit()의 DataFrame 버전 (기존 화면 호환)"""
+        summary = self.fetch_deposit()
+        return None if summary is None else summary.to_frame()
 
-        except Exception as e:
-            print(f"❌ [Deposit] 시스템 예외: {e}")
-            return None
\ No newline at end of file
+    # -----------------------------------------------------------
+    # 3. 잔고 + 예수금 동시 조회
+    # -----------------------------------------------------------
+    def snapshot(self):
+        """잔고와 예수금을 두 스레드에서 동시에 조회 (왕복 1회 수준의 지연)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="acnt")
+        balance = self._executor.submit(self.fetch_balance)
+        deposit = self._executor.submit(self.fetch_deposit)
+        return AccountSnapshot(balance=balance.result(), deposit=deposit.result())
+
+    async def snapshot_async(self):
+        """이벤트 루프를 막지 않는 snapshot()"""
+        balance, deposit = await asyncio.gather(
+            asyncio.to_thread(self.fetch_balance),
+            asyncio.to_thread(self.fetch_deposit)
+        )
+        return AccountSnapshot(balance=balance, deposit=deposit)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
@@ -0,0 +1,203 @@
+"""
+[AI 판단 캐시]
+- 백테스트에서 AIStrategy.analyze_market(df, i)의 결과를 디스크(SQLite)에 저장해 재사용합니다.
+- 키: (종목, 봉 날짜, 모델 ID, 프롬프트/템플릿 해시, 전략 신호 사유)
+- 최대 저장 개수를 넘으면 가장 오래 안 쓴 항목부터 삭제합니다. (LRU)
+    - 적중 시 last_used 갱신은 메모리에 모았다가 touch_batch개마다 / put / flush / close 때 한 번에 기록
+    - 저장 개수는 메모리에서 세고, 한도를 넘을 것 같을 때만 실제 개수를 다시 셈 (다른 프로세스의 저장 반영)
+- 적중/미적중 횟수를 세어 결과 화면에 표시할 수 있게 합니다.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import atexit
+import weakref
+import threading
+
+
+def _json_default(value):
+    """NumPy 스칼라/배열 등 json이 모르는 값 -> 파이썬 기본 타입"""
+    if hasattr(value, 'item') and getattr(value, 'ndim', 0) == 0:
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_shared = {}  # 경로 -> AIDecisionCache
+_shared_lock = threading.Lock()
+
+# 종료 시 아직 기록하지 않은 last_used를 남기고 연결을 닫을 캐시들 (객체를 붙잡아 두지 않도록 약한 참조)
+_open_caches = weakref.WeakSet()
+
+@atexit.register
+def _close_all():
+    for cache in list(_open_caches):
+        cache.close()
+
+
+def shared_cache(path, **kwargs):
+    """
+    경로별로 프로세스에 하나뿐인 캐시 (Backtester마다 새로 만들지 않음)
+    같은 파일에 연결을 여러 개 열면 SQLite는 잠금을 지키려고 닫힌 연결의 파일까지 마지막 연결이 닫힐 때까지 붙잡아 둠
+    """
+    path = os.path.abspath(path)
+    with _shared_lock:
+        cache = _shared.get(path)
+        if cache is None:
+            cache = _shared[path] = AIDecisionCache(path, **kwargs)
+        return cache
+
+
+class AIDecisionCache:
+    def __init__(self, path, max_entries=200000, touch_batch=256):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._count = 0          # 저장 개수 (이 프로세스 기준 추정치)
+        self._touched = {}       # key -> 아직 기록하지 않은 last_used
+
+    # -----------------------------------------------------------
+    # DB 연결 (프로세스마다 처음 쓸 때 연결)
+    # -----------------------------------------------------------
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                " key TEXT PRIMARY KEY,"
+                " decision TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON decisions(last_used)")
+            self._count = conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+            self._conn = conn
+            _open_caches.add(self)
+        return self._conn
+
+    # -----------------------------------------------------------
+    # 키 생성
+    # -----------------------------------------------------------
+    @staticmethod
+    def model_signature(ai_brain):
+        """
+        AI 두뇌의 (모델 ID, 프롬프트 해시)를 구합니다.
+        프롬프트 해시에는 템플릿 속성과 analyze_market 소스 코드가 함께 들어가므로,
+        프롬프트를 코드에서 고쳐도 이전 판단이 재사용되지 않습니다.
+        """
+        model_id = None
+        for attr in ('model_id', 'model_name', 'model'):
+            value = getattr(ai_brain, attr, None)
+            if isinstance(value, str) and value:
+                model_id = value
+                break
+        if model_id is None:
+            model_id = type(ai_brain).__name__
+
+        parts = []
+        for attr in ('prompt_template', 'system_prompt', 'prompt'):
+            value = getattr(ai_brain, attr, None)
+            if value:
+                parts.append(str(value))
+        try:
+            parts.append(inspect.getsource(type(ai_brain).analyze_market))
+        except (OSError, TypeError, AttributeError):
+            pass
+        prompt_hash = hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()[:16]
+        return model_id, prompt_hash
+
+    @staticmethod
+    def make_key(symbol, bar_date, model_id, prompt_hash, strategy_reason=""):
+        raw = json.dumps([str(symbol), str(bar_date), model_id, prompt_hash, strategy_reason or ""], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # -----------------------------------------------------------
+    # 조회 / 저장
+    # -----------------------------------------------------------
+    def get(self, key):
+        """저장된 (decision, pct, reason)을 반환, 없으면 None"""
+        with self._lock:
+            try:
+                db = self._db()
+                row = db.execute("SELECT decision FROM decisions WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._touched[key] = time.time()
+                if len(self._touched) >= self.touch_batch:
+                    self._write_touched(db)
+                    db.commit()
+                self.hits += 1
+                return tuple(json.loads(row[0]))
+            except Exception as e:
+                print(f"⚠️ [AI Cache] 조회 실패: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key, result):
+        with self._lock:
+            try:
+                decision = json.dumps(list(result), ensure_ascii=False, default=_json_default)
+                db = self._db()
+                now = time.time()
+                cur = db.execute("INSERT OR IGNORE INTO decisions (key, decision, last_used) VALUES (?, ?, ?)",
+                                 (key, decision, now))
+                if cur.rowcount:
+                    self._count += 1
+                else:
+                    db.execute("UPDATE decisions SET decision = ?, last_used = ? WHERE key = ?", (decision, now, key))
+                self._touched.pop(key, None)
+                self._write_touched(db)
+                self._evict(db)
+                db.commit()
+            except Exception as e:
+                print(f"⚠️ [AI Cache] 저장 실패: {e}")
+
+    def _write_touched(self, db):
+        if not self._touched: return
+        db.executemany("UPDATE decisions SET last_used = ? WHERE key = ?",
+                       [(used, key) for key, used in self._touched.items()])
+        self._touched.clear()
+
+    def _evict(self, db):
+        if self._count <= self.max_entries: return
+        # 다른 프로세스가 저장/정리한 몫까지 반영해 실제 개수로 다시 확인
+        self._count = db.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        if self._count <= self.max_entries: return
+        # 매번 지우지 않도록 한도의 10%만큼 여유를 두고 정리
+        remove = self._count - int(self.max_entries * 0.9)
+        db.execute(
+            "DELETE FROM decisions WHERE key IN (SELECT key FROM decisions ORDER BY last_used ASC LIMIT ?)",
+            (remove,)
+        )
+        self._count -= remove
+
+    def flush(self):
+        """모아 둔 last_used 갱신을 기록"""
+        with self._lock:
+            if self._conn is None or not self._touched: return
+            try:
+                self._write_touched(self._conn)
+                self._conn.commit()
+            except Exception as e:
+                print(f"⚠️ [AI Cache] 기록 실패: {e}")
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        _open_caches.discard(self)
@@ -2,7 +2,10 @@ import sys
 import os
 import importlib
 import pandas as pd
+import numpy as np
 import time # 진행 상황 표시를 위해 추가
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # -----------------------------------------------------------
 # [경로 설정] 프로젝트 루트(Stock_Data_V1) 강제 등록
@@ -18,24 +21,112 @@ try:
 except ImportError:
     AIStrategy = None
 
+from core.data_cache import ColumnarCache
+from core.market_store import MarketStore
+from core.portfolio import run_portfolio, SIDE_BUY
+from core.ai_cache import AIDecisionCache, shared_cache
+
 class Backtester:
-    def __init__(self, initial_capital=10000000, fee_rate=0.00015, tax_rate=0.0020):
+    def __init__(self, initial_capital=10000000, fee_rate=0.00015, tax_rate=0.0020, use_cache=True, use_ai_cache=True,
+                 data_dir=None, use_store=True):
         self.initial_capital = initial_capital
         self.fee = fee_rate
         self.tax = tax_rate
         self.trade_log = [] 
         self.balance_history = []
 
+        # 데이터 폴더 (기본: 프로젝트 루트/database, 벤치마크 등에서 다른 폴더 지정 가능)
+        self.data_dir = data_dir or os.path.join(root_path, "database")
+
+        # 컬럼형 캐시 (jsonl 재파싱 방지, 원본이 바뀌면 자동 갱신)
+        self.use_cache = use_cache
+        self.cache = ColumnarCache(self.data_dir)
+
+        # 통합 시세 저장소 (연도별 Parquet, pyarrow가 없거나 아직 만들지 않았으면 jsonl만 사용)
+        self.use_store = use_store and MarketStore.available()
+        self._stores = {}
+
+        # AI 판단 캐시 (같은 종목/기간 재실행 시 LLM 재호출 방지)
+        self.use_ai_cache = use_ai_cache
+        self.ai_cache = shared_cache(os.path.join(self.data_dir, ".cache", "ai_decisions.sqlite")) if use_ai_cache else None
+
+    def store(self, timeframe='daily'):
+        """timeframe의 통합 저장소 (사용하지 않거나 아직 만들어지지 않았으면 None)"""
+        if not self.use_store: return None
+        store = self._stores.get(timeframe)
+        if store is None:
+            store = self._stores[timeframe] = MarketStore(self.data_dir, timeframe)
+        return store if store.manifest else None
+
     def load_data(self, code, timeframe='daily'):
-        """특정 종목의 데이터를 로드합니다."""
+        """특정 종목의 데이터를 로드합니다. (캐시 -> 통합 저장소 -> jsonl 순으로, 원본과 같은 버전일 때만 사용)"""
         folder_name = "02_daily" if timeframe == 'daily' else "03_minute"
-        file_path = os.path.join(root_path, "database", folder_name, f"{code}.jsonl")
-        
-        if not os.path.exists(file_path): return None
+        file_path = os.path.join(self.data_dir, folder_name, f"{code}.jsonl")
+        store = self.store(timeframe)
+
+        if not os.path.exists(file_path):
+            # jsonl 없이 저장소에만 있는 종목
+            entry = store.entry(code) if store else None
+            if entry is None: return None
+            return self._tag(store.load(code), code, folder_name, entry['stamp'])
+
+        # 파싱 전에 스탬프를 떠둬야, 읽는 도중 파일이 바뀌면 다음 호출에서 다시 만듦
         try:
-            df = pd.read_json(file_path, lines=True)
-            return df.sort_values('Date').reset_index(drop=True)
-        except: return None
+            stamp = ColumnarCache.source_stamp(file_path)
+        except OSError: return None
+
+        df = self.cache.load(folder_name, code, stamp) if self.use_cache else None
+        if df is None:
+            if store and store.entry(code, stamp):
+                df = store.load(code)
+            if df is None:
+                try:
+                    df = pd.read_json(file_path, lines=True)
+                    df = df.sort_values('Date').reset_index(drop=True)
+                except: return None
+
+            if self.use_cache:
+                self.cache.store(folder_name, code, df, stamp)
+
+        return self._tag(df, code, folder_name, stamp)
+
+    @staticmethod
+    def _tag(df, code, folder_name, stamp):
+        # 공용 지표 서비스(core.indicators)가 종목/데이터 버전별로 지표를 메모이즈하는 데 사용
+        if df is None: return None
+        df.attrs['code'] = str(code)
+        df.attrs['version'] = f"{folder_name}:{stamp['mtime_ns']}:{stamp['size']}"
+        return df
+
+    def iter_universe(self, codes, timeframe='daily', batch_size=500):
+        """
+        (code, DataFrame)을 codes 순서대로 돌려줍니다.
+        저장소가 원본과 같은 종목은 batch_size 종목씩 연도 파티션을 한 번에 읽고, 나머지는 load_data로 읽습니다.
+        """
+        store = self.store(timeframe)
+        if store is None:
+            for code in codes:
+                yield code, self.load_data(code, timeframe)
+            return
+
+        folder_name = store.folder_name
+        for code, df in store.iter_frames(codes, batch_size=batch_size):
+            file_path = os.path.join(store.source_dir, f"{code}.jsonl")
+            try:
+                stamp = ColumnarCache.source_stamp(file_path)
+            except OSError:
+                entry = store.entry(code)
+                stamp = entry['stamp'] if entry else None  # jsonl 없이 저장소에만 있는 종목
+            if df is None or stamp is None or not store.entry(code, stamp):
+                df = self.load_data(code, timeframe)
+            else:
+                df = self._tag(df, code, folder_name, stamp)
+            yield code, df
+
+    def load_cross_section(self, date, timeframe='daily', codes=None, columns=None):
+        """특정 날짜(분봉은 시각)의 전 종목 시세 (Code 컬럼 포함) - 저장소가 없으면 None"""
+        store = self.store(timeframe)
+        return store.cross_section(date, codes, columns) if store else None
 
     # ------------------------------------------------------------------
     # [기존 기능] 단일 종목 시뮬레이션
@@ -57,6 +148,11 @@ class Backtester:
                 print(f"❌ 전략 파일을 찾을 수 없습니다: {strategy_name}")
                 return None
 
+        # [1-1] 일괄 신호 계산
+        # 전략 모듈이 signals(df)를 제공하면 전 구간 신호를 한 번에 받아두고,
+        # 없으면 기존처럼 매일 calculate(df, i)를 호출합니다.
+        batch_signal, batch_reason = self._resolve_batch_signals(strategy_module, df, silent)
+
         # [2] AI 두뇌 준비
         ai_brain = None
         is_pure_ai = (strategy_name is None or strategy_name == "None")
@@ -71,143 +167,394 @@ class Backtester:
                 print("❌ AIStrategy 파일이 없어 AI를 사용할 수 없습니다.")
                 return None
 
-        cash = self.initial_capital
-        shares = 0
+        # [2-1] AI 호출 창구 (캐시 적중 시 analyze_market을 건너뜀)
+        ask_ai = self._make_ai_caller(ai_brain, df) if ai_brain else None
+        cache_before = self.ai_cache.stats() if self.ai_cache else None
+
         self.trade_log = []
         self.balance_history = []
 
         if not silent: print(f"🚀 시뮬레이션 시작...")
 
-        for i in range(len(df)):
-            today = df.iloc[i]
-            current_date_str = str(today['Date']).split('.')[0]
-            
-            if start_date and current_date_str < str(start_date): continue
-            if end_date and current_date_str > str(end_date): break
-
-            price = today['Close']
-            date = today['Date']
-            
-            total_value = cash + (shares * price)
-            self.balance_history.append({'Date': date, 'TotalValue': total_value})
-
-            # --- 신호 결정 ---
-            signal = 0 
-            reason = ""
-
-            if is_pure_ai:
-                if not silent: print(f".", end="", flush=True)
-                decision, pct, ai_reason = ai_brain.analyze_market(df, i)
-                if decision == "BUY":
-                    signal = 1
-                    reason = f"[AI단독] {ai_reason}"
-                elif decision == "SELL":
-                    signal = -1
-                    reason = f"[AI단독] {ai_reason}"
-
-            elif strategy_module:
-                try:
-                    signal, reason = strategy_module.calculate(df, i)
-                    if use_ai_filter and signal == 1:
-                        decision, pct, ai_reason = ai_brain.analyze_market(df, i)
+        # [3] 기간 필터: 정렬된 날짜에서 이진 탐색으로 시뮬레이션 구간(행 번호)을 한 번에 결정
+        #     구간 이전 데이터는 그대로 남아 있으므로 지표 워밍업에 사용됨
+        rows = self._resolve_window(df['Date'], start_date, end_date)
+        closes = df['Close'].to_numpy()[rows]
+        dates = df['Date'].iloc[rows].tolist()
+
+        # [4] 신호 결정 (포트폴리오 상태와 무관하므로 먼저 전부 계산)
+        if strategy_module and not is_pure_ai and batch_signal is not None:
+            # 일괄 신호: 구간만 잘라 쓰고, 하이브리드 모드면 매수 후보 봉만 AI에 물어봄
+            signals = batch_signal[rows].astype(np.int8)
+            reasons = batch_reason[rows].copy()
+            if use_ai_filter:
+                for k in np.flatnonzero(signals == 1).tolist():
+                    try:
+                        decision, pct, ai_reason = ask_ai(int(rows[k]), dates[k], reasons[k])
                         if decision == "BUY":
-                            reason = f"[AI승인] {reason} + {ai_reason}"
+                            reasons[k] = f"[AI승인] {reasons[k]} + {ai_reason}"
                         else:
-                            signal = 0 
-
-                except Exception as e:
-                    if not silent: print(f"🔥 전략 에러 ({date}): {e}")
-                    signal = 0
-
-            # --- 주문 실행 ---
-            if signal == 1 and cash > price:
-                buy_qty = int(cash // (price * (1 + self.fee)))
-                if buy_qty > 0:
-                    fee = (price * buy_qty) * self.fee
-                    cash -= (price * buy_qty) + fee
-                    shares += buy_qty
-                    self.trade_log.append({'Date': date, 'Type': 'BUY', 'Price': price, 'Qty': buy_qty, 'Reason': reason})
-                    if not silent: print(f"  🔴 BUY: {date} | {reason}")
-
-            elif signal == -1 and shares > 0:
-                amount = shares * price
-                fee = amount * self.fee
-                tax = amount * self.tax
-                cash += amount - (fee + tax)
-                self.trade_log.append({'Date': date, 'Type': 'SELL', 'Price': price, 'Qty': shares, 'Reason': reason})
-                shares = 0
-                if not silent: print(f"  🔵 SELL: {date} | {reason}")
-
-        final_value = cash + (shares * df.iloc[-1]['Close'])
+                            signals[k] = 0
+                    except Exception as e:
+                        if not silent: print(f"🔥 전략 에러 ({dates[k]}): {e}")
+                        signals[k] = 0
+        else:
+            signals = np.zeros(len(rows), dtype=np.int8)
+            reasons = np.full(len(rows), "", dtype=object)
+
+            for k, i in enumerate(rows.tolist()):
+                date = dates[k]
+                signal = 0 
+                reason = ""
+
+                if is_pure_ai:
+                    if not silent: print(f".", end="", flush=True)
+                    decision, pct, ai_reason = ask_ai(i, date, "")
+                    if decision == "BUY":
+                        signal = 1
+                        reason = f"[AI단독] {ai_reason}"
+                    elif decision == "SELL":
+                        signal = -1
+                        reason = f"[AI단독] {ai_reason}"
+
+                elif strategy_module:
+                    try:
+                        signal, reason = strategy_module.calculate(df, i)
+                        if use_ai_filter and signal == 1:
+                            decision, pct, ai_reason = ask_ai(i, date, reason)
+                            if decision == "BUY":
+                                reason = f"[AI승인] {reason} + {ai_reason}"
+                            else:
+                                signal = 0 
+
+                    except Exception as e:
+                        if not silent: print(f"🔥 전략 에러 ({date}): {e}")
+                        signal = 0
+
+                signals[k] = signal
+                reasons[k] = reason
+
+        # [5] 주문 실행 (NumPy 포트폴리오 커널)
+        book = run_portfolio(closes, signals, cash=self.initial_capital, shares=0,
+                             fee_rate=self.fee, tax_rate=self.tax)
+
+        for k, side, price, qty in zip(book['trade_idx'].tolist(), book['trade_side'].tolist(),
+                                       book['trade_price'].tolist(), book['trade_qty'].tolist()):
+            date = dates[k]
+            reason = reasons[k]
+            trade_type = 'BUY' if side == SIDE_BUY else 'SELL'
+            self.trade_log.append({'Date': date, 'Type': trade_type, 'Price': price, 'Qty': qty, 'Reason': reason})
+            if not silent:
+                if side == SIDE_BUY: print(f"  🔴 BUY: {date} | {reason}")
+                else: print(f"  🔵 SELL: {date} | {reason}")
+
+        self.balance_history = pd.DataFrame({'Date': dates, 'TotalValue': book['equity']})
+
+        # 최종 평가는 구간 마지막 봉의 종가 기준
+        cash, shares = book['cash'], book['shares']
+        last_close = closes[-1] if len(closes) else 0
+        final_value = cash + (shares * last_close)
         return_rate = ((final_value - self.initial_capital) / self.initial_capital) * 100
+
+        # 이번 실행의 AI 캐시 적중/미적중 (AI 미사용 시 None)
+        ai_cache_stats = None
+        if ask_ai and cache_before is not None:
+            self.ai_cache.flush()
+            after = self.ai_cache.stats()
+            ai_cache_stats = {'hits': after['hits'] - cache_before['hits'], 'misses': after['misses'] - cache_before['misses']}
+            if not silent: print(f"\n🗂️ AI 캐시: 적중 {ai_cache_stats['hits']}회 / 미적중 {ai_cache_stats['misses']}회")
         
         return {
             'final_balance': int(final_value),
             'return_rate': round(return_rate, 2),
             'trade_count': len(self.trade_log),
-            'history': pd.DataFrame(self.balance_history),
-            'trade_log': self.trade_log
+            'history': self.balance_history,
+            'trade_log': self.trade_log,
+            'ai_cache': ai_cache_stats
+        }
+
+    def _make_ai_caller(self, ai_brain, df):
+        """
+        ask_ai(i, bar_date, strategy_reason) -> (decision, pct, reason)
+        종목 코드(df.attrs['code'])를 알 수 없거나 캐시를 끈 경우에는 매번 analyze_market을 호출합니다.
+        """
+        symbol = df.attrs.get('code')
+        if self.ai_cache is None or symbol is None:
+            return lambda i, bar_date, strategy_reason: ai_brain.analyze_market(df, i)
+
+        model_id, prompt_hash = AIDecisionCache.model_signature(ai_brain)
+
+        def ask_ai(i, bar_date, strategy_reason):
+            key = AIDecisionCache.make_key(symbol, bar_date, model_id, prompt_hash, strategy_reason)
+            cached = self.ai_cache.get(key)
+            if cached is not None:
+                return cached
+            result = ai_brain.analyze_market(df, i)
+            self.ai_cache.put(key, result)
+            return result
+
+        return ask_ai
+
+    @staticmethod
+    def _resolve_window(dates, start_date=None, end_date=None):
+        """
+        시작일/종료일에 해당하는 행 번호 배열을 반환합니다. (양 끝 포함)
+        - 종료일이 날짜만 주어지면(시각 00:00) 그날의 분봉까지 모두 포함
+        - 날짜가 정렬돼 있으면 searchsorted로 O(log n), 아니면 마스크로 대체
+        """
+        n = len(dates)
+        if not start_date and not end_date:
+            return np.arange(n)
+
+        values = dates
+        if pd.api.types.is_integer_dtype(values):
+            values = values.astype(str) # 20240102 형태
+        index = pd.DatetimeIndex(pd.to_datetime(values))
+
+        start_ts = pd.Timestamp(start_date) if start_date else None
+        end_ts = pd.Timestamp(end_date) if end_date else None
+        end_side = 'right'
+        if end_ts is not None and end_ts == end_ts.normalize():
+            end_ts = end_ts + pd.Timedelta(days=1)
+            end_side = 'left'
+
+        if index.is_monotonic_increasing:
+            lo = index.searchsorted(start_ts, side='left') if start_ts is not None else 0
+            hi = index.searchsorted(end_ts, side=end_side) if end_ts is not None else n
+            return np.arange(lo, max(lo, hi))
+
+        mask = np.ones(n, dtype=bool)
+        if start_ts is not None: mask &= index >= start_ts
+        if end_ts is not None: mask &= (index < end_ts) if end_side == 'left' else (index <= end_ts)
+        return np.flatnonzero(mask)
+
+    def _resolve_batch_signals(self, strategy_module, df, silent=False):
+        """
+        전략의 signals(df) 계약을 확인하고 (signal 배열, reason 배열)을 반환합니다.
+        - signals가 없거나 실패하면 (None, None) -> calculate(df, i) 경로로 대체
+        """
+        if strategy_module is None or not hasattr(strategy_module, 'signals'):
+            return None, None
+
+        try:
+            signal, reason = strategy_module.signals(df)
+            signal = np.asarray(signal)
+            reason = np.asarray(reason, dtype=object)
+            if len(signal) != len(df) or len(reason) != len(df):
+                raise ValueError(f"신호 길이 불일치 ({len(signal)} != {len(df)})")
+            return signal, reason
+        except Exception as e:
+            if not silent: print(f"⚠️ 일괄 신호 계산 실패 -> calculate로 대체합니다: {e}")
+            return None, None
+
+    # ------------------------------------------------------------------
+    # [추가 기능] 청크 단위 스트리밍 백테스트 (대용량 분봉용)
+    # ------------------------------------------------------------------
+    def run_simulation_stream(self, code, strategy_name, timeframe='minute', start_date=None, end_date=None,
+                              chunk_rows=100000, keep_history=True, silent=False):
+        """
+        {code}.jsonl을 chunk_rows 줄씩 읽으면서 백테스트합니다. (파일 전체를 메모리에 올리지 않음)
+        - 청크 사이에는 전략의 LOOKBACK 만큼의 꼬리 봉과 현금/보유수량만 넘겨줌 -> 메모리 사용량 일정
+        - 파일은 날짜순으로 기록돼 있어야 함 (분봉 수집기가 시간순으로 append)
+        - 규칙 기반 전략만 지원 (AI 모드는 전체 이력이 필요하므로 run_simulation 사용)
+        - 지표 계산 시작점이 청크마다 달라 롤링 평균이 부동소수점 오차 수준으로 다를 수 있음
+        """
+        if not strategy_name or strategy_name == "None":
+            print("❌ 스트리밍 백테스트는 규칙 기반 전략만 지원합니다.")
+            return None
+
+        folder_name = "02_daily" if timeframe == 'daily' else "03_minute"
+        file_path = os.path.join(self.data_dir, folder_name, f"{code}.jsonl")
+        if not os.path.exists(file_path):
+            print(f"❌ 데이터 파일이 없습니다: {file_path}")
+            return None
+
+        try:
+            strategy_module = importlib.import_module(f"core.strategies.{strategy_name}")
+        except ModuleNotFoundError:
+            print(f"❌ 전략 파일을 찾을 수 없습니다: {strategy_name}")
+            return None
+        lookback = getattr(strategy_module, 'LOOKBACK', 121)
+
+        cash, shares = self.initial_capital, 0
+        last_close = 0
+        self.trade_log = []
+        history_dates, history_values = [], []
+        tail = None
+        chunk_count = 0
+        row_count = 0
+
+        if not silent: print(f"🚀 스트리밍 시뮬레이션 시작... ({code}, {chunk_rows:,}줄 단위)")
+
+        with pd.read_json(file_path, lines=True, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                chunk_count += 1
+                row_count += len(chunk)
+                chunk = chunk.reset_index(drop=True)
+                if not chunk['Date'].is_monotonic_increasing:
+                    chunk = chunk.sort_values('Date', kind='mergesort').reset_index(drop=True)
+
+                # 직전 청크의 꼬리를 붙여서 지표 워밍업 상태를 이어감
+                offset = 0 if tail is None else len(tail)
+                frame = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+                frame.attrs['memoize'] = False # 임시 프레임 -> 지표 서비스에 보관하지 않음
+
+                rows = self._resolve_window(chunk['Date'], start_date, end_date) + offset
+                if len(rows):
+                    batch_signal, batch_reason = self._resolve_batch_signals(strategy_module, frame, silent)
+                    if batch_signal is not None:
+                        signals = batch_signal[rows].astype(np.int8)
+                        reasons = batch_reason[rows]
+                    else:
+                        signals = np.zeros(len(rows), dtype=np.int8)
+                        reasons = np.full(len(rows), "", dtype=object)
+                        for k, i in enumerate(rows.tolist()):
+                            try:
+                                signals[k], reasons[k] = strategy_module.calculate(frame, i)
+                            except Exception as e:
+                                if not silent: print(f"🔥 전략 에러 ({frame['Date'].iat[i]}): {e}")
+
+                    closes = frame['Close'].to_numpy()[rows]
+                    book = run_portfolio(closes, signals, cash=cash, shares=shares,
+                                         fee_rate=self.fee, tax_rate=self.tax)
+                    cash, shares = book['cash'], book['shares']
+                    last_close = closes[-1]
+
+                    dates = frame['Date'].iloc[rows]
+                    for k, side, price, qty in zip(book['trade_idx'].tolist(), book['trade_side'].tolist(),
+                                                   book['trade_price'].tolist(), book['trade_qty'].tolist()):
+                        date = dates.iat[k]
+                        trade_type = 'BUY' if side == SIDE_BUY else 'SELL'
+                        self.trade_log.append({'Date': date, 'Type': trade_type, 'Price': price, 'Qty': qty, 'Reason': reasons[k]})
+                        if not silent: print(f"  {'🔴' if side == SIDE_BUY else '🔵'} {trade_type}: {date} | {reasons[k]}")
+
+                    if keep_history:
+                        history_dates.append(dates.to_numpy())
+                        history_values.append(book['equity'])
+
+                if not silent: print(f"  📦 청크 {chunk_count} 처리 완료 (누적 {row_count:,}줄)")
+
+                # 종료일을 지난 청크가 나오면 나머지는 읽지 않음
+                if end_date and len(self._resolve_window(chunk['Date'], None, end_date)) < len(chunk):
+                    break
+
+                tail = frame.iloc[-lookback:].reset_index(drop=True)
+
+        final_value = cash + (shares * last_close)
+        return_rate = ((final_value - self.initial_capital) / self.initial_capital) * 100
+
+        if keep_history and history_values:
+            self.balance_history = pd.DataFrame({'Date': np.concatenate(history_dates), 'TotalValue': np.concatenate(history_values)})
+        else:
+            self.balance_history = pd.DataFrame(columns=['Date', 'TotalValue'])
+
+        return {
+            'final_balance': int(final_value),
+            'return_rate': round(return_rate, 2),
+            'trade_count': len(self.trade_log),
+            'history': self.balance_history,
+            'trade_log': self.trade_log,
+            'ai_cache': None,
+            'chunks': chunk_count,
+            'rows': row_count
         }
 
     # ------------------------------------------------------------------
     # [추가 기능] 전체 종목 일괄 백테스트
     # ------------------------------------------------------------------
-    def run_all_simulation(self, timeframe='daily', strategy_name=None, use_ai_filter=False, start_date=None, end_date=None):
+    def simulate_code(self, code, timeframe='daily', strategy_name=None, use_ai_filter=False, start_date=None, end_date=None,
+                      df=None):
+        """
+        한 종목을 로드 -> 시뮬레이션하고 요약 행(dict)을 반환합니다.
+        df: 미리 읽어 둔 데이터 (없으면 load_data)
+        반환: (요약 행 또는 None, 상태 메시지)
+        """
+        if df is None:
+            df = self.load_data(code, timeframe)
+        if df is None:
+            return None, "❌ 데이터 로드 실패"
+
+        # 시뮬레이션 실행 (silent=True로 설정하여 개별 로그 숨김)
+        # 주의: AI 모드 사용 시 시간이 매우 오래 걸릴 수 있음
+        result = self.run_simulation(
+            df, 
+            strategy_name=strategy_name, 
+            use_ai_filter=use_ai_filter, 
+            start_date=start_date, 
+            end_date=end_date,
+            silent=True # 전체 돌릴 때는 개별 로그 끔
+        )
+
+        if not result:
+            return None, "⚠️ 결과 없음"
+
+        row = {
+            'Code': code,
+            'Return(%)': result['return_rate'],
+            'FinalBalance': result['final_balance'],
+            'Trades': result['trade_count']
+        }
+        if result.get('ai_cache'):
+            row['AI_Hits'] = result['ai_cache']['hits']
+            row['AI_Misses'] = result['ai_cache']['misses']
+        return row, f"✅ 수익률: {result['return_rate']}%"
+
+    def run_all_simulation(self, timeframe='daily', strategy_name=None, use_ai_filter=False, start_date=None, end_date=None,
+                           workers=1, chunksize=None, progress_callback=None):
         """
-        데이터베이스에 있는 모든 .jsonl 파일을 찾아서 순차적으로 백테스트를 돌리고,
+        데이터베이스에 있는 모든 .jsonl 파일을 찾아서 백테스트를 돌리고,
         결과를 요약해서 반환합니다.
+
+        :param workers: 1이면 순차 실행, 2 이상이면 프로세스 풀 병렬 실행 (None/0 -> CPU 코어 수)
+        :param chunksize: 병렬 실행 시 한 번에 워커에 넘길 종목 수 (None -> 자동)
+        :param progress_callback: callback(done, total, code, row) - 종목 하나가 끝날 때마다 호출
+                                  (row는 요약 dict, 실패 시 None). Streamlit 진행바 연결용.
         """
-        # 1. 파일 목록 찾기
+        # 1. 파일 목록 찾기 (jsonl 없이 통합 저장소에만 있는 종목 포함)
         folder_name = "02_daily" if timeframe == 'daily' else "03_minute"
-        dir_path = os.path.join(root_path, "database", folder_name)
+        dir_path = os.path.join(self.data_dir, folder_name)
+        store = self.store(timeframe)
         
-        if not os.path.exists(dir_path):
+        if not os.path.exists(dir_path) and store is None:
             print(f"❌ 데이터 폴더를 찾을 수 없습니다: {dir_path}")
             return None
 
-        files = [f for f in os.listdir(dir_path) if f.endswith('.jsonl')]
-        total_files = len(files)
+        # 실행 모드와 무관하게 결과 순서가 같도록 종목코드 순으로 정렬
+        codes = {f[:-6] for f in os.listdir(dir_path) if f.endswith('.jsonl')} if os.path.exists(dir_path) else set()
+        if store is not None:
+            codes.update(store.codes())
+        codes = sorted(codes)
+        total_files = len(codes)
+
+        if not workers:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, total_files or 1))
         
         print(f"📂 총 {total_files}개의 종목을 발견했습니다. 전체 백테스트를 시작합니다...")
-        print(f"⚙️ 설정: 전략={strategy_name}, AI필터={use_ai_filter}, 기간={start_date}~{end_date}")
+        print(f"⚙️ 설정: 전략={strategy_name}, AI필터={use_ai_filter}, 기간={start_date}~{end_date}, 워커={workers}")
         print("-" * 60)
 
         all_results = []
+        sim_args = (timeframe, strategy_name, use_ai_filter, start_date, end_date)
 
-        # 2. 반복 실행
-        for idx, filename in enumerate(files):
-            code = filename.replace('.jsonl', '')
-            
-            # 진행률 표시
-            print(f"[{idx+1}/{total_files}] {code} 테스트 중...", end=" ", flush=True)
+        # 2. 반복 실행 (순차 / 병렬 모두 종목 순서대로 결과를 받음)
+        if workers == 1:
+            outcomes = self._run_sequential(codes, sim_args, timeframe)
+        else:
+            if chunksize is None:
+                chunksize = max(1, total_files // (workers * 4))
+            outcomes = self._run_parallel(codes, sim_args, workers, chunksize)
 
-            # 데이터 로드
-            df = self.load_data(code, timeframe)
-            if df is None:
-                print("❌ 데이터 로드 실패")
-                continue
-
-            # 시뮬레이션 실행 (silent=True로 설정하여 개별 로그 숨김)
-            # 주의: AI 모드 사용 시 시간이 매우 오래 걸릴 수 있음
-            result = self.run_simulation(
-                df, 
-                strategy_name=strategy_name, 
-                use_ai_filter=use_ai_filter, 
-                start_date=start_date, 
-                end_date=end_date,
-                silent=True # 전체 돌릴 때는 개별 로그 끔
-            )
-
-            if result:
-                print(f"✅ 수익률: {result['return_rate']}%")
-                all_results.append({
-                    'Code': code,
-                    'Return(%)': result['return_rate'],
-                    'FinalBalance': result['final_balance'],
-                    'Trades': result['trade_count']
-                })
-            else:
-                print("⚠️ 결과 없음")
+        try:
+            for idx, (code, row, status) in enumerate(outcomes):
+                # 진행률 표시
+                print(f"[{idx+1}/{total_files}] {code} 테스트 중... {status}", flush=True)
+                if row:
+                    all_results.append(row)
+                if progress_callback:
+                    progress_callback(idx + 1, total_files, code, row)
+        finally:
+            outcomes.close()
 
         # 3. 결과 집계
         if not all_results:
@@ -224,5 +571,74 @@ class Backtester:
         print(f"평균 수익률: {summary_df['Return(%)'].mean():.2f}%")
         print(f"최고 수익률: {summary_df.iloc[0]['Code']} ({summary_df.iloc[0]['Return(%)']}%)")
         print(f"최저 수익률: {summary_df.iloc[-1]['Code']} ({summary_df.iloc[-1]['Return(%)']}%)")
+        if 'AI_Hits' in summary_df.columns:
+            print(f"AI 캐시: 적중 {int(summary_df['AI_Hits'].sum())}회 / 미적중 {int(summary_df['AI_Misses'].sum())}회")
         
-        return summary_df
\ No newline at end of file
+        return summary_df
+
+
+    def _run_sequential(self, codes, sim_args, timeframe):
+        # 저장소가 있으면 종목 파일을 하나씩 여는 대신 묶음 단위로 연도 파티션을 순차로 읽음
+        for code, df in self.iter_universe(codes, timeframe):
+            yield _simulate_safely(self, code, sim_args, df)
+
+    def _run_parallel(self, codes, sim_args, workers, chunksize):
+        """
+        프로세스 풀로 실행해 종목 순서대로 결과를 돌려줍니다.
+        워커 프로세스가 죽으면(BrokenProcessPool) 이 프로세스에서 대신 실행하지 않고
+            1. 아직 끝나지 않은 첫 종목을 워커 하나짜리 새 풀에서 따로 실행 -> 또 죽으면 그 종목만 실패로 보고
+            2. 나머지 종목은 새 풀에 다시 제출
+        (세그폴트/메모리 부족으로 죽는 종목이 메인(Streamlit) 프로세스까지 죽이지 않음)
+        """
+        settings = (self.initial_capital, self.fee, self.tax, self.use_cache, self.use_ai_cache, self.data_dir,
+                    self.use_store)
+        pending = list(codes)
+        while pending:
+            done = 0
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for outcome in executor.map(_simulate_worker, [(settings, code, sim_args) for code in pending],
+                                                chunksize=chunksize):
+                        done += 1
+                        yield outcome
+                return
+            except BrokenProcessPool as e:
+                pending = pending[done:]
+                print(f"⚠️ 워커 프로세스가 비정상 종료되었습니다 ({e}). {pending[0]} 종목을 따로 확인하고 "
+                      f"남은 {len(pending) - 1}개 종목은 새 풀에서 이어서 실행합니다.")
+            yield self._run_isolated(settings, pending.pop(0), sim_args)
+
+    @staticmethod
+    def _run_isolated(settings, code, sim_args):
+        """워커 하나짜리 풀에서 한 종목만 실행 -> 워커가 또 죽으면 이 종목을 실패로 보고"""
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                return executor.submit(_simulate_worker, (settings, code, sim_args)).result()
+        except BrokenProcessPool:
+            print(f"❌ {code} 실행 중 워커 프로세스가 비정상 종료되어 이 종목은 제외합니다.")
+            return code, None, "💥 워커 비정상 종료 (제외)"
+
+
+# ------------------------------------------------------------------
+# [병렬 실행용] 프로세스 풀 워커 함수 (pickle 가능하도록 모듈 최상위에 둠)
+# ------------------------------------------------------------------
+def _simulate_safely(tester, code, sim_args, df=None):
+    """종목 하나에서 예외가 나도 전체 실행이 멈추지 않도록 감쌉니다."""
+    try:
+        row, status = tester.simulate_code(code, *sim_args, df=df)
+    except Exception as e:
+        row, status = None, f"🔥 에러: {e}"
+    return code, row, status
+
+# 워커 프로세스마다 Backtester 하나를 재사용 (종목마다 로더/저장소/캐시 객체를 새로 만들지 않음)
+_worker_tester = None  # (settings, Backtester)
+
+def _simulate_worker(payload):
+    global _worker_tester
+    settings, code, sim_args = payload
+    if _worker_tester is None or _worker_tester[0] != settings:
+        initial_capital, fee_rate, tax_rate, use_cache, use_ai_cache, data_dir, use_store = settings
+        tester = Backtester(initial_capital=initial_capital, fee_rate=fee_rate, tax_rate=tax_rate,
+                            use_cache=use_cache, use_ai_cache=use_ai_cache, data_dir=data_dir, use_store=use_store)
+        _worker_tester = (settings, tester)
+    return _simulate_safely(_worker_tester[1], code, sim_args)
\ No newline at end of file
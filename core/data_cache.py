@@ -0,0 +1,226 @@
+"""
+[컬럼형 데이터 캐시]
+- database/02_daily, 03_minute 의 {code}.jsonl 을 컬럼별 .npy 파일로 변환해 보관합니다.
+- 원본 파일의 수정시각(mtime)/크기가 바뀌면 캐시를 버리고 다시 만듭니다.
+- 숫자/날짜 컬럼은 메모리 맵(mmap, copy-on-write)으로 읽어 복사 없이 DataFrame을 만듭니다.
+  (JSON 파싱/정렬 비용이 사라지고, 실제로 접근한 페이지만 읽힘 / 수정하면 그 페이지만 프로세스 내에서 복사)
+
+구조: database/.cache/{폴더명}/{code}/
+        ├── meta.json        (원본 스탬프, 컬럼 순서, 저장 방식)
+        ├── c000.npy         (meta.json의 columns 순서대로 한 컬럼씩)
+        ├── c001.npy ...
+
+append_jsonl / write_jsonl_atomic / read_last_row: 원본 jsonl에 봉을 쓰는 공용 함수 (실시간 봉 집계, 과거 데이터 다운로더)
+"""
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+META_FILE = 'meta.json'
+
+
+class ColumnarCache:
+    def __init__(self, db_dir, cache_dirname='.cache'):
+        self.db_dir = db_dir
+        self.cache_root = os.path.join(db_dir, cache_dirname)
+
+    # -----------------------------------------------------------
+    # 경로 / 스탬프
+    # -----------------------------------------------------------
+    def _entry_dir(self, folder_name, code):
+        return os.path.join(self.cache_root, folder_name, str(code))
+
+    @staticmethod
+    def source_stamp(source_path):
+        """원본 파일의 변경 여부를 판단할 스탬프 (mtime 나노초 + 바이트 크기)"""
+        st = os.stat(source_path)
+        return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+    @staticmethod
+    def _column_file(col_idx):
+        # 컬럼명에 파일명으로 못 쓰는 문자가 있을 수 있어 순번으로 저장
+        return f"c{col_idx:03d}.npy"
+
+    # -----------------------------------------------------------
+    # 읽기
+    # -----------------------------------------------------------
+    def load(self, folder_name, code, stamp):
+        """
+        캐시가 유효하면 DataFrame을, 없거나 원본이 바뀌었으면 None을 반환합니다.
+        :param stamp: source_stamp(원본 경로) 결과
+        """
+        entry = self._entry_dir(folder_name, code)
+        meta_path = os.path.join(entry, META_FILE)
+        if not os.path.exists(meta_path): return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_VERSION: return None
+            if meta.get('source') != stamp: return None
+
+            data = {}
+            for idx, col in enumerate(meta['columns']):
+                pickled = col in meta.get('pickled', [])
+                path = os.path.join(entry, self._column_file(idx))
+                if pickled:
+                    data[col] = np.load(path, allow_pickle=True)
+                else:
+                    # 'c': 쓰기 가능한 사본 매핑 -> 호출 쪽에서 값을 바꿔도 캐시 파일은 그대로
+                    data[col] = np.load(path, mmap_mode='c')
+            # copy=False: 컬럼 배열을 그대로 감싸야 mmap이 의미가 있음 (기본값은 dict 입력을 복사)
+            return pd.DataFrame(data, columns=meta['columns'], copy=False)
+        except Exception:
+            return None
+
+    # -----------------------------------------------------------
+    # 쓰기 (고유한 임시 폴더에 만든 뒤 os.replace -> 읽는 쪽이 반쯤 쓴 캐시를 보지 않고,
+    #       여러 프로세스가 같은 종목을 동시에 다시 만들어도 서로의 파일이 섞이지 않음)
+    # -----------------------------------------------------------
+    def store(self, folder_name, code, df, stamp):
+        entry = self._entry_dir(folder_name, code)
+        parent = os.path.dirname(entry)
+        tmp_entry = None
+
+        try:
+            os.makedirs(parent, exist_ok=True)
+            tmp_entry = tempfile.mkdtemp(prefix=f".{code}.tmp", dir=parent)
+
+            columns = [str(c) for c in df.columns]
+            pickled = []
+            for idx, col in enumerate(df.columns):
+                arr = df[col].to_numpy()
+                path = os.path.join(tmp_entry, self._column_file(idx))
+                if arr.dtype.kind in 'biufcmM':
+                    np.save(path, arr)
+                else:
+                    # 문자열 등 object 컬럼은 mmap 불가 -> pickle 저장
+                    np.save(path, np.asarray(arr, dtype=object), allow_pickle=True)
+                    pickled.append(columns[idx])
+
+            meta = {
+                'version': CACHE_VERSION,
+                'source': stamp,
+                'columns': columns,
+                'pickled': pickled,
+                'rows': len(df)
+            }
+            # meta.json을 마지막에 써야 완성된 캐시로 인정됨
+            with open(os.path.join(tmp_entry, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            self._install(tmp_entry, entry)
+            return True
+        except Exception as e:
+            print(f"⚠️ [Cache] {code} 캐시 저장 실패: {e}")
+            if tmp_entry: shutil.rmtree(tmp_entry, ignore_errors=True)
+            return False
+
+    @staticmethod
+    def _install(tmp_entry, entry):
+        """완성된 임시 폴더를 entry 자리에 넣음 (기존 entry는 다른 이름으로 치운 뒤 지움)"""
+        try:
+            os.replace(tmp_entry, entry)  # entry가 없으면 한 번에 끝남
+            return
+        except OSError:
+            pass
+        trash = tempfile.mkdtemp(prefix=f".{os.path.basename(entry)}.old", dir=os.path.dirname(entry))
+        try:
+            os.replace(entry, os.path.join(trash, 'entry'))
+        except OSError:
+            pass  # 다른 프로세스가 먼저 치움
+        try:
+            os.replace(tmp_entry, entry)
+        except OSError:
+            # 그 사이 다른 프로세스가 같은 원본으로 만든 캐시를 넣음 -> 그쪽을 사용
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def invalidate(self, folder_name, code):
+        shutil.rmtree(self._entry_dir(folder_name, code), ignore_errors=True)
+
+
+# -----------------------------------------------------------
+# jsonl 원본 파일 (database/02_daily, 03_minute) 추가 기록
+# -----------------------------------------------------------
+def row_time(value):
+    """jsonl의 Date 값('2025-01-02', '2025-01-02 09:01:00', pandas epoch ms)을 비교 가능한 Timestamp로"""
+    if isinstance(value, (int, float)):
+        return pd.Timestamp(value, unit='ms')
+    return pd.Timestamp(value)
+
+def read_last_row(path):
+    """jsonl 파일의 마지막 완전한 줄을 dict로 (없으면 None) - 파일 끝에서 거꾸로 조금만 읽음"""
+    if not os.path.exists(path): return None
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        block = 4096
+        while end > 0:
+            start = max(0, end - block)
+            f.seek(start)
+            lines = f.read(end - start).splitlines()
+            # 맨 앞 줄은 잘렸을 수 있으므로 파일 처음부터 읽은 경우가 아니면 제외
+            candidates = lines if start == 0 else lines[1:]
+            for line in reversed(candidates):
+                try:
+                    return json.loads(line)
+                except ValueError:
+                    continue
+            if start == 0: return None
+            block *= 4
+    return None
+
+def _repair_tail(fd):
+    """기록 도중 중단되어 줄바꿈 없이 끝난 마지막 줄을 잘라냄"""
+    size = os.lseek(fd, 0, os.SEEK_END)
+    if size == 0: return
+    pos = size
+    while pos > 0:
+        step = min(4096, pos)
+        os.lseek(fd, pos - step, os.SEEK_SET)
+        chunk = os.read(fd, step)
+        if pos == size and chunk.endswith(b"\n"): return
+        cut = chunk.rfind(b"\n")
+        if cut >= 0:
+            os.ftruncate(fd, pos - step + cut + 1)
+            return
+        pos -= step
+    os.ftruncate(fd, 0)
+
+def write_jsonl_atomic(path, rows):
+    """rows 전체로 파일을 새로 씀 (임시 파일 -> fsync -> os.replace, 읽는 쪽은 이전/새 내용만 봄)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        f.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def append_jsonl(path, rows, fsync=True):
+    """
+    rows(dict 목록)를 jsonl 파일 끝에 한 번의 write로 추가합니다.
+    - 잘린 마지막 줄이 있으면 먼저 잘라내고 이어 씀 -> 파일은 항상 완전한 줄로만 구성
+    - 파일이 바뀌면 ColumnarCache 스탬프(mtime/크기)가 달라져 다음 load_data에서 캐시가 다시 만들어짐
+    :return: 기록한 바이트 수
+    """
+    if not rows: return 0
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode('utf-8')
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        _repair_tail(fd)
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    return len(data)
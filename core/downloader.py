@@ -0,0 +1,296 @@
+"""
+[과거 차트 다운로더]
+- 키움 REST 차트 조회로 database/02_daily, 03_minute 의 {code}.jsonl 을 채웁니다.
+    일봉: ka10081 (주식일봉차트조회)   분봉: ka10080 (주식분봉차트조회, 1분)
+- kiwoom_login이 등록한 모드별 TokenProvider의 토큰을 그대로 사용 (다운로드 중 만료되면 자동 재발급)
+- 여러 종목을 동시에 받되, 호출 수는 주문/계좌 조회와 같은 RequestScheduler 한도를 나눠 씀 (주문이 항상 우선)
+- 증분: 파일 마지막 줄의 Date 이후 봉만 받음 (응답이 최신순이므로 이미 가진 날짜가 나오면 연속 조회 중단)
+    - 기존 파일: 새 봉만 한 번의 append (잘린 마지막 줄은 먼저 정리)
+    - 새 파일: 임시 파일에 쓴 뒤 os.replace
+    - 장중에는 아직 끝나지 않은 오늘 일봉 / 진행 중인 분봉은 받지 않음 (다음 실행에서 확정된 봉으로 추가)
+
+사용 예:
+    python -m core.downloader --mode 2                                  # 02_daily에 있는 전 종목 일봉 갱신
+    python -m core.downloader --codes 005930 000660 --timeframe daily minute
+    python -m core.downloader --host http://127.0.0.1:8089 --codes 005930   # 로컬 시뮬레이터 (simulator.server)
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+import aiohttp
+
+current_file_path = os.path.abspath(__file__)
+root_path = os.path.dirname(os.path.dirname(current_file_path))  # core -> Project_Root
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from core.data_cache import append_jsonl, write_jsonl_atomic, read_last_row, row_time
+from core.request_scheduler import get_request_scheduler
+from core.trader.events import _num
+
+try:
+    from config import get_token_provider
+except ImportError:
+    get_token_provider = None
+
+# timeframe -> (폴더, api-id, 응답 목록 키, Date 형식)
+TIMEFRAMES = {
+    'daily': ('02_daily', 'ka10081', 'stk_dt_pole_chart_qry', '%Y-%m-%d'),
+    'minute': ('03_minute', 'ka10080', 'stk_min_pole_chart_qry', '%Y-%m-%d %H:%M:%S')
+}
+MARKET_CLOSE = (15, 40)  # 이 시각 이후면 오늘 일봉을 확정된 봉으로 봄
+
+
+def parse_daily(row):
+    """ka10081 응답 한 행 -> jsonl 한 줄 (가격 부호 제거)"""
+    dt = str(row.get('dt', '')).strip()
+    close = _num(row.get('cur_prc'))
+    if len(dt) != 8 or close <= 0:
+        return None
+    return {'Date': f"{dt[:4]}-{dt[4:6]}-{dt[6:]}", 'Open': _num(row.get('open_pric')) or close,
+            'High': _num(row.get('high_pric')) or close, 'Low': _num(row.get('low_pric')) or close,
+            'Close': close, 'Volume': _num(row.get('trde_qty'))}
+
+def parse_minute(row):
+    """ka10080 응답 한 행 -> jsonl 한 줄"""
+    tm = str(row.get('cntr_tm', '')).strip()
+    close = _num(row.get('cur_prc'))
+    if len(tm) != 14 or close <= 0:
+        return None
+    return {'Date': f"{tm[:4]}-{tm[4:6]}-{tm[6:8]} {tm[8:10]}:{tm[10:12]}:{tm[12:]}",
+            'Open': _num(row.get('open_pric')) or close, 'High': _num(row.get('high_pric')) or close,
+            'Low': _num(row.get('low_pric')) or close, 'Close': close, 'Volume': _num(row.get('trde_qty'))}
+
+PARSERS = {'daily': parse_daily, 'minute': parse_minute}
+
+
+def list_codes(data_dir, timeframe='daily'):
+    """이미 받아 둔 종목 코드 목록 (data_dir/02_daily/*.jsonl)"""
+    folder = os.path.join(data_dir, TIMEFRAMES[timeframe][0])
+    if not os.path.isdir(folder): return []
+    return sorted(name[:-6] for name in os.listdir(folder) if name.endswith('.jsonl'))
+
+
+class ChartDownloader:
+    ENDPOINT = '/api/dostk/chart'
+
+    def __init__(self, data_dir=None, mode='2', host=None, token_provider=None, scheduler=None,
+                 concurrency=8, timeout=10.0, max_retries=3, max_pages=None):
+        self.data_dir = data_dir or os.path.join(root_path, "database")
+        if host:
+            self.host = host.rstrip('/')
+        elif mode == '1':
+            self.host = 'https://api.kiwoom.com'
+        else:
+            self.host = 'https://mockapi.kiwoom.com'
+
+        if token_provider is None and get_token_provider is not None:
+            token_provider = get_token_provider(mode)
+        self.token_provider = token_provider
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler(mode)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_pages = max_pages      # 종목당 연속 조회 상한 (None이면 끝까지)
+
+        self.requests = 0
+        self.retries = 0
+
+    # -----------------------------------------------------------
+    # HTTP
+    # -----------------------------------------------------------
+    async def _request(self, session, api_id, body, next_key=None):
+        """차트 조회 한 페이지 -> (응답 JSON, 다음 키 또는 None), 실패하면 RuntimeError"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            # 토큰 발급/갱신이 필요해도 이벤트 루프를 막지 않음
+            token = await self.token_provider.get_token_async() if self.token_provider is not None else None
+            headers = {
+                'Content-Type': 'application/json;charset=UTF-8',
+                'authorization': f'Bearer {token}',
+                'api-id': api_id,
+                'cont-yn': 'Y' if next_key else 'N',
+                'next-key': next_key or ''
+            }
+            await self.scheduler.acquire_async(api_id)
+            self.requests += 1
+            try:
+                async with session.post(f"{self.host}{self.ENDPOINT}", headers=headers, json=body) as res:
+                    if res.status == 200:
+                        data = await res.json(content_type=None)
+                        more = res.headers.get('cont-yn') == 'Y' and res.headers.get('next-key')
+                        return data, (res.headers.get('next-key') if more else None)
+                    last_error = f"HTTP {res.status}: {(await res.text())[:200]}"
+                    if res.status == 429:
+                        self.scheduler.penalize(api_id=api_id)
+                    elif res.status < 500:
+                        break  # 인증 실패 등은 재시도해도 같음
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(0.2 * (2 ** attempt))
+        raise RuntimeError(last_error)
+
+    def _body(self, timeframe, code, now):
+        if timeframe == 'daily':
+            return {'stk_cd': code, 'base_dt': now.strftime('%Y%m%d'), 'upd_stkpc_tp': '1'}
+        return {'stk_cd': code, 'tic_scope': '1', 'upd_stkpc_tp': '1'}
+
+    @staticmethod
+    def _cutoff(timeframe, now):
+        """이 시각 이상인 봉은 아직 진행 중이므로 받지 않음"""
+        if timeframe == 'daily':
+            today = datetime(now.year, now.month, now.day)
+            return today + timedelta(days=1) if (now.hour, now.minute) >= MARKET_CLOSE else today
+        return now.replace(second=0, microsecond=0)
+
+    # -----------------------------------------------------------
+    # 종목 단위
+    # -----------------------------------------------------------
+    async def fetch(self, session, code, timeframe, since=None, now=None):
+        """
+        since(Timestamp) 이후의 확정된 봉 목록 (오래된 순) -> (rows, 조회 페이지 수)
+        since까지 닿기 전에 max_pages에서 멈추면 RuntimeError (이어 붙이면 파일 중간이 영영 비므로)
+        """
+        folder, api_id, key, fmt = TIMEFRAMES[timeframe]
+        parse = PARSERS[timeframe]
+        now = now or datetime.now()
+        # 같은 형식의 문자열로 맞춰 두고 행마다 날짜 파싱 없이 문자열 비교
+        cutoff = self._cutoff(timeframe, now).strftime(fmt)
+        since = since.strftime(fmt) if since is not None else None
+
+        rows, pages, next_key = [], 0, None
+        while True:
+            data, next_key = await self._request(session, api_id, self._body(timeframe, code, now), next_key)
+            pages += 1
+            reached = False
+            for item in data.get(key) or []:
+                row = parse(item)
+                if row is None: continue
+                date = row['Date']
+                if since is not None and date <= since:
+                    reached = True  # 최신순이므로 이후 행은 모두 이미 가진 봉
+                    break
+                if date < cutoff:
+                    rows.append(row)
+            if reached or not next_key:
+                break
+            if self.max_pages and pages >= self.max_pages:
+                if since is not None:
+                    raise RuntimeError(f"max_pages({self.max_pages}) 안에 마지막 저장 봉({since})까지 닿지 못함 "
+                                       f"-> 기록하지 않음 (max_pages를 늘려 다시 실행)")
+                break  # 새 파일: 최근 max_pages만큼만 받음
+
+        rows.reverse()
+        # 페이지 경계에서 겹친 행 제거 (같은 Date는 한 번만)
+        unique, last = [], None
+        for row in rows:
+            if row['Date'] != last:
+                unique.append(row)
+                last = row['Date']
+        return unique, pages
+
+    async def update(self, session, code, timeframe='daily', now=None):
+        """한 종목 파일을 최신 상태로 -> 결과 dict"""
+        folder = TIMEFRAMES[timeframe][0]
+        path = os.path.join(self.data_dir, folder, f"{code}.jsonl")
+        started = time.perf_counter()
+        try:
+            last = await asyncio.to_thread(read_last_row, path)
+            since = row_time(last['Date']) if last and 'Date' in last else None
+            rows, pages = await self.fetch(session, code, timeframe, since, now)
+            if rows:
+                if since is None:
+                    await asyncio.to_thread(write_jsonl_atomic, path, rows)
+                else:
+                    await asyncio.to_thread(append_jsonl, path, rows)
+            return {'code': code, 'timeframe': timeframe, 'status': 'ok', 'added': len(rows), 'pages': pages,
+                    'new_file': since is None, 'elapsed_s': round(time.perf_counter() - started, 3)}
+        except Exception as e:
+            return {'code': code, 'timeframe': timeframe, 'status': 'error', 'error': str(e), 'added': 0,
+                    'pages': 0, 'elapsed_s': round(time.perf_counter() - started, 3)}
+
+    # -----------------------------------------------------------
+    # 전체
+    # -----------------------------------------------------------
+    async def run(self, codes, timeframes=('daily',), now=None, progress=None):
+        """여러 종목 x timeframe을 동시에(concurrency개) 갱신 -> 요약 dict"""
+        sem = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        started = time.perf_counter()
+        done = [0]
+        jobs = [(code, tf) for code in codes for tf in timeframes]
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def one(code, tf):
+                async with sem:
+                    result = await self.update(session, code, tf, now)
+                done[0] += 1
+                if progress: progress(done[0], len(jobs), result)
+                return result
+
+            results = await asyncio.gather(*(one(code, tf) for code, tf in jobs))
+
+        elapsed = time.perf_counter() - started
+        failed = [r for r in results if r['status'] != 'ok']
+        return {
+            'jobs': len(jobs),
+            'ok': len(jobs) - len(failed),
+            'failed': len(failed),
+            'rows_added': sum(r['added'] for r in results),
+            'requests': self.requests,
+            'retries': self.retries,
+            'elapsed_s': round(elapsed, 3),
+            'errors': {f"{r['code']}/{r['timeframe']}": r['error'] for r in failed[:20]},
+            'results': results
+        }
+
+    def download(self, codes, timeframes=('daily',), now=None, progress=None):
+        """run()의 동기 버전"""
+        return asyncio.run(self.run(codes, timeframes, now, progress))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="키움 차트 데이터 증분 다운로더")
+    parser.add_argument('--mode', default='2', choices=['1', '2'], help="1: 실전, 2: 모의")
+    parser.add_argument('--codes', nargs='*', default=None, help="종목 코드 (없으면 02_daily에 있는 전 종목)")
+    parser.add_argument('--timeframe', nargs='+', default=['daily'], choices=list(TIMEFRAMES))
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--host', default=None, help="REST 주소 (로컬 시뮬레이터 등)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--max-pages', type=int, default=None)
+    parser.add_argument('--out', default=None, help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    downloader = ChartDownloader(args.data_dir, args.mode, args.host, concurrency=args.concurrency,
+                                 max_pages=args.max_pages)
+    codes = args.codes or list_codes(downloader.data_dir)
+    if not codes:
+        print("❌ 받을 종목이 없습니다. --codes로 지정하세요.")
+        return None
+
+    def progress(done, total, result):
+        if result['status'] != 'ok':
+            print(f"⚠️ [{done}/{total}] {result['code']} {result['timeframe']}: {result['error']}")
+        elif done % 100 == 0 or done == total:
+            print(f"⏳ [{done}/{total}] 진행 중...")
+
+    print(f"📥 {len(codes)}종목 x {args.timeframe} 다운로드 시작 ({downloader.host})")
+    report = downloader.download(codes, tuple(args.timeframe), progress=progress)
+    print(f"✅ 완료: {report['ok']}/{report['jobs']} 성공, {report['rows_added']:,}봉 추가, "
+          f"요청 {report['requests']}회, {report['elapsed_s']}초")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+[공용 지표 서비스]
+- 전략들이 DataFrame에 컬럼을 직접 추가하는 대신, 여기서 지표 배열을 받아 씁니다.
+- (종목, 데이터 버전, 구간, 원본 컬럼 내용, 지표, 컬럼, 기간) 단위로 메모이즈 -> 여러 전략이 같은 지표를 한 번만 계산
+  (attrs는 copy/슬라이싱/reset_index에도 따라오므로 처음/마지막 Date와 원본 컬럼 요약값까지 키에 넣음
+   -> 같은 종목의 다른 구간이나 수정된 사본이 이전 결과를 받지 않음)
+  키는 DataFrame 객체별로 한 번만 만듦 (봉마다 calculate(df, i)를 불러도 조회는 O(1), 조회 후 제자리 수정은 감지하지 않음)
+- LRU 방식으로 최대 보관 개수 또는 바이트 예산을 넘으면 오래된 지표부터 버립니다.
+
+종목/버전 정보는 Backtester.load_data가 df.attrs['code'], df.attrs['version']에 기록합니다.
+정보가 없는 DataFrame(직접 만든 / 수정된 데이터일 수 있음)과 df.attrs['memoize'] = False 인
+임시 DataFrame(스트리밍 청크 등)은 계산만 하고 보관하지 않습니다.
+"""
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict, Counter
+
+import numpy as np
+from pandas.util import hash_pandas_object
+
+
+# -----------------------------------------------------------
+# 지표 계산 함수 (이름 -> 계산식)
+# -----------------------------------------------------------
+def _sma(df, column, window):
+    return df[column].rolling(window=window).mean()
+
+def _rolling_min(df, column, window):
+    return df[column].rolling(window=window).min()
+
+def _rolling_max(df, column, window):
+    return df[column].rolling(window=window).max()
+
+def _pct_change(df, column, window):
+    # Day_Chg (등락률 %) -> window=1
+    return df[column].pct_change(periods=window) * 100
+
+INDICATORS = {
+    'sma': _sma,
+    'rolling_min': _rolling_min,
+    'rolling_max': _rolling_max,
+    'pct_change': _pct_change
+}
+
+
+class IndicatorService:
+    def __init__(self, maxsize=256, max_bytes=256 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._store = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._frame_keys = {}  # id(df) -> (weakref, {column: 키}) - DataFrame이 사라지면 같이 삭제
+
+        # 통계 (계산 횟수는 지표 이름별)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.computed = Counter()
+
+    @staticmethod
+    def data_key(df):
+        """DataFrame을 (종목, 데이터 버전, 행 수, 처음/마지막 Date) 키로 변환 -> 출처 정보가 없으면 None (보관하지 않음)"""
+        if df.attrs.get('memoize') is False: return None
+        code = df.attrs.get('code')
+        version = df.attrs.get('version')
+        if code is None or version is None: return None
+        n = len(df)
+        if not n: return (code, version, 0, None, None)
+        if 'Date' in df.columns:
+            first, last = df['Date'].iat[0], df['Date'].iat[-1]
+        else:
+            first, last = df.index[0], df.index[-1]
+        return (code, version, n, first, last)
+
+    @staticmethod
+    def _content_key(df, column):
+        """원본 컬럼 값의 요약값 (태그를 단 뒤 값만 바꾼 사본 구분용, 계산보다 훨씬 가벼움)"""
+        values = df[column].to_numpy()
+        if values.dtype.hasobject:
+            values = hash_pandas_object(df[column], index=False).to_numpy()
+        values = np.ascontiguousarray(values)
+        return hashlib.blake2b(values.view(np.uint8), digest_size=16).digest()
+
+    def _frame_key(self, df, column):
+        """(data_key, 컬럼 요약값) - 같은 DataFrame 객체는 다시 계산하지 않음"""
+        frame_id = id(df)
+        entry = self._frame_keys.get(frame_id)
+        if entry is None or entry[0]() is not df:
+            # 콜백은 GC 도중 불릴 수 있으므로 락 없이 (dict.pop은 원자적)
+            ref = weakref.ref(df, lambda _, frames=self._frame_keys, k=frame_id: frames.pop(k, None))
+            entry = self._frame_keys[frame_id] = (ref, {})
+        keys = entry[1]
+        if column not in keys:
+            data_key = self.data_key(df)
+            keys[column] = None if data_key is None else (data_key, self._content_key(df, column))
+        return keys[column]
+
+    def get(self, df, name, window=1, column='Close'):
+        """
+        지표 배열(읽기 전용 NumPy)을 반환합니다. 길이는 len(df)와 같습니다.
+        :param name: 'sma' | 'rolling_min' | 'rolling_max' | 'pct_change'
+        """
+        frame_key = self._frame_key(df, column)
+        if frame_key is None:
+            values = INDICATORS[name](df, column, window).to_numpy(dtype=np.float64)
+            values.setflags(write=False)
+            return values
+
+        key = (frame_key, name, column, window)
+
+        with self._lock:
+            values = self._store.get(key)
+            if values is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return values
+
+        values = INDICATORS[name](df, column, window).to_numpy(dtype=np.float64)
+        values.setflags(write=False) # 여러 전략이 공유하므로 수정 금지
+
+        with self._lock:
+            self.misses += 1
+            self.computed[name] += 1
+            old = self._store.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._store[key] = values
+            self._bytes += values.nbytes
+            while len(self._store) > 1 and (len(self._store) > self.maxsize or self._bytes > self.max_bytes):
+                _, evicted = self._store.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self._frame_keys.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._store),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'computed': dict(self.computed)
+            }
+
+
+# 프로세스 공용 인스턴스 (전략 모듈들이 공유)
+indicators = IndicatorService()
+
+def get_indicator(df, name, window=1, column='Close'):
+    return indicators.get(df, name, window, column)
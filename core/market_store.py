@@ -0,0 +1,321 @@
+"""
+[통합 시세 저장소]
+- database/02_daily, 03_minute 의 종목별 jsonl을 연도별 Parquet 파티션 하나로 모읍니다. (pyarrow 필요, 없으면 사용 안 함)
+    database/.store/{폴더명}/year=2024/part-0.parquet   (Code, Date 순 정렬, 행 그룹별 통계 포함)
+    database/.store/{폴더명}/_manifest.json             (종목별 원본 스탬프 / 행 수 / 기간 / 내용 요약값)
+- 읽기는 필요한 컬럼만(column projection), 조건은 파일/행 그룹 단위로 걸러서(predicate pushdown) 읽음
+    load(code)              한 종목 (Backtester.load_data가 jsonl 파싱 대신 사용)
+    iter_frames(codes)      여러 종목을 묶음 단위로 (run_all_simulation: 파일 수천 개 대신 연도 파티션 몇 개)
+    cross_section(date)     특정 날짜의 전 종목 (해당 연도 파티션 하나만 읽음)
+- sync(): 원본 스탬프가 바뀐 종목만 다시 읽고, 그 종목의 데이터가 있는 연도 파티션만 다시 씀
+  (증분 append면 마지막 연도만) -> 파티션 파일은 임시 파일에 쓴 뒤 os.replace
+    - 스키마(정수 가격 등)로 변환되지 않는 종목은 건너뜀 (기존 데이터 유지, Backtester는 원본 jsonl을 읽음)
+- 원본 jsonl이 기준 데이터이고 저장소는 언제든 다시 만들 수 있는 파생 데이터입니다.
+
+사용 예:
+    python -m core.market_store --timeframe daily          # 생성 / 증분 동기화
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = pq = None
+
+current_file_path = os.path.abspath(__file__)
+root_path = os.path.dirname(os.path.dirname(current_file_path))  # core -> Project_Root
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from core.data_cache import ColumnarCache
+
+STORE_VERSION = 1
+STORE_DIRNAME = '.store'
+MANIFEST_FILE = '_manifest.json'  # '_'로 시작 -> 데이터셋 탐색에서 제외
+PART_FILE = 'part-0.parquet'
+COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+# 읽은 Date를 pd.read_json(jsonl)과 같은 단위로 맞춤 (pandas 2: ns, 3: us)
+DATE_DTYPE = pd.to_datetime(pd.Series(['2000-01-01'])).dtype
+
+
+def folder_of(timeframe):
+    return "02_daily" if timeframe == 'daily' else "03_minute"
+
+
+def _to_pandas(table):
+    df = table.to_pandas()
+    df['Date'] = df['Date'].astype(DATE_DTYPE)
+    return df
+
+
+def _digest(df):
+    """행 내용 요약값 (이전 동기화 때의 행이 그대로 남아 있는지 비교용)"""
+    hashed = pd.util.hash_pandas_object(df[COLUMNS], index=False).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+class MarketStore:
+    def __init__(self, data_dir, timeframe='daily', row_group_size=16384):
+        if pa is None:
+            raise ImportError("MarketStore에는 pyarrow가 필요합니다. (pip install pyarrow)")
+        self.data_dir = data_dir
+        self.timeframe = timeframe
+        self.folder_name = folder_of(timeframe)
+        self.source_dir = os.path.join(data_dir, self.folder_name)
+        self.root = os.path.join(data_dir, STORE_DIRNAME, self.folder_name)
+        self.row_group_size = row_group_size
+        self.cache = ColumnarCache(data_dir)  # 원본을 다시 읽을 때 컬럼형 캐시가 유효하면 파싱 생략
+        self._manifest = None
+        self._manifest_mtime = None
+        self._dataset_obj = None
+        self._dataset_mtime = None
+
+    @staticmethod
+    def available():
+        return pa is not None
+
+    # -----------------------------------------------------------
+    # manifest
+    # -----------------------------------------------------------
+    @property
+    def manifest(self):
+        """종목별 {'stamp', 'rows', 'first', 'last', 'years', 'digest'} (파일이 바뀌었으면 다시 읽음)"""
+        path = os.path.join(self.root, MANIFEST_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._manifest, self._manifest_mtime = {}, None
+            return self._manifest
+        if mtime != self._manifest_mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._manifest = data.get('codes', {}) if data.get('version') == STORE_VERSION else {}
+            except (OSError, ValueError):
+                self._manifest = {}
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _write_manifest(self, codes):
+        path = os.path.join(self.root, MANIFEST_FILE)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'timeframe': self.timeframe, 'codes': codes}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._manifest_mtime = None
+
+    def codes(self):
+        return sorted(self.manifest)
+
+    def entry(self, code, stamp=None):
+        """저장소에 있는 종목 정보 (stamp를 주면 원본과 같을 때만, 아니면 None)"""
+        info = self.manifest.get(str(code))
+        if info is None: return None
+        if stamp is not None and info.get('stamp') != stamp: return None
+        return info
+
+    # -----------------------------------------------------------
+    # 생성 / 동기화
+    # -----------------------------------------------------------
+    def _source_codes(self):
+        if not os.path.isdir(self.source_dir): return {}
+        stamps = {}
+        for name in os.listdir(self.source_dir):
+            if name.endswith('.jsonl'):
+                try:
+                    stamps[name[:-6]] = ColumnarCache.source_stamp(os.path.join(self.source_dir, name))
+                except OSError:
+                    continue
+        return stamps
+
+    def _read_source(self, code, stamp):
+        df = self.cache.load(self.folder_name, code, stamp)
+        if df is None:
+            df = pd.read_json(os.path.join(self.source_dir, f"{code}.jsonl"), lines=True)
+            df = df.sort_values('Date').reset_index(drop=True)
+        df = df[COLUMNS].copy()
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    def sync(self, verbose=True):
+        """원본이 바뀐 종목만 반영 -> 요약 dict"""
+        started = time.perf_counter()
+        sources = self._source_codes()
+        manifest = dict(self.manifest)
+
+        changed = {code: stamp for code, stamp in sources.items()
+                   if manifest.get(code, {}).get('stamp') != stamp}
+        removed = [code for code in manifest if code not in sources]
+        if not changed and not removed:
+            return {'changed': 0, 'removed': 0, 'years_rewritten': [], 'elapsed_s': round(time.perf_counter() - started, 3)}
+
+        # 1. 바뀐 종목의 새 데이터를 모으고 다시 써야 할 연도 결정
+        #    (스키마 변환까지 종목별로 -> 소수점 가격 같은 잘못된 값이 있는 종목만 건너뜀)
+        tables, touched = [], set()
+        for code, stamp in list(changed.items()):
+            try:
+                df = self._read_source(code, stamp)
+                digest = _digest(df)
+                df.insert(0, 'Code', code)
+                table = pa.Table.from_pandas(df, schema=self._schema(), preserve_index=False)
+            except Exception as e:
+                print(f"⚠️ [Store] {code} 원본 읽기/변환 실패 (기존 데이터 유지): {e}")
+                del changed[code]
+                continue
+            years = sorted(set(df['Date'].dt.year.tolist()))
+            old = manifest.get(code)
+            if old and self._is_append(old, df):
+                touched.update(y for y in years if y >= int(old['last'][:4]))
+            else:
+                touched.update(years)
+                touched.update(old['years'] if old else [])
+            tables.append(table)
+            manifest[code] = {
+                'stamp': stamp, 'rows': len(df), 'years': years,
+                'first': str(df['Date'].iat[0]) if len(df) else None,
+                'last': str(df['Date'].iat[-1]) if len(df) else None,
+                'digest': digest
+            }
+        for code in removed:
+            touched.update(manifest.pop(code)['years'])
+
+        # 2. 해당 연도 파티션만 다시 씀 (바뀐/삭제된 종목 행을 빼고 새 행을 넣음)
+        fresh = pa.concat_tables(tables) if tables else self._schema().empty_table()
+        fresh_years = pc.year(fresh['Date'])
+        replaced = sorted(set(changed) | set(removed))
+        for year in sorted(touched):
+            self._rewrite_year(year, replaced, fresh.filter(pc.equal(fresh_years, year)))
+
+        self._write_manifest(manifest)
+        report = {'changed': len(changed), 'removed': len(removed), 'years_rewritten': sorted(touched),
+                  'elapsed_s': round(time.perf_counter() - started, 3)}
+        if verbose:
+            print(f"✅ [Store] {self.folder_name}: {report['changed']}종목 반영 / {report['removed']}종목 삭제, 연도 {report['years_rewritten']} 재작성 "
+                  f"({report['elapsed_s']}초)")
+        return report
+
+    @staticmethod
+    def _is_append(old, df):
+        """
+        원본이 뒤에 행만 추가된 경우인지 (이전 행 수만큼의 앞부분 내용이 그대로)
+        아니면(중간 수정/삭제, 요약값이 없는 이전 manifest) 그 종목의 모든 연도를 다시 씀
+        """
+        n = old.get('rows', 0)
+        if not (0 < n <= len(df)) or old.get('last') != str(df['Date'].iat[n - 1]):
+            return False
+        return old.get('digest') is not None and old['digest'] == _digest(df.iloc[:n])
+
+    def _rewrite_year(self, year, replaced, fresh):
+        part_dir = os.path.join(self.root, f"year={year}")
+        path = os.path.join(part_dir, PART_FILE)
+        tables = [fresh]
+        if os.path.exists(path):
+            tables.append(pq.read_table(path, filters=~ds.field('Code').isin(replaced), schema=self._schema()))
+
+        table = pa.concat_tables(tables)
+        if table.num_rows == 0:
+            if os.path.exists(path): os.remove(path)
+            return
+        table = table.sort_by([('Code', 'ascending'), ('Date', 'ascending')])
+
+        os.makedirs(part_dir, exist_ok=True)
+        tmp = os.path.join(part_dir, f".{PART_FILE}.tmp")  # '.'으로 시작 -> 데이터셋 탐색에서 제외
+        pq.write_table(table, tmp, row_group_size=self.row_group_size, compression='zstd')
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _schema(hive=False):
+        fields = [('Code', pa.string()), ('Date', pa.timestamp('us')), ('Open', pa.int64()), ('High', pa.int64()),
+                  ('Low', pa.int64()), ('Close', pa.int64()), ('Volume', pa.int64())]
+        return pa.schema(fields + [('year', pa.int32())] if hive else fields)
+
+    # -----------------------------------------------------------
+    # 읽기
+    # -----------------------------------------------------------
+    def _dataset(self):
+        """파티션 목록은 manifest가 바뀔 때만 다시 탐색"""
+        if not self.manifest: return None
+        if self._dataset_obj is None or self._dataset_mtime != self._manifest_mtime:
+            self._dataset_obj = ds.dataset(self.root, format='parquet', partitioning='hive', schema=self._schema(hive=True))
+            self._dataset_mtime = self._manifest_mtime
+        return self._dataset_obj
+
+    @staticmethod
+    def _date_filter(start=None, end=None):
+        expr = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            expr = (ds.field('year') >= start.year) & (ds.field('Date') >= pa.scalar(start.to_pydatetime(), pa.timestamp('us')))
+        if end is not None:
+            end = pd.Timestamp(end)
+            cond = (ds.field('year') <= end.year) & (ds.field('Date') <= pa.scalar(end.to_pydatetime(), pa.timestamp('us')))
+            expr = cond if expr is None else expr & cond
+        return expr
+
+    def scan(self, codes=None, start=None, end=None, columns=None):
+        """조건에 맞는 행만 읽은 pyarrow Table (Code, Date 순)"""
+        dataset = self._dataset()
+        if dataset is None: return None
+        expr = self._date_filter(start, end)
+        if codes is not None:
+            cond = ds.field('Code').isin([str(c) for c in codes])
+            expr = cond if expr is None else expr & cond
+        columns = list(dict.fromkeys(['Code', 'Date'] + list(columns or COLUMNS[1:])))
+        table = dataset.to_table(columns=columns, filter=expr)
+        return table.sort_by([('Code', 'ascending'), ('Date', 'ascending')])
+
+    def load(self, code, start=None, end=None, columns=None):
+        """한 종목 DataFrame (Date, Open, High, Low, Close, Volume) - 없으면 None"""
+        table = self.scan([code], start, end, columns)
+        if table is None or table.num_rows == 0: return None
+        return _to_pandas(table.drop(['Code']))
+
+    def iter_frames(self, codes, batch_size=500, start=None, end=None, columns=None):
+        """(code, DataFrame)을 codes 순서대로 - batch_size 종목마다 연도 파티션을 한 번씩만 읽음"""
+        codes = [str(c) for c in codes]
+        for k in range(0, len(codes), batch_size):
+            batch = codes[k:k + batch_size]
+            table = self.scan(batch, start, end, columns)
+            frames = {}
+            if table is not None and table.num_rows:
+                code_col = table['Code'].to_numpy(zero_copy_only=False)
+                df = _to_pandas(table.drop(['Code']))
+                bounds = np.flatnonzero(code_col[1:] != code_col[:-1]) + 1
+                starts = np.concatenate(([0], bounds))
+                ends = np.concatenate((bounds, [len(code_col)]))
+                for s, e in zip(starts.tolist(), ends.tolist()):
+                    frames[code_col[s]] = df.iloc[s:e].reset_index(drop=True)
+            for code in batch:
+                yield code, frames.get(code)
+
+    def cross_section(self, date, codes=None, columns=None):
+        """특정 날짜(또는 분봉 시각)의 전 종목 DataFrame (Code가 첫 컬럼)"""
+        table = self.scan(codes, date, date, columns)
+        if table is None: return pd.DataFrame(columns=['Code'] + COLUMNS)
+        return _to_pandas(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="종목별 jsonl -> 연도별 Parquet 저장소 생성/동기화")
+    parser.add_argument('--timeframe', default='daily', choices=['daily', 'minute'])
+    parser.add_argument('--data-dir', default=os.path.join(root_path, "database"))
+    args = parser.parse_args(argv)
+    if not MarketStore.available():
+        print("❌ pyarrow가 설치되어 있지 않습니다. (pip install pyarrow)")
+        return None
+    return MarketStore(args.data_dir, args.timeframe).sync()
+
+
+if __name__ == "__main__":
+    main()
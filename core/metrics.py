@@ -0,0 +1,171 @@
+"""
+[지연시간 측정 도구]
+- LatencyRecorder: 최근 N개 샘플을 보관하고 p50/p90/p99 등을 계산
+- LatencyHistogram: 로그 구간(버킷) 히스토그램 - 메모리 고정, 합치기/파일 저장이 쉬움
+- LoopLagMonitor: asyncio 이벤트 루프가 얼마나 막혔는지(sleep이 늦게 깨어난 시간) 측정
+"""
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class LatencyRecorder:
+    """초 단위 샘플을 받아 밀리초 단위 요약을 제공합니다. (스레드 안전)"""
+    def __init__(self, maxlen=10000):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            if seconds > self.max: self.max = seconds
+
+    def time(self):
+        """with recorder.time(): ... 형태로 구간 시간 측정"""
+        return _Timer(self)
+
+    def summary(self):
+        with self._lock:
+            data = sorted(self._samples)
+            count, peak = self.count, self.max
+        if not data:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+
+        def pick(pct):
+            return data[min(len(data) - 1, int(round(pct / 100.0 * (len(data) - 1))))] * 1000
+
+        return {
+            'count': count,
+            'mean_ms': round(sum(data) / len(data) * 1000, 3),
+            'p50_ms': round(pick(50), 3),
+            'p90_ms': round(pick(90), 3),
+            'p99_ms': round(pick(99), 3),
+            'max_ms': round(peak * 1000, 3)
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
+            self.max = 0.0
+
+
+class _Timer:
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(time.perf_counter() - self.start)
+        return False
+
+
+class LatencyHistogram:
+    """
+    10us부터 2^(1/4)배씩 커지는 구간에 초 단위 샘플을 셉니다. (약 10us ~ 40s, 구간당 오차 ±9%)
+    샘플을 보관하지 않으므로 오래 켜 두어도 메모리가 늘지 않습니다.
+    """
+    BASE = 1e-5
+    STEPS_PER_DOUBLING = 4
+    N_BUCKETS = 88
+
+    def __init__(self):
+        self.counts = [0] * self.N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def bucket_of(cls, seconds):
+        if seconds <= cls.BASE: return 0
+        k = int(math.log2(seconds / cls.BASE) * cls.STEPS_PER_DOUBLING) + 1
+        return min(k, cls.N_BUCKETS - 1)
+
+    @classmethod
+    def upper_bound(cls, k):
+        """k번째 구간의 상한 (초)"""
+        return cls.BASE * 2 ** (k / cls.STEPS_PER_DOUBLING)
+
+    def record(self, seconds):
+        k = self.bucket_of(seconds)
+        with self._lock:
+            self.counts[k] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max: self.max = seconds
+
+    def percentile(self, pct):
+        """구간 상한 기준 백분위 (초)"""
+        if self.count == 0: return 0.0
+        target = pct / 100.0 * self.count
+        seen = 0
+        for k, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= target:
+                return min(self.upper_bound(k), self.max)
+        return self.max
+
+    def summary(self):
+        with self._lock:
+            if self.count == 0:
+                return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+            return {
+                'count': self.count,
+                'mean_ms': round(self.total / self.count * 1000, 3),
+                'p50_ms': round(self.percentile(50) * 1000, 3),
+                'p90_ms': round(self.percentile(90) * 1000, 3),
+                'p99_ms': round(self.percentile(99) * 1000, 3),
+                'max_ms': round(self.max * 1000, 3)
+            }
+
+    def buckets(self):
+        """비어 있지 않은 구간만 [(상한 ms, 개수), ...]"""
+        with self._lock:
+            return [(round(self.upper_bound(k) * 1000, 4), c) for k, c in enumerate(self.counts) if c]
+
+    def to_dict(self):
+        return {**self.summary(), 'buckets': self.buckets()}
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * self.N_BUCKETS
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+
+class LoopLagMonitor:
+    """
+    interval마다 깨어나도록 sleep한 뒤 실제로 늦게 깨어난 시간을 기록합니다.
+    주문 전송 같은 동기 호출이 루프를 막으면 이 값이 그만큼 커집니다.
+
+    사용: monitor = LoopLagMonitor(); asyncio.create_task(monitor.run())
+    """
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.lag = LatencyRecorder()
+        self._running = False
+
+    async def run(self):
+        self._running = True
+        loop = asyncio.get_running_loop()
+        while self._running:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag.record(max(0.0, loop.time() - start - self.interval))
+
+    def stop(self):
+        self._running = False
+
+    def summary(self):
+        return self.lag.summary()
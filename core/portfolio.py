@@ -0,0 +1,70 @@
+"""
+[포트폴리오 커널]
+- 가격 배열과 신호 배열(1: 매수, -1: 매도, 0: 관망)만으로 현금/보유수량/평가금액을 계산합니다.
+- Backtester.run_simulation의 매매 규칙(전량 매수, 전량 매도, 수수료/세금)과 결과가 완전히 같습니다.
+- pandas 행 접근 없이 미리 할당한 NumPy 배열에 결과를 채워 넣습니다.
+"""
+import numpy as np
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+def run_portfolio(prices, signals, cash, shares=0, fee_rate=0.00015, tax_rate=0.0020):
+    """
+    :param prices: 종가 배열 (len n)
+    :param signals: 신호 배열 (len n)
+    :param cash: 시작 현금
+    :param shares: 시작 보유 수량 (구간을 나눠 이어서 돌릴 때 사용)
+    :return: dict
+        - equity: 각 봉의 주문 실행 전 평가금액 (float64, len n)
+        - trade_idx / trade_side / trade_price / trade_qty: 체결 내역 배열 (len = 체결 수)
+        - cash / shares: 마지막 봉 이후의 현금, 보유 수량
+    """
+    prices = np.asarray(prices)
+    n = len(prices)
+
+    equity = np.empty(n, dtype=np.float64)
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_price = np.empty(n, dtype=prices.dtype)
+    trade_qty = np.empty(n, dtype=np.int64)
+    k = 0
+
+    # 파이썬 스칼라 리스트로 바꿔서 순회 (NumPy 스칼라 박싱 비용 제거, 연산 결과는 동일)
+    px = prices.tolist()
+    sg = np.asarray(signals).tolist()
+    buy_cost = 1 + fee_rate
+
+    for i in range(n):
+        price = px[i]
+        equity[i] = cash + (shares * price)
+        signal = sg[i]
+
+        if signal == 1 and cash > price:
+            buy_qty = int(cash // (price * buy_cost))
+            if buy_qty > 0:
+                fee = (price * buy_qty) * fee_rate
+                cash -= (price * buy_qty) + fee
+                shares += buy_qty
+                trade_idx[k], trade_side[k], trade_price[k], trade_qty[k] = i, SIDE_BUY, price, buy_qty
+                k += 1
+
+        elif signal == -1 and shares > 0:
+            amount = shares * price
+            fee = amount * fee_rate
+            tax = amount * tax_rate
+            cash += amount - (fee + tax)
+            trade_idx[k], trade_side[k], trade_price[k], trade_qty[k] = i, SIDE_SELL, price, shares
+            k += 1
+            shares = 0
+
+    return {
+        'equity': equity,
+        'trade_idx': trade_idx[:k],
+        'trade_side': trade_side[:k],
+        'trade_price': trade_price[:k],
+        'trade_qty': trade_qty[:k],
+        'cash': cash,
+        'shares': shares
+    }
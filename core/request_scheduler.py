@@ -0,0 +1,217 @@
+"""
+[REST 요청 스케줄러]
+- 키움 REST API의 초당 호출 제한을 클라이언트에서 먼저 지켜 거부(429)를 막습니다.
+- api-id별 토큰 버킷 + (선택) 앱 전체 공용 버킷
+- 우선순위: 주문(kt10000/kt10001)이 조회보다 항상 먼저 토큰을 가져감 (엄격한 우선순위)
+- 대기열 길이 / 대기 시간을 기록해 stats()로 제공
+"""
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+
+from core.metrics import LatencyRecorder
+
+ORDER_API_IDS = frozenset({'kt10000', 'kt10001', 'kt10002', 'kt10003'})  # 매수/매도/정정/취소
+PRIORITY_ORDER = 0
+PRIORITY_QUERY = 1
+_CLASS_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_QUERY: 'query'}
+
+
+class TokenBucket:
+    """초당 rate개, 최대 burst개까지 모아 둘 수 있는 토큰 버킷 (rate=None이면 무제한)"""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = float(burst if burst is not None else (rate or 1))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if self.rate is None: return
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self, now):
+        """토큰 1개를 쓰려면 몇 초 기다려야 하는지 (0이면 즉시 가능)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.rate is None: return 0.0
+        self._refill(now)
+        if self.tokens >= 1.0: return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def consume(self, now):
+        if self.rate is None: return
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def block(self, now, seconds):
+        """서버가 제한을 알려온 경우: seconds 동안 토큰을 내주지 않고 버킷을 비움"""
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.stamp = max(self.stamp, self.blocked_until)
+
+
+class RequestScheduler:
+    """
+    모든 REST 호출이 전송 직전에 acquire(api_id) / await acquire_async(api_id)를 거칩니다.
+
+    :param limits: {api_id: (초당 횟수, 버스트)} - api-id별 제한
+    :param default_limit: limits에 없는 api-id의 제한 (None이면 api-id별 제한 없음)
+    :param global_limit: 모든 api-id가 함께 쓰는 제한 (None이면 없음)
+    """
+    def __init__(self, limits=None, default_limit=(5.0, 5), global_limit=(5.0, 5)):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._buckets = {}
+        self._global = TokenBucket(*global_limit) if global_limit else TokenBucket(None)
+
+        self._cond = threading.Condition()
+        self._waiting = []  # (priority, seq, api_id) 힙
+        self._seq = itertools.count()
+
+        self.wait_time = {name: LatencyRecorder() for name in _CLASS_NAMES.values()}
+        self.granted = {name: 0 for name in _CLASS_NAMES.values()}
+        self.max_depth = {name: 0 for name in _CLASS_NAMES.values()}
+        self.penalties = 0
+
+    # -----------------------------------------------------------
+    # 우선순위 / 버킷
+    # -----------------------------------------------------------
+    @staticmethod
+    def priority_of(api_id):
+        return PRIORITY_ORDER if api_id in ORDER_API_IDS else PRIORITY_QUERY
+
+    def _bucket(self, api_id):
+        bucket = self._buckets.get(api_id)
+        if bucket is None:
+            limit = self.limits.get(api_id, self.default_limit)
+            bucket = TokenBucket(*limit) if limit else TokenBucket(None)
+            self._buckets[api_id] = bucket
+        return bucket
+
+    def _depth(self, priority):
+        return sum(1 for p, _, _ in self._waiting if p == priority)
+
+    def _enqueue(self, api_id, priority):
+        ticket = (priority, next(self._seq), api_id)
+        heapq.heappush(self._waiting, ticket)
+        name = _CLASS_NAMES.get(priority, 'query')
+        self.max_depth[name] = max(self.max_depth[name], self._depth(priority))
+        return ticket
+
+    def _dequeue(self, ticket):
+        try:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+        except ValueError:
+            pass
+
+    def _poll(self, ticket):
+        """
+        (락 안에서 호출) 토큰을 받을 수 있으면 소비하고 0.0을 반환.
+        아니면 기다릴 시간(초)을, 더 높은 우선순위/앞선 요청 때문에 막혔으면 None을 반환
+        """
+        priority, seq, api_id = ticket
+        for p, s, a in self._waiting:
+            if p < priority or (p == priority and s < seq and a == api_id):
+                return None
+
+        now = time.monotonic()
+        bucket = self._bucket(api_id)
+        wait = max(bucket.delay(now), self._global.delay(now))
+        if wait > 0:
+            return wait
+        # 같은 우선순위에서는 앞선 요청이 공용 버킷을 먼저 가져감
+        for p, s, a in self._waiting:
+            if p == priority and s < seq and self._bucket(a).delay(now) <= 0:
+                return None
+
+        bucket.consume(now)
+        self._global.consume(now)
+        self._dequeue(ticket)
+        self.granted[_CLASS_NAMES.get(priority, 'query')] += 1
+        return 0.0
+
+    def _granted(self, priority, started):
+        self.wait_time[_CLASS_NAMES.get(priority, 'query')].record(time.perf_counter() - started)
+
+    # -----------------------------------------------------------
+    # 획득
+    # -----------------------------------------------------------
+    def acquire(self, api_id, priority=None):
+        """호출 가능해질 때까지 현재 스레드를 대기시킵니다."""
+        priority = self.priority_of(api_id) if priority is None else priority
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue(api_id, priority)
+            try:
+                while True:
+                    wait = self._poll(ticket)
+                    if wait == 0.0: break
+                    # 우선순위에 막힌 경우도 신호 유실에 대비해 짧게 깨어나 다시 확인
+                    self._cond.wait(0.05 if wait is None else wait)
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+            finally:
+                self._cond.notify_all()
+        self._granted(priority, started)
+
+    async def acquire_async(self, api_id, priority=None, poll_interval=0.002):
+        """이벤트 루프를 막지 않는 acquire (대기는 asyncio.sleep)"""
+        priority = self.priority_of(api_id) if priority is None else priority
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue(api_id, priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._poll(ticket)
+                    if wait == 0.0:
+                        self._cond.notify_all()
+                        break
+                await asyncio.sleep(poll_interval if wait is None else wait)
+        except BaseException:
+            with self._cond:
+                self._dequeue(ticket)
+                self._cond.notify_all()
+            raise
+        self._granted(priority, started)
+
+    def penalize(self, seconds=1.0, api_id=None):
+        """서버가 호출 제한 초과(HTTP 429)를 알려오면 seconds 동안 전송을 멈춤"""
+        with self._cond:
+            now = time.monotonic()
+            (self._bucket(api_id) if api_id else self._global).block(now, seconds)
+            self.penalties += 1
+            self._cond.notify_all()
+
+    # -----------------------------------------------------------
+    # 지표
+    # -----------------------------------------------------------
+    def stats(self):
+        with self._cond:
+            depth = {name: self._depth(p) for p, name in _CLASS_NAMES.items()}
+        return {
+            'queue_depth': depth,
+            'max_queue_depth': dict(self.max_depth),
+            'granted': dict(self.granted),
+            'wait': {name: rec.summary() for name, rec in self.wait_time.items()},
+            'penalties': self.penalties
+        }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_request_scheduler(mode='2'):
+    """모드('1' 실전 / '2' 모의)별 공용 스케줄러 -> 주문/계좌 조회가 같은 한도를 나눠 씀"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(mode)
+        if scheduler is None:
+            scheduler = RequestScheduler()
+            _schedulers[mode] = scheduler
+        return scheduler
@@ -1,19 +1,24 @@
 import pandas as pd 
+import numpy as np
+from core.indicators import get_indicator
+from core.streaming_indicators import RollingMean, SignalStream
+
+# 신호 계산에 필요한 과거 봉 수 (스트리밍 백테스트에서 청크 사이에 넘겨줄 꼬리 길이)
+LOOKBACK = 21
 
 def calculate(df, i):
     # 1. 데이터 부족하면 관망
     if i < 20: return 0, ""
 
-    # 지표 직접 계산
-    if 'SMA5' not in df.columns:
-        df['SMA5'] = df['Close'].rolling(window=5).mean()
-        df['SMA20'] = df['Close'].rolling(window=20).mean()
+    # 지표는 공용 지표 서비스에서 받아옴 (종목/데이터 버전별 1회 계산, df에 컬럼 추가 안 함)
+    sma5 = get_indicator(df, 'sma', 5)
+    sma20 = get_indicator(df, 'sma', 20)
 
     # 데이터 가져오기
-    today_sma5 = df['SMA5'].iloc[i]
-    today_sma20 = df['SMA20'].iloc[i]
-    prev_sma5 = df['SMA5'].iloc[i-1]
-    prev_sma20 = df['SMA20'].iloc[i-1]
+    today_sma5 = sma5[i]
+    today_sma20 = sma20[i]
+    prev_sma5 = sma5[i-1]
+    prev_sma20 = sma20[i-1]
     
     # [디버깅용 로그] 매일매일 수치를 출력해봄 (너무 많으면 나중에 주석 처리)
     # print(f"날짜:{df.iloc[i]['Date']} | 5일선:{int(today_sma5)} | 20일선:{int(today_sma20)}")
@@ -33,4 +38,84 @@ def calculate(df, i):
         reason = "데드크로스 (5<20)"
         print(f"💧 [Cases_v1] 매도 신호 발견! ({df.iloc[i]['Date']})") # <--- 이게 뜨는지 확인!
 
-    return signal, reason
\ No newline at end of file
+    return signal, reason
+
+def signals(df):
+    """
+    [일괄 신호 계산] calculate(df, i)를 전 구간에 대해 한 번에 수행합니다.
+    반환: (signal 배열, reason 배열) - 길이는 len(df), i번째 값은 calculate(df, i)와 동일
+    """
+    sma5 = get_indicator(df, 'sma', 5)
+    sma20 = get_indicator(df, 'sma', 20)
+    prev_sma5 = np.concatenate(([np.nan], sma5[:-1]))
+    prev_sma20 = np.concatenate(([np.nan], sma20[:-1]))
+
+    # 데이터 부족 구간(i < 20)은 관망
+    warm = np.arange(len(df)) >= 20
+
+    golden = (sma5 > sma20) & (prev_sma5 <= prev_sma20) & warm
+    dead = (sma5 < sma20) & (prev_sma5 >= prev_sma20) & warm
+
+    # 골든크로스가 우선 (calculate의 if/elif 순서와 동일)
+    signal = np.where(golden, 1, np.where(dead, -1, 0)).astype(np.int8)
+    reason = np.full(len(df), "", dtype=object)
+    reason[signal == 1] = "골든크로스 (5>20)"
+    reason[signal == -1] = "데드크로스 (5<20)"
+
+    return signal, reason
+
+class _Stream(SignalStream):
+    """[실시간 신호] 봉 하나당 O(1) - update(bar) 결과는 calculate(df, i)와 같음"""
+    def __init__(self):
+        super().__init__()
+        self.sma5 = RollingMean(5)
+        self.sma20 = RollingMean(20)
+        self.prev = (float('nan'), float('nan'))
+
+    def _step(self, bar, i, commit):
+        close = bar['Close']
+        today_sma5 = self._feed(self.sma5, close, commit)
+        today_sma20 = self._feed(self.sma20, close, commit)
+        prev_sma5, prev_sma20 = self.prev
+        if commit:
+            self.prev = (today_sma5, today_sma20)
+
+        if i < 20: return 0, ""
+        if today_sma5 > today_sma20 and prev_sma5 <= prev_sma20:
+            return 1, "골든크로스 (5>20)"
+        if today_sma5 < today_sma20 and prev_sma5 >= prev_sma20:
+            return -1, "데드크로스 (5<20)"
+        return 0, ""
+
+def stream(config=None):
+    """실시간 신호 계산기 (warmup / peek / update)"""
+    return _Stream()
+
+class _ScanCondition:
+    """
+    [전 종목 스캐너용] 골든/데드크로스를 종목 배열 단위로 평가 (core.trader.scanner.UniverseScanner)
+    - prepare: 봉 확정 후 하루 한 번, 과거 봉 배열(종목 x lookback)로 부분 합을 미리 계산
+    - evaluate: 장중 배치마다 형성 중인 봉으로 신호 계산 -> calculate(df, i)와 같은 값
+    """
+    lookback = 20
+
+    def prepare(self, hist, count):
+        close = hist['Close']
+        self.sum4 = close[:, -4:].sum(axis=1)
+        self.sum19 = close[:, -19:].sum(axis=1)
+        self.prev_sma5 = close[:, -5:].sum(axis=1) / 5
+        self.prev_sma20 = close[:, -20:].sum(axis=1) / 20
+        self.count = count.copy()
+
+    def evaluate(self, idx, bar):
+        close = bar['Close']
+        sma5 = (self.sum4[idx] + close) / 5
+        sma20 = (self.sum19[idx] + close) / 20
+        prev_sma5, prev_sma20 = self.prev_sma5[idx], self.prev_sma20[idx]
+        warm = self.count[idx] >= 20
+        golden = (sma5 > sma20) & (prev_sma5 <= prev_sma20) & warm
+        dead = (sma5 < sma20) & (prev_sma5 >= prev_sma20) & warm
+        return np.where(golden, 1, np.where(dead, -1, 0)).astype(np.int8)
+
+def scan_condition(config=None):
+    return _ScanCondition()
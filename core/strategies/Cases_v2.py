@@ -3,6 +3,29 @@
 설명: 신저가 근처에서 거래량이 급감하며 주가가 횡보하는 '바닥 다지기' 패턴 포착
 """
 import pandas as pd
+import numpy as np
+from core.indicators import get_indicator
+from core.streaming_indicators import RollingMean, RollingMin, PctChange, SignalStream
+
+# 신호 계산에 필요한 과거 봉 수 (스트리밍 백테스트에서 청크 사이에 넘겨줄 꼬리 길이)
+LOOKBACK = 61
+
+# 파라미터 (calculate / signals / stream / scan_condition 공용)
+VOL_DROP_RATIO = 0.5   # 거래량이 평소의 50% 이하
+PRICE_MARGIN = 1.05    # 신저가 대비 5% 이내 (바닥권)
+MIN_DAY_CHG = -3.0     # 폭락하지 않고 버팀 (-3% 이상)
+
+# 정규장 (09:00 ~ 15:30)
+# 장중 형성 중인 봉의 거래량은 누적값(FID 13)이므로 20일 평균도 경과 시간만큼만 비교 (확정 봉은 그대로)
+SESSION_START = 9 * 3600
+SESSION_SECONDS = 6.5 * 3600
+
+def _session_fraction(tick_time):
+    """체결시간 HHMMSS(숫자 또는 배열) -> 정규장 경과 비율 0~1 (시각이 없으면(0) 1 = 확정 봉과 같게 비교)"""
+    t = np.asarray(tick_time, dtype=np.float64)
+    sec = (t // 10000) * 3600 + (t // 100 % 100) * 60 + t % 100
+    frac = np.clip((sec - SESSION_START) / SESSION_SECONDS, 0.0, 1.0)
+    return np.where(t > 0, frac, 1.0)
 
 def calculate(df, i):
     # 1. 데이터 부족하면 관망 (최소 60일 필요)
@@ -11,11 +34,10 @@ def calculate(df, i):
     # ----------------------------------------------------
     # [지표 계산] 원본 로직 유지
     # ----------------------------------------------------
-    # 매일 계산하면 느리므로, 컬럼이 없을 때만 한 번에 계산
-    if 'Vol_MA_20' not in df.columns:
-        df['Vol_MA_20'] = df['Volume'].rolling(window=20).mean()
-        df['Recent_Low'] = df['Low'].rolling(window=60).min() # 60일 신저가
-        df['Day_Chg'] = df['Close'].pct_change() * 100
+    # 공용 지표 서비스에서 받아옴 (종목/데이터 버전별 1회 계산, df에 컬럼 추가 안 함)
+    vol_ma_20 = get_indicator(df, 'sma', 20, column='Volume')[i]
+    recent_low = get_indicator(df, 'rolling_min', 60, column='Low')[i] # 60일 신저가
+    day_chg = get_indicator(df, 'pct_change', 1)[i]
 
     # ----------------------------------------------------
     # [데이터 조회]
@@ -23,29 +45,22 @@ def calculate(df, i):
     today = df.iloc[i]
     
     vol = today['Volume']
-    vol_ma_20 = today['Vol_MA_20']
     close = today['Close']
-    recent_low = today['Recent_Low']
-    day_chg = today['Day_Chg']
 
     # ----------------------------------------------------
-    # [매매 로직] 원본 조건 적용
+    # [매매 로직] 원본 조건 적용 (파라미터는 모듈 상단)
     # ----------------------------------------------------
-    # 파라미터 (기본값 적용)
-    vol_drop_ratio = 0.5   # 거래량이 평소의 50% 이하
-    price_margin = 1.05    # 신저가 대비 5% 이내 (바닥권)
-    
     signal = 0
     reason = ""
 
     # 1. 신저가 근처인가? (바닥권 확인)
-    is_low_area = close <= (recent_low * price_margin)
+    is_low_area = close <= (recent_low * PRICE_MARGIN)
     
     # 2. 거래량이 말랐는가? (매도세 실종)
-    is_vol_dry = vol < (vol_ma_20 * vol_drop_ratio)
+    is_vol_dry = vol < (vol_ma_20 * VOL_DROP_RATIO)
     
     # 3. 주가가 폭락하지 않고 버티는가? (-3% 이상)
-    is_stable = day_chg > -3.0
+    is_stable = day_chg > MIN_DAY_CHG
 
     # [최종 판단]
     if is_low_area and is_vol_dry and is_stable:
@@ -56,4 +71,93 @@ def calculate(df, i):
     # 매도 조건은 백테스터의 기본 로직(익절/손절)에 맡기거나, 
     # 필요하다면 여기서 signal = -1 로직을 추가할 수 있습니다.
     
-    return signal, reason
\ No newline at end of file
+    return signal, reason
+
+def signals(df):
+    """
+    [일괄 신호 계산] calculate(df, i)를 전 구간에 대해 한 번에 수행합니다.
+    반환: (signal 배열, reason 배열) - 길이는 len(df), i번째 값은 calculate(df, i)와 동일
+    """
+    vol = df['Volume'].to_numpy()
+    close = df['Close'].to_numpy()
+    vol_ma_20 = get_indicator(df, 'sma', 20, column='Volume')
+    recent_low = get_indicator(df, 'rolling_min', 60, column='Low')
+    day_chg = get_indicator(df, 'pct_change', 1)
+
+    is_low_area = close <= (recent_low * PRICE_MARGIN)
+    is_vol_dry = vol < (vol_ma_20 * VOL_DROP_RATIO)
+    is_stable = day_chg > MIN_DAY_CHG
+
+    # 데이터 부족 구간(i < 60)은 관망
+    warm = np.arange(len(df)) >= 60
+    hit = is_low_area & is_vol_dry & is_stable & warm
+
+    signal = hit.astype(np.int8)
+    reason = np.full(len(df), "", dtype=object)
+    for idx in np.flatnonzero(hit):
+        reason[idx] = f"매도세 실종 (거래량 {int(vol[idx]):,}주 급감)"
+
+    return signal, reason
+
+class _Stream(SignalStream):
+    """
+    [실시간 신호] 봉 하나당 O(1) - update(bar) 결과는 calculate(df, i)와 같음
+    peek(bar)는 bar['Time'](체결시간 HHMMSS)까지 경과한 비율만큼의 20일 평균 거래량과 비교
+    """
+    def __init__(self):
+        super().__init__()
+        self.vol_ma_20 = RollingMean(20)
+        self.recent_low = RollingMin(60)
+        self.day_chg = PctChange(1)
+
+    def _step(self, bar, i, commit):
+        vol = bar['Volume']
+        close = bar['Close']
+        vol_ma_20 = self._feed(self.vol_ma_20, vol, commit)
+        recent_low = self._feed(self.recent_low, bar['Low'], commit)
+        day_chg = self._feed(self.day_chg, close, commit)
+
+        if i < 60: return 0, ""
+        elapsed = 1.0 if commit else float(_session_fraction(bar.get('Time', 0)))
+        is_low_area = close <= (recent_low * PRICE_MARGIN)
+        is_vol_dry = vol < (vol_ma_20 * elapsed * VOL_DROP_RATIO)
+        is_stable = day_chg > MIN_DAY_CHG
+        if is_low_area and is_vol_dry and is_stable:
+            return 1, f"매도세 실종 (거래량 {int(vol):,}주 급감)"
+        return 0, ""
+
+def stream(config=None):
+    """실시간 신호 계산기 (warmup / peek / update)"""
+    return _Stream()
+
+class _ScanCondition:
+    """
+    [전 종목 스캐너용] '60일 신저가 근처 + 거래량 급감'을 종목 배열 단위로 평가 (core.trader.scanner.UniverseScanner)
+    - prepare: 봉 확정 후 하루 한 번, 직전 59일 저가 최솟값 / 19일 거래량 합 / 전일 종가를 미리 계산
+    - evaluate: 장중 배치마다 형성 중인 봉으로 신호 계산 -> 장 마감 시각(또는 시각 없음)이면 calculate(df, i)와 같은 값
+      (누적거래량은 bar['Time']까지 경과한 비율만큼의 20일 평균과 비교)
+    """
+    lookback = 60
+
+    def prepare(self, hist, count):
+        self.low_min59 = np.fmin.reduce(hist['Low'][:, -59:], axis=1)
+        self.vol_sum19 = hist['Volume'][:, -19:].sum(axis=1)
+        self.prev_close = hist['Close'][:, -1].copy()
+        self.count = count.copy()
+
+    def evaluate(self, idx, bar):
+        vol = bar['Volume']
+        close = bar['Close']
+        vol_ma_20 = (self.vol_sum19[idx] + vol) / 20
+        recent_low = np.fmin(self.low_min59[idx], bar['Low'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            day_chg = (close / self.prev_close[idx] - 1) * 100
+
+        elapsed = _session_fraction(bar['Time']) if 'Time' in bar else 1.0
+        is_low_area = close <= (recent_low * PRICE_MARGIN)
+        is_vol_dry = vol < (vol_ma_20 * elapsed * VOL_DROP_RATIO)
+        is_stable = day_chg > MIN_DAY_CHG
+        return (is_low_area & is_vol_dry & is_stable & (self.count[idx] >= 60)).astype(np.int8)
+
+def scan_condition(config=None):
+    return _ScanCondition()
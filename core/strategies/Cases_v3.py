@@ -5,6 +5,12 @@ import os
 import mplfinance as mpf
 import streamlit as st
 
+from core.indicators import get_indicator
+from core.streaming_indicators import RollingMean, SignalStream
+
+# 신호 계산에 필요한 과거 봉 수 (선택 가능한 최장 이평선 120 + 전일 신호 1)
+LOOKBACK = 121
+
 # =========================================================
 # [설정] UI 및 파라미터 정의
 # =========================================================
@@ -40,8 +46,8 @@ def prepare_data(df, config=None):
         df['Date'] = pd.to_datetime(df['Date'])
         df = df.sort_values('Date').reset_index(drop=True)
 
-    # 등락률 계산
-    df['Day_Chg'] = df['Close'].pct_change() * 100
+    # 등락률 계산 (공용 지표 서비스 - Cases_v2와 같은 값을 공유)
+    df['Day_Chg'] = get_indicator(df, 'pct_change', 1)
     
     # --- 로직: Case 3 ---
     ma_pd = config.get('ma_period', 20)
@@ -49,28 +55,38 @@ def prepare_data(df, config=None):
     tolerance = config.get('tolerance', 2.0) / 100.0
     
     # 이평선 계산
-    df[ma_col] = df['Close'].rolling(ma_pd).mean()
-    
-    # 1. 지지선 근접 (저가가 이평선 근처까지 내려왔는가?)
-    #    분모가 0이 되는 것을 방지하기 위해 epsilon 추가 혹은 처리
-    if df[ma_col].iloc[-1] != 0: 
-        dist_to_ma = abs(df['Low'] - df[ma_col]) / df[ma_col]
-        near_support = dist_to_ma <= tolerance
-    else:
-        near_support = False
-    
-    # 2. 양봉 발생 (지지 확인: 종가가 시가보다 높음)
-    is_bullish = df['Close'] > df['Open']
-    
-    # 3. 추세 필터 (종가가 이평선 위에 있거나 살짝 걸쳐야 함, 너무 깊게 빠지면 안됨)
-    above_support = df['Close'] > (df[ma_col] * 0.98)
+    df[ma_col] = get_indicator(df, 'sma', ma_pd)
     
     # 최종 매수 신호 (이 신호는 당일 장 마감 기준임)
-    df['Signal_Candidate'] = near_support & is_bullish & above_support
+    df['Signal_Candidate'] = support_candidate(
+        df['Open'].to_numpy(dtype=float), df['Low'].to_numpy(dtype=float),
+        df['Close'].to_numpy(dtype=float), df[ma_col].to_numpy(dtype=float), tolerance
+    )
     df['Reason_Msg'] = np.where(df['Signal_Candidate'], f"Case3(MA{ma_pd}) 지지", "")
     
     return df
 
+def support_candidate(open_, low, close, ma, tolerance):
+    """
+    지지선 반등 후보 여부를 NumPy 배열로 계산합니다. (prepare_data / 파라미터 스윕 공용)
+    :param tolerance: 비율 (예: 2% -> 0.02)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. 지지선 근접 (저가가 이평선 근처까지 내려왔는가?)
+        #    분모가 0이 되는 것을 방지하기 위해 epsilon 추가 혹은 처리
+        if len(ma) and ma[-1] != 0:
+            near_support = (np.abs(low - ma) / ma) <= tolerance
+        else:
+            near_support = np.zeros(len(ma), dtype=bool)
+
+        # 2. 양봉 발생 (지지 확인: 종가가 시가보다 높음)
+        is_bullish = close > open_
+
+        # 3. 추세 필터 (종가가 이평선 위에 있거나 살짝 걸쳐야 함, 너무 깊게 빠지면 안됨)
+        above_support = close > (ma * 0.98)
+
+    return near_support & is_bullish & above_support
+
 # =========================================================
 # [Part 2] 외부 Backtester 연동용 함수 (추가됨)
 # =========================================================
@@ -84,7 +100,10 @@ def calculate(df, i):
     if i < 20: return 0, "" # MA 계산 등을 위해 최소 기간 필요
     if 'Signal_Candidate' not in df.columns:
         # 데이터가 준비 안 되어 있으면 기본값으로 계산 (비효율적이지만 안전장치)
-        prepare_data(df)
+        # prepare_data는 정렬된 새 DataFrame을 반환하므로 결과 컬럼을 원본에 옮겨 담음
+        prepared = prepare_data(df.copy())
+        df['Signal_Candidate'] = prepared['Signal_Candidate'].to_numpy()
+        df['Reason_Msg'] = prepared['Reason_Msg'].to_numpy()
 
     # 2. [중요] 타임머신 방지 로직
     # 오늘(i) 매수를 하려면, 어제(i-1) 장 마감 후에 신호가 확정되어야 함.
@@ -96,6 +115,86 @@ def calculate(df, i):
     
     return 0, "" # 신호 없음
 
+def signals(df, config=None):
+    """
+    [일괄 신호 계산] calculate(df, i)를 전 구간에 대해 한 번에 수행합니다.
+    prepare_data가 만든 Signal_Candidate를 하루 뒤로 밀어 '어제 신호 -> 오늘 매수'를 재현합니다.
+    반환: (signal 배열, reason 배열) - 길이는 len(df), 날짜순 정렬된 df 기준
+    """
+    n = len(df)
+    signal = np.zeros(n, dtype=np.int8)
+    reason = np.full(n, "", dtype=object)
+    if n < 2: return signal, reason
+
+    prepared = prepare_data(df.copy(), config)
+    candidate = prepared['Signal_Candidate'].to_numpy(dtype=bool)
+    messages = prepared['Reason_Msg'].to_numpy(dtype=object)
+
+    # 타임머신 방지: i일의 신호는 i-1일 후보에서 나옴
+    signal[1:] = candidate[:-1]
+    reason[1:] = np.where(candidate[:-1], messages[:-1], "")
+
+    # 데이터 부족 구간(i < 20)은 관망
+    signal[:20] = 0
+    reason[:20] = ""
+
+    return signal, reason
+
+class _Stream(SignalStream):
+    """
+    [실시간 신호] 봉 하나당 O(1) - update(bar) 결과는 calculate(df, i)와 같음
+    - 봉이 확정되면 그 봉의 지지 후보 여부를 candidate에 저장 -> 다음 봉(내일 시가)의 매수 신호
+    """
+    def __init__(self, config=None):
+        super().__init__()
+        config = config or {}
+        self.ma_period = config.get('ma_period', 20)
+        self.tolerance = config.get('tolerance', 2.0) / 100.0
+        self.ma = RollingMean(self.ma_period)
+        self.candidate = False
+        self.reason = f"Case3(MA{self.ma_period}) 지지"
+
+    def support_distance(self, low, ma):
+        """저가와 이평선의 거리 비율 (|Low - MA| / MA), 이평선이 없으면 NaN"""
+        if not ma or ma != ma: return float('nan')
+        return abs(low - ma) / ma
+
+    def _step(self, bar, i, commit):
+        ma = self._feed(self.ma, bar['Close'], commit)
+        signal = 1 if (i >= 20 and self.candidate) else 0
+        if commit:
+            low, close = bar['Low'], bar['Close']
+            self.candidate = (self.support_distance(low, ma) <= self.tolerance
+                              and close > bar['Open'] and close > ma * 0.98)
+        return (signal, self.reason) if signal else (0, "")
+
+def stream(config=None):
+    """실시간 신호 계산기 (warmup / peek / update), config는 prepare_data와 같은 형식"""
+    return _Stream(config)
+
+class _ScanCondition:
+    """
+    [전 종목 스캐너용] 전일 지지 후보 여부를 종목 배열로 보관 (core.trader.scanner.UniverseScanner)
+    - 오늘 신호는 어제 봉으로 이미 정해지므로 prepare에서 하루 한 번 계산, evaluate는 조회만 함
+    """
+    def __init__(self, config=None):
+        config = config or {}
+        self.ma_period = config.get('ma_period', 20)
+        self.tolerance = config.get('tolerance', 2.0) / 100.0
+        self.lookback = self.ma_period
+
+    def prepare(self, hist, count):
+        ma = hist['Close'][:, -self.ma_period:].sum(axis=1) / self.ma_period
+        last = {col: hist[col][:, -1] for col in ('Open', 'Low', 'Close')}
+        self.candidate = support_candidate(last['Open'], last['Low'], last['Close'], ma, self.tolerance)
+        self.count = count.copy()
+
+    def evaluate(self, idx, bar):
+        return (self.candidate[idx] & (self.count[idx] >= 20)).astype(np.int8)
+
+def scan_condition(config=None):
+    return _ScanCondition(config)
+
 # =========================================================
 # [Part 3] 자체 시뮬레이션 함수 (수정됨)
 # =========================================================
@@ -108,9 +207,6 @@ def execute_trade(df, config):
     tp_rate = config.get('target_profit', 15.0) / 100.0
     sl_rate = config.get('stop_loss', -5.0) / 100.0
     
-    balance = initial_capital
-    shares = 0
-    avg_price = 0
     logs = []
     
     # 데이터 준비
@@ -119,76 +215,96 @@ def execute_trade(df, config):
     start_idx = max(config['ma_period'] + 1, 60)
     if len(df) < start_idx: return initial_capital, logs
 
-    # 반복문 시작
-    for i in range(start_idx, len(df)):
-        curr_row = df.iloc[i]   # 오늘 데이터
-        prev_row = df.iloc[i-1] # 어제 데이터
-        
+    dates = df['Date']
+    day_chg = df['Day_Chg'].to_numpy()
+    reasons = df['Reason_Msg'].to_numpy()
+
+    def log_trade(i, trade_type, price, shares, profit, profit_rate, is_tp):
+        logs.append({
+            "Date": dates.iat[i].strftime('%Y-%m-%d'), 
+            "Type": trade_type, 
+            "Price": int(price), 
+            "Shares": shares, 
+            "Profit": int(profit),
+            "Profit_Rate": round(profit_rate, 2),
+            # 매도는 익절/손절, 매수는 어제(i-1) 신호 사유
+            "Reason": ("TP(익절)" if is_tp else "SL(손절)") if trade_type == "Sell" else reasons[i-1], 
+            "Day_Chg(%)": round(day_chg[i], 2)
+        })
+
+    # 매매 규칙은 simulate_arrays 하나로 (파라미터 스윕과 항상 같은 규칙)
+    final_value, _, _ = simulate_arrays(
+        df['Open'].to_numpy(dtype=float), df['High'].to_numpy(dtype=float), df['Low'].to_numpy(dtype=float),
+        df['Close'].to_numpy(dtype=float), df['Signal_Candidate'].to_numpy(), start_idx,
+        initial_capital, fee_rate, tp_rate, sl_rate, on_trade=log_trade
+    )
+    return final_value, logs
+
+def simulate_arrays(open_, high, low, close, candidate, start_idx, initial_capital, fee_rate, tp_rate, sl_rate,
+                    on_trade=None):
+    """
+    Cases_v3의 매매 규칙 (execute_trade와 파라미터 스윕이 함께 사용) - NumPy 배열 위에서 돌리고 요약만 반환합니다.
+    :param on_trade: 매매마다 on_trade(i, 'Buy'|'Sell', 가격, 수량, 손익, 수익률(%), 익절 여부) 호출 (None이면 생략)
+    :return: (최종 평가금액, 매매 기록 수, 익절 횟수)
+    """
+    n = len(close)
+    if n < start_idx: return initial_capital, 0, 0
+
+    op, hi, lo = open_.tolist(), high.tolist(), low.tolist()
+    cand = candidate.tolist()
+
+    balance = initial_capital
+    shares = 0
+    avg_price = 0
+    trades = 0
+    wins = 0
+
+    for i in range(start_idx, n):
         # 1. 매도 (Sell) - 보유 중일 때만 검사
         if shares > 0:
             tp_price = avg_price * (1 + tp_rate) # 익절가
             sl_price = avg_price * (1 + sl_rate) # 손절가
-            
+
             sell_price = 0
-            reason = ""
-            
+            is_tp = False
             # 고가가 익절가보다 높으면 익절 체결
-            if curr_row['High'] >= tp_price: 
-                sell_price = max(curr_row['Open'], tp_price) # 갭상승 고려
-                reason = "TP(익절)"
+            if hi[i] >= tp_price:
+                sell_price = max(op[i], tp_price) # 갭상승 고려
+                is_tp = True
             # 저가가 손절가보다 낮으면 손절 체결
-            elif curr_row['Low'] <= sl_price: 
-                sell_price = min(curr_row['Open'], sl_price) # 갭하락 고려
-                reason = "SL(손절)"
-            
+            elif lo[i] <= sl_price:
+                sell_price = min(op[i], sl_price) # 갭하락 고려
+
             # 매도 실행
             if sell_price > 0:
                 revenue = shares * sell_price * (1 - fee_rate) # 수수료 차감
-                profit = revenue - (shares * avg_price)
-                profit_rate = ((sell_price - avg_price) / avg_price) * 100
-                
-                logs.append({
-                    "Date": curr_row['Date'].strftime('%Y-%m-%d'), 
-                    "Type": "Sell", 
-                    "Price": int(sell_price), 
-                    "Shares": shares, 
-                    "Profit": int(profit),
-                    "Profit_Rate": round(profit_rate, 2),
-                    "Reason": reason, 
-                    "Day_Chg(%)": round(curr_row['Day_Chg'], 2)
-                })
-                
+                if on_trade is not None:
+                    on_trade(i, "Sell", sell_price, shares, revenue - (shares * avg_price),
+                             ((sell_price - avg_price) / avg_price) * 100, is_tp)
                 balance += revenue
+                if is_tp: wins += 1
+                trades += 1
                 shares = 0
                 avg_price = 0
-                continue # 매도한 날에는 다시 매수하지 않음 (선택사항)
-                
-        # 2. 매수 (Buy)
-        # [수정됨] 어제(prev_row) 신호가 떴다면, 오늘(curr_row) 시가에 매수
-        if shares == 0 and prev_row['Signal_Candidate']:
-            buy_price = curr_row['Open']
+                continue # 매도한 날에는 다시 매수하지 않음
+
+        # 2. 매수 (Buy) - 어제 신호 -> 오늘 시가 매수
+        if shares == 0 and cand[i-1]:
+            buy_price = op[i]
             buy_qty = int((balance * 0.99) / buy_price) # 예수금의 99%만 사용
-            
+
             if buy_qty > 0:
                 shares = buy_qty
                 avg_price = buy_price
                 fee = (buy_price * buy_qty) * fee_rate
                 balance -= (buy_price * buy_qty) + fee
-                
-                logs.append({
-                    "Date": curr_row['Date'].strftime('%Y-%m-%d'), 
-                    "Type": "Buy", 
-                    "Price": int(buy_price), 
-                    "Shares": shares, 
-                    "Profit": 0, 
-                    "Profit_Rate": 0, 
-                    "Reason": prev_row['Reason_Msg'], 
-                    "Day_Chg(%)": round(curr_row['Day_Chg'], 2)
-                })
+                trades += 1
+                if on_trade is not None:
+                    on_trade(i, "Buy", buy_price, shares, 0, 0, False)
 
     # 마지막 보유분 평가
-    final_value = balance + (shares * df.iloc[-1]['Close'])
-    return final_value, logs
+    final_value = balance + (shares * close[-1])
+    return final_value, trades, wins
 
 # =========================================================
 # [Part 4] 차트 생성 (기존 유지)
@@ -5,8 +5,10 @@ import os
 CONFIG_FILE = 'master_config.json'
 
 class StrategyManager:
-    def __init__(self):
+    def __init__(self, position_book=None):
         self.config = self._load_config()
+        # (선택) 실시간 포지션 장부 - 있으면 잔고 REST 조회 없이 보유/미체결/예수금을 확인
+        self.position_book = position_book
 
     def _load_config(self):
         """설정 파일 로드"""
@@ -38,7 +40,7 @@ class StrategyManager:
             print(f"⚠️ 설정 저장 실패: {e}")
             return False
 
-    def calculate_buy_amount(self, tier, current_price, real_deposit=None):
+    def calculate_buy_amount(self, tier, current_price, real_deposit=None, code=None):
         """
         등급(Tier)에 따라 매수할 수량과 금액을 계산
         
@@ -46,10 +48,19 @@ class StrategyManager:
         :param current_price: 현재 주가
         :param real_deposit: (선택) 실제 계좌의 주문가능 현금. 
                              이 값이 있으면 설정된 금액이 아무리 커도 실제 현금을 초과하지 않도록 조정함.
+                             없고 position_book이 있으면 장부의 주문가능금액 추정치를 사용함.
+        :param code: (선택) 종목 코드. position_book이 있으면 이미 보유 중이거나 매수 미체결이 있는 종목은 0주.
         """
         if tier not in ['S', 'A', 'B']:
             return 0, 0
 
+        book = self.position_book
+        if book is not None:
+            if code is not None and (book.position_qty(code) > 0 or book.has_open_order(code, 'BUY')):
+                return 0, 0
+            if real_deposit is None:
+                real_deposit = book.available_cash()
+
         # 1. 설정 가져오기
         strategy = self.config.get('betting_strategy', {})
         account = self.config.get('account', {})
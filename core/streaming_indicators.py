@@ -0,0 +1,161 @@
+"""
+[스트리밍 지표]
+- core/indicators.py의 rolling 지표를 봉 하나씩 받아 O(1)로 갱신하는 버전입니다. (실시간 신호용)
+    RollingMean(n)   == df[col].rolling(n).mean()
+    RollingMin(n)    == df[col].rolling(n).min()   (단조 덱, 분할 상환 O(1))
+    PctChange(1)     == df[col].pct_change(1) * 100
+- update(x): 확정된 봉 하나를 반영하고 현재 값을 반환
+  peek(x):   x가 다음 봉으로 확정된다면 나올 값을 상태 변경 없이 계산 (장중 형성 중인 봉 미리보기)
+- 창이 덜 찼으면 pandas와 같이 NaN
+- KRX 가격/거래량은 정수이므로 누적 합을 파이썬 int로 유지 -> pandas rolling 결과와 비트 단위로 같음
+
+SignalStream은 전략 모듈의 stream(config)가 돌려주는 실시간 신호 계산기의 공통 틀입니다.
+    s = Cases_v2.stream()
+    s.warmup(history_df)          # 과거 봉으로 지표 채우기
+    s.peek(bar)                   # 장중: 지금 봉이 이대로 끝나면 나올 신호
+    s.update(bar)                 # 봉 확정: calculate(df, i)와 같은 (signal, reason)
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+def _exact(x):
+    """정수값이면 int로 (누적 합 오차 방지)"""
+    if isinstance(x, int):
+        return x
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+class RollingMean:
+    __slots__ = ('window', 'count', '_buf', '_pos', '_sum')
+
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self._buf = [0] * window
+        self._pos = 0
+        self._sum = 0
+
+    def update(self, x):
+        x = _exact(x)
+        if self.count >= self.window:
+            self._sum -= self._buf[self._pos]
+        self._buf[self._pos] = x
+        self._sum += x
+        self._pos = (self._pos + 1) % self.window
+        self.count += 1
+        return self.value
+
+    def peek(self, x):
+        if self.count + 1 < self.window:
+            return NAN
+        total = self._sum + _exact(x)
+        if self.count >= self.window:
+            total -= self._buf[self._pos]
+        return total / self.window
+
+    @property
+    def value(self):
+        return self._sum / self.window if self.count >= self.window else NAN
+
+
+class RollingMin:
+    __slots__ = ('window', 'count', '_dq')
+
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self._dq = deque()  # (순번, 값) - 값이 증가하는 순서, 맨 앞이 창 안의 최솟값
+
+    def update(self, x):
+        x = _exact(x)
+        dq = self._dq
+        while dq and dq[-1][1] >= x:
+            dq.pop()
+        dq.append((self.count, x))
+        self.count += 1
+        while dq[0][0] < self.count - self.window:
+            dq.popleft()
+        return self.value
+
+    def peek(self, x):
+        if self.count + 1 < self.window:
+            return NAN
+        # 새 봉이 들어오면 맨 앞 한 개만 창 밖으로 밀려날 수 있음
+        dq = self._dq
+        oldest = self.count + 1 - self.window
+        for seq, value in dq:
+            if seq >= oldest:
+                return float(min(value, _exact(x)))
+        return float(_exact(x))
+
+    @property
+    def value(self):
+        return float(self._dq[0][1]) if self.count >= self.window else NAN
+
+
+class PctChange:
+    __slots__ = ('periods', 'count', '_prev', 'value')
+
+    def __init__(self, periods=1):
+        self.periods = periods
+        self.count = 0
+        self._prev = deque(maxlen=periods)
+        self.value = NAN
+
+    def _calc(self, x):
+        if len(self._prev) < self.periods:
+            return NAN
+        base = self._prev[0]
+        if base == 0:
+            return math.copysign(math.inf, x) if x else NAN
+        return (x / base - 1) * 100
+
+    def update(self, x):
+        x = float(x)
+        self.value = self._calc(x)
+        self._prev.append(x)
+        self.count += 1
+        return self.value
+
+    def peek(self, x):
+        return self._calc(float(x))
+
+
+class SignalStream:
+    """
+    전략별 실시간 신호 계산기 공통 틀
+    - 하위 클래스는 _step(bar, i, commit)만 구현: commit이면 지표.update, 아니면 지표.peek 사용
+    - bar는 'Open', 'High', 'Low', 'Close', 'Volume' 키를 가진 dict (DataFrame 한 행과 같은 모양)
+    """
+    COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __init__(self):
+        self.count = 0  # 확정된 봉 수 (= 다음 봉의 인덱스 i)
+
+    def update(self, bar):
+        result = self._step(bar, self.count, True)
+        self.count += 1
+        return result
+
+    def peek(self, bar):
+        return self._step(bar, self.count, False)
+
+    def warmup(self, df):
+        """과거 봉(날짜순)을 모두 확정 반영 -> 마지막 봉의 (signal, reason)"""
+        result = (0, "")
+        if df is None or len(df) == 0:
+            return result
+        for bar in df[list(self.COLUMNS)].to_dict('records'):
+            result = self.update(bar)
+        return result
+
+    @staticmethod
+    def _feed(indicator, x, commit):
+        return indicator.update(x) if commit else indicator.peek(x)
+
+    def _step(self, bar, i, commit):
+        raise NotImplementedError
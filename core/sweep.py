@@ -0,0 +1,173 @@
+"""
+[파라미터 스윕] Cases_v3 (지지선 반등) 파라미터 최적화
+- ma_period / tolerance / target_profit / stop_loss 조합을 격자(grid) 또는 무작위(random)로 생성
+- 종목별로 이평선(MA)은 기간당 한 번만 계산하고, 모든 tolerance/TP/SL 조합이 재사용
+- (종목, 이평선 기간) 단위 작업을 프로세스 풀에 나눠서 병렬 실행
+- 조합별 평균 수익률 순으로 정렬된 결과표 반환
+"""
+import os
+import sys
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+current_file_path = os.path.abspath(__file__)
+root_path = os.path.dirname(os.path.dirname(current_file_path))
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from core.backtester import Backtester
+from core.indicators import get_indicator
+
+# strategy_ui의 선택지와 같은 기본 탐색 범위
+DEFAULT_SPACE = {
+    'ma_period': [20, 60, 120],
+    'tolerance': [1.0, 2.0, 3.0, 4.0, 5.0],
+    'target_profit': [5.0, 10.0, 15.0, 20.0],
+    'stop_loss': [-3.0, -5.0, -7.0, -10.0]
+}
+PARAM_KEYS = ['ma_period', 'tolerance', 'target_profit', 'stop_loss']
+
+
+# -----------------------------------------------------------
+# 1. 파라미터 조합 생성
+# -----------------------------------------------------------
+def grid_params(space=None):
+    """탐색 범위의 모든 조합 (격자 탐색)"""
+    space = space or DEFAULT_SPACE
+    values = [space[k] for k in PARAM_KEYS]
+    return [dict(zip(PARAM_KEYS, combo)) for combo in itertools.product(*values)]
+
+def random_params(n_samples, space=None, seed=None):
+    """탐색 범위에서 중복 없이 n개 조합을 무작위 추출 (무작위 탐색)"""
+    grid = grid_params(space)
+    rng = random.Random(seed)
+    if n_samples >= len(grid): return grid
+    return rng.sample(grid, n_samples)
+
+
+# -----------------------------------------------------------
+# 2. 작업 단위: (종목, 이평선 기간) -> 해당 기간의 모든 조합
+# -----------------------------------------------------------
+def _run_task(task):
+    """
+    한 종목의 한 이평선 기간에 대해 묶인 파라미터 조합들을 모두 평가합니다.
+    MA는 여기서 한 번만 계산되고, tolerance별 신호도 한 번만 계산됩니다.
+    """
+    from core.strategies import Cases_v3 as strategy
+
+    code, timeframe, ma_period, param_sets, account, data_dir = task
+    rows = []
+
+    df = Backtester(use_cache=True, data_dir=data_dir).load_data(code, timeframe)
+    if df is None or df.empty:
+        return rows
+
+    open_ = df['Open'].to_numpy(dtype=float)
+    high = df['High'].to_numpy(dtype=float)
+    low = df['Low'].to_numpy(dtype=float)
+    close = df['Close'].to_numpy(dtype=float)
+
+    # 이평선은 (종목, 기간)당 한 번
+    ma = get_indicator(df, 'sma', ma_period)
+    start_idx = max(ma_period + 1, 60)
+
+    initial_capital = account.get('initial_capital', 10000000)
+    fee_rate = account.get('fee_rate', 0.00015)
+
+    candidates = {}
+    for params in param_sets:
+        tol = params['tolerance']
+        if tol not in candidates:
+            candidates[tol] = strategy.support_candidate(open_, low, close, ma, tol / 100.0)
+
+        final_value, trades, wins = strategy.simulate_arrays(
+            open_, high, low, close, candidates[tol], start_idx,
+            initial_capital, fee_rate,
+            params['target_profit'] / 100.0, params['stop_loss'] / 100.0
+        )
+        rows.append({
+            **params,
+            'Code': code,
+            'Return(%)': round((final_value - initial_capital) / initial_capital * 100, 2),
+            'Trades': trades,
+            'TP_Count': wins
+        })
+    return rows
+
+
+# -----------------------------------------------------------
+# 3. 스윕 실행
+# -----------------------------------------------------------
+def run_sweep(codes=None, params=None, timeframe='daily', account=None, workers=None, detail=False, data_dir=None):
+    """
+    :param codes: 대상 종목 코드 목록 (None -> database 폴더의 전체 종목)
+    :param params: grid_params()/random_params() 결과 (None -> 기본 격자)
+    :param account: {'initial_capital': ..., 'fee_rate': ...}
+    :param workers: 프로세스 수 (1 -> 순차, None -> CPU 코어 수)
+    :param detail: True면 (순위표, 종목별 상세표)를 함께 반환
+    :param data_dir: 데이터 폴더 (None -> 프로젝트 루트/database)
+    :return: 조합별 평균 수익률 내림차순 DataFrame
+    """
+    data_dir = data_dir or os.path.join(root_path, "database")
+    if codes is None:
+        folder_name = "02_daily" if timeframe == 'daily' else "03_minute"
+        dir_path = os.path.join(data_dir, folder_name)
+        if not os.path.exists(dir_path):
+            print(f"❌ 데이터 폴더를 찾을 수 없습니다: {dir_path}")
+            return None
+        codes = sorted(f.replace('.jsonl', '') for f in os.listdir(dir_path) if f.endswith('.jsonl'))
+
+    params = params or grid_params()
+    account = account or {'initial_capital': 10000000, 'fee_rate': 0.00015}
+
+    # 이평선 기간별로 조합을 묶어서 MA 재계산을 막음
+    by_ma = {}
+    for p in params:
+        by_ma.setdefault(p['ma_period'], []).append(p)
+
+    tasks = [(code, timeframe, ma_pd, sets, account, data_dir) for code in codes for ma_pd, sets in by_ma.items()]
+    workers = workers or os.cpu_count() or 1
+
+    print(f"🔬 [Sweep] {len(codes)}종목 x {len(params)}조합 (작업 {len(tasks)}개, 워커 {workers})")
+
+    rows = []
+    if workers == 1:
+        for task in tasks:
+            rows.extend(_run_task(task))
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for task_rows in executor.map(_run_task, tasks, chunksize=chunksize):
+                rows.extend(task_rows)
+
+    if not rows:
+        print("❌ 스윕 결과가 없습니다.")
+        return None
+
+    detail_df = pd.DataFrame(rows)
+    ranked = (
+        detail_df.groupby(PARAM_KEYS)
+        .agg(**{
+            'Mean_Return(%)': ('Return(%)', 'mean'),
+            'Median_Return(%)': ('Return(%)', 'median'),
+            'Win_Symbols(%)': ('Return(%)', lambda r: (r > 0).mean() * 100),
+            'Trades': ('Trades', 'sum'),
+            'Symbols': ('Code', 'count')
+        })
+        .reset_index()
+        .sort_values('Mean_Return(%)', ascending=False, kind='mergesort')
+        .reset_index(drop=True)
+    )
+    ranked['Mean_Return(%)'] = ranked['Mean_Return(%)'].round(2)
+    ranked['Win_Symbols(%)'] = ranked['Win_Symbols(%)'].round(1)
+
+    best = ranked.iloc[0]
+    print(f"🏆 최고 조합: MA{int(best['ma_period'])} / 오차 {best['tolerance']}% / "
+          f"TP {best['target_profit']}% / SL {best['stop_loss']}% -> 평균 {best['Mean_Return(%)']}%")
+
+    if detail:
+        return ranked, detail_df
+    return ranked
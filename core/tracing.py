@@ -0,0 +1,190 @@
+"""
+[주문 지연 추적]
+- 신호 -> 주문 제출 -> 전송(호출 제한 대기 후) -> 접수(ord_no) -> 첫 체결 통보 구간을 주문 단위로 잇습니다.
+    tracer.signal(code)                 전략이 매수/매도 신호를 낸 시점 (선택)
+    tracer.on_submit(code)              _send_order 진입 -> Span
+    tracer.on_dispatch(span)            호출 제한 통과, HTTP 전송 시작
+    tracer.on_ack(span, ord_no)         접수 응답 -> 이후 주문번호로 찾음
+    tracer.on_fill(ord_no)              ExecutionFeed의 첫 체결 통보
+                                        (접수 응답 처리보다 먼저 오면 fill_ttl초 동안 보관했다가 on_ack에서 연결)
+    tracer.on_reject(span)              접수되지 않았거나 전송하지 못한 주문 -> 제출~응답 구간만 기록하고 종료
+- 구간별 지연은 LatencyHistogram으로 모아 dump()로 JSON 저장 -> Streamlit '지연 추적' 탭에서 확인
+- 꺼져 있으면 호출하는 쪽에서 `if tracer.enabled:` 한 번만 확인하므로 비용이 거의 없습니다.
+  (환경 변수 ORDER_TRACE=1 이면 시작 시 켜짐)
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from core.metrics import LatencyHistogram
+
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DUMP_PATH = os.path.join(os.path.dirname(CORE_DIR), 'database', '.cache', 'latency_trace.json')
+
+# (구간 이름, 시작 단계, 끝 단계)
+STAGES = (
+    ('signal_to_submit', 't_signal', 't_submit'),
+    ('queue_wait', 't_submit', 't_dispatch'),
+    ('broker_ack', 't_dispatch', 't_ack'),
+    ('ack_to_fill', 't_ack', 't_fill'),
+    ('submit_to_fill', 't_submit', 't_fill'),
+    ('signal_to_fill', 't_signal', 't_fill'),
+)
+
+
+class Span:
+    __slots__ = ('code', 'ord_no', 't_signal', 't_submit', 't_dispatch', 't_ack', 't_fill')
+
+    def __init__(self, code, t_signal=None, t_submit=None):
+        self.code = code
+        self.ord_no = None
+        self.t_signal = t_signal
+        self.t_submit = t_submit
+        self.t_dispatch = None
+        self.t_ack = None
+        self.t_fill = None
+
+
+class Tracer:
+    def __init__(self, enabled=False, max_open=10000, signal_ttl=60.0, fill_ttl=30.0):
+        self.enabled = enabled
+        self.max_open = max_open        # 체결을 기다리는 주문 수 상한 (넘으면 오래된 것부터 버림)
+        self.signal_ttl = signal_ttl    # 신호 후 이 시간 안에 제출된 주문만 신호와 연결
+        self.fill_ttl = fill_ttl        # 접수 응답보다 먼저 온 체결 통보를 기다려 주는 시간
+        self.histograms = {name: LatencyHistogram() for name, _, _ in STAGES}
+        self._signals = {}              # code -> 신호 시각
+        self._open = OrderedDict()      # ord_no -> Span (접수 후 체결 대기)
+        self._early_fills = OrderedDict()  # ord_no -> 체결 시각 (아직 접수 응답을 처리하지 않은 주문)
+        self._lock = threading.Lock()
+        self.spans_started = 0
+        self.spans_completed = 0
+        self.spans_dropped = 0
+        self.early_fills = 0            # 접수 응답보다 먼저 도착한 체결 통보와 연결된 주문 수
+
+    def enable(self, dump_path=None):
+        """추적 시작. dump_path를 주면 프로그램 종료 시 그 경로로 저장"""
+        self.enabled = True
+        if dump_path:
+            atexit.register(self.dump, dump_path)
+
+    def disable(self):
+        self.enabled = False
+
+    # -----------------------------------------------------------
+    # 단계 기록 (호출 전에 tracer.enabled 확인)
+    # -----------------------------------------------------------
+    def signal(self, code):
+        with self._lock:
+            self._signals[code] = time.perf_counter()
+
+    def on_submit(self, code):
+        now = time.perf_counter()
+        with self._lock:
+            t_signal = self._signals.pop(code, None)
+            self.spans_started += 1
+        if t_signal is not None and now - t_signal > self.signal_ttl:
+            t_signal = None
+        return Span(code, t_signal, now)
+
+    def on_dispatch(self, span):
+        if span is not None:
+            span.t_dispatch = time.perf_counter()
+
+    def on_ack(self, span, ord_no):
+        if span is None: return
+        span.t_ack = time.perf_counter()
+        span.ord_no = ord_no
+        with self._lock:
+            t_fill = self._early_fills.pop(ord_no, None)
+            if t_fill is not None:
+                self.early_fills += 1
+            else:
+                self._open[ord_no] = span
+                while len(self._open) > self.max_open:
+                    self._open.popitem(last=False)
+                    self.spans_dropped += 1
+        if t_fill is not None:
+            span.t_fill = t_fill  # 체결 통보가 먼저 처리됨 (ack_to_fill은 0으로 기록)
+            self._record(span)
+
+    def on_reject(self, span):
+        """접수되지 않은 주문: 제출~응답 구간만 기록하고 종료"""
+        if span is None: return
+        span.t_ack = time.perf_counter()
+        self._record(span)
+
+    def on_fill(self, ord_no):
+        now = time.perf_counter()
+        with self._lock:
+            span = self._open.pop(ord_no, None)
+            if span is None:
+                # 접수 응답이 아직 처리되지 않은 주문일 수 있음 -> 잠시 보관 (첫 체결만)
+                # (이미 기록을 마친 주문의 분할 체결도 여기 들어오지만 fill_ttl 뒤 버려짐)
+                self._early_fills.setdefault(ord_no, now)
+                while self._early_fills:
+                    oldest = next(iter(self._early_fills.values()))
+                    if now - oldest <= self.fill_ttl and len(self._early_fills) <= self.max_open:
+                        break
+                    self._early_fills.popitem(last=False)
+                return
+        span.t_fill = now
+        self._record(span)
+
+    def _record(self, span):
+        for name, start, end in STAGES:
+            t0, t1 = getattr(span, start), getattr(span, end)
+            if t0 is not None and t1 is not None:
+                self.histograms[name].record(max(0.0, t1 - t0))
+        with self._lock:
+            self.spans_completed += 1
+
+    # -----------------------------------------------------------
+    # 요약 / 저장
+    # -----------------------------------------------------------
+    def summary(self):
+        return {name: hist.summary() for name, hist in self.histograms.items()}
+
+    def to_dict(self):
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'spans': {'started': self.spans_started, 'completed': self.spans_completed,
+                      'dropped': self.spans_dropped, 'open': len(self._open), 'early_fills': self.early_fills},
+            'stages': {name: hist.to_dict() for name, hist in self.histograms.items()}
+        }
+
+    def dump(self, path=None):
+        path = path or DEFAULT_DUMP_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._signals.clear()
+            self._open.clear()
+            self._early_fills.clear()
+            self.spans_started = self.spans_completed = self.spans_dropped = self.early_fills = 0
+        for hist in self.histograms.values():
+            hist.reset()
+
+
+def load_trace(path=None):
+    """dump()로 저장한 파일 읽기 (없으면 None)"""
+    path = path or DEFAULT_DUMP_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 프로세스 공용 추적기
+tracer = Tracer(enabled=os.environ.get('ORDER_TRACE') == '1')
+if tracer.enabled:
+    tracer.enable(DEFAULT_DUMP_PATH)
@@ -5,9 +5,26 @@ from .order_manager import KiwoomOrderManager
 
 # 2. 실시간 체결 통보 담당 (WebSocket)
 from .execution_feed import ExecutionFeed
+from .events import EventBus, FillEvent
+
+# 3. 체결 이벤트 기반 포지션/미체결 장부
+from .position_book import PositionBook
+
+# 4. 실시간 시세(틱) 피드와 전략 신호
+from .market_feed import MarketFeed, TickEvent, LiveSignals
+from .scanner import UniverseScanner
+from .bar_aggregator import BarAggregator
 
 # 외부에서 'from core.trader import KiwoomOrderManager' 형태로 사용 가능
 __all__ = [
     'KiwoomOrderManager',
-    'ExecutionFeed'
+    'ExecutionFeed',
+    'EventBus',
+    'FillEvent',
+    'PositionBook',
+    'MarketFeed',
+    'TickEvent',
+    'LiveSignals',
+    'UniverseScanner',
+    'BarAggregator'
 ]
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+[틱 -> 봉 집계기]
+- MarketFeed가 발행하는 TickEvent(REAL 0B)로 종목별 1분봉 / 일봉을 메모리에서 만듭니다.
+    1분봉: 체결시간(FID 20) 기준 분 단위, 거래량은 누적거래량 차이
+    일봉:  틱에 실려 오는 당일 시가/고가/저가/현재가/누적거래량 (장 마감 시 확정)
+- 완성된 봉은 큐에 넣기만 하고(피드 루프는 막히지 않음), 기록 스레드가 flush_interval마다 모아서
+  database/03_minute/{code}.jsonl, 02_daily/{code}.jsonl 에 파일당 한 번의 append로 씀
+    - 봉 한 개는 정확히 한 번만 기록 (파일 재작성 없음) -> 쓰기 증폭은 봉 크기 + 파일당 fsync 1회로 제한
+    - 이미 파일에 있는 날짜/시각 이하의 봉은 건너뜀 (재시작 후 같은 봉 중복 방지)
+    - 기록에 실패한 종목의 봉은 버리지 않고 남겨 두었다가 다음 주기에 다시 씀
+    - 원본이 바뀌면 Backtester.load_data의 컬럼형 캐시는 스탬프 비교로 자동 갱신
+- 체결이 뜸한 종목의 지난 분봉은 flush_interval마다 체결시간 기준으로 닫음 (틱 시각과 벽시계가 어긋나도 안전)
+
+사용 예:
+    agg = BarAggregator(data_dir)
+    asyncio.create_task(agg.consume(feed.bus.subscribe('bars', maxsize=100000)))
+    ...
+    agg.close_day()   # 15:30 이후: 마지막 분봉 + 일봉 확정
+    agg.close()
+"""
+import os
+import time
+import queue
+import atexit
+import asyncio
+import threading
+from datetime import datetime
+
+from core.data_cache import append_jsonl, read_last_row, row_time
+
+DAILY_FOLDER = "02_daily"
+MINUTE_FOLDER = "03_minute"
+
+
+class _Bar:
+    __slots__ = ('key', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, key, price):
+        self.key = key
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0
+
+    def add(self, price, volume):
+        if price > self.high: self.high = price
+        if price < self.low: self.low = price
+        self.close = price
+        self.volume += volume
+
+    def to_row(self, date):
+        return {'Date': date, 'Open': self.open, 'High': self.high, 'Low': self.low,
+                'Close': self.close, 'Volume': self.volume}
+
+
+class BarAggregator:
+    def __init__(self, data_dir, flush_interval=1.0, max_pending=20000, fsync=True):
+        self.data_dir = data_dir
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+
+        # 피드 루프(이벤트 루프 하나)에서만 건드리는 상태
+        self.day = None
+        self._minute = {}     # code -> 현재 1분봉 (_Bar, key = 'HHMM')
+        self._cum = {}        # code -> 직전 틱의 누적거래량
+        self._daily = {}      # code -> 마지막 틱 (당일 시가/고가/저가/현재가/누적거래량)
+        self._clock = None    # 지금까지 받은 틱 중 가장 늦은 체결시간 ('HHMM')
+        self.ticks = 0
+        self.late_ticks = 0
+
+        # 기록 스레드
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+        self._last_written = {}   # 파일 경로 -> 마지막으로 기록된 Date
+        self._cond = threading.Condition()
+        self._enqueued = 0
+        self._written = 0
+        self._retrying = 0        # 기록에 실패해 다시 쓰기를 기다리는 봉 수
+        self.bars_written = 0
+        self.bars_skipped = 0
+        self.appends = 0
+        self.bytes_written = 0
+        self.errors = 0
+
+    # -----------------------------------------------------------
+    # 집계 (피드 루프)
+    # -----------------------------------------------------------
+    def on_tick(self, event, day=None):
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        if self.day is not None and day != self.day:
+            self.close_day()
+        self.day = day
+        self.ticks += 1
+
+        code, price = event.code, event.price
+        minute = (event.time or datetime.now().strftime('%H%M%S'))[:4]
+        if self._clock is None or minute > self._clock:
+            self._clock = minute
+
+        prev_cum = self._cum.get(code)
+        if prev_cum is None or event.volume < prev_cum:
+            volume = abs(event.tick_volume)  # 오늘 첫 틱: 이번 체결량만 반영
+        else:
+            volume = event.volume - prev_cum
+        self._cum[code] = event.volume
+        self._daily[code] = event
+
+        bar = self._minute.get(code)
+        if bar is None:
+            self._minute[code] = bar = _Bar(minute, price)
+        elif minute > bar.key:
+            self._emit_minute(code, bar)
+            self._minute[code] = bar = _Bar(minute, price)
+        elif minute < bar.key:
+            self.late_ticks += 1  # 늦게 도착한 틱은 현재 봉에 합침 (이미 닫힌 봉은 다시 쓰지 않음)
+        bar.add(price, volume)
+
+    def roll(self, now=None):
+        """
+        체결이 뜸한 종목의 지난 분봉을 닫음
+        :param now: 'HHMM' - 기본은 지금까지 받은 틱 중 가장 늦은 체결시간 (봉 키와 같은 거래소 시각)
+        """
+        now = now or self._clock
+        if now is None: return
+        for code, bar in list(self._minute.items()):
+            if bar.key < now:
+                self._emit_minute(code, bar)
+                del self._minute[code]
+
+    def close_day(self):
+        """남은 분봉과 당일 일봉을 확정해 기록 큐로 보냄"""
+        if self.day is None: return 0
+        for code, bar in self._minute.items():
+            self._emit_minute(code, bar)
+        for code, tick in self._daily.items():
+            self._put(DAILY_FOLDER, code, {'Date': self.day, 'Open': tick.open, 'High': tick.high, 'Low': tick.low,
+                                           'Close': tick.price, 'Volume': tick.volume})
+        emitted = len(self._daily)
+        self._minute.clear()
+        self._cum.clear()
+        self._daily.clear()
+        self._clock = None
+        self.day = None
+        return emitted
+
+    def _emit_minute(self, code, bar):
+        self._put(MINUTE_FOLDER, code, bar.to_row(f"{self.day} {bar.key[:2]}:{bar.key[2:]}:00"))
+
+    async def consume(self, sub):
+        """MarketFeed 구독 큐 소비 (틱이 계속 와도, 없어도 flush_interval마다 지난 분봉을 닫음)"""
+        loop = asyncio.get_running_loop()
+        next_roll = loop.time() + self.flush_interval
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), timeout=max(0.0, next_roll - loop.time()))
+                self.on_tick(event)
+            except asyncio.TimeoutError:
+                pass
+            if loop.time() >= next_roll:
+                self.roll()
+                next_roll = loop.time() + self.flush_interval
+
+    # -----------------------------------------------------------
+    # 기록 (기록 스레드)
+    # -----------------------------------------------------------
+    def _put(self, folder, code, row):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BarAggregator is closed")
+            self._enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="bar-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        self._queue.put((folder, code, row))
+
+    def _writer(self):
+        pending, count = {}, 0  # count: 지난 기록 이후 새로 들어온 봉 수 (재시도 대기분 제외)
+        deadline = time.monotonic() + self.flush_interval
+        stop = False
+        while not stop:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is None:
+                    stop = True
+                else:
+                    folder, code, row = item
+                    pending.setdefault((folder, code), []).append(row)
+                    count += 1
+            except queue.Empty:
+                pass
+            if stop or count >= self.max_pending or time.monotonic() >= deadline:
+                if pending:
+                    pending = self._write(pending)
+                if stop and pending:  # 종료 시 마지막으로 한 번 더 시도
+                    time.sleep(self.flush_interval)
+                    pending = self._write(pending)
+                    if pending:
+                        print(f"❌ [BarAggregator] 종료 전 {self._retrying}개 봉을 기록하지 못했습니다.")
+                count = 0
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, pending):
+        """종목 파일별로 한 번씩 append -> 실패한 종목의 봉 {(folder, code): rows} (다음 주기에 다시 씀)"""
+        failed, done = {}, 0
+        for (folder, code), rows in pending.items():
+            path = os.path.join(self.data_dir, folder, f"{code}.jsonl")
+            try:
+                if path not in self._last_written:
+                    last = read_last_row(path)
+                    self._last_written[path] = row_time(last['Date']) if last and 'Date' in last else None
+                last_date = self._last_written[path]
+                fresh = [row for row in rows if last_date is None or row_time(row['Date']) > last_date]
+                self.bars_skipped += len(rows) - len(fresh)
+                if fresh:
+                    self.bytes_written += append_jsonl(path, fresh, fsync=self.fsync)
+                    self._last_written[path] = row_time(fresh[-1]['Date'])
+                    self.bars_written += len(fresh)
+                    self.appends += 1
+                done += len(rows)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ [BarAggregator] {folder}/{code} 기록 실패 ({len(rows)}개, 다음 주기에 재시도): {e}")
+                # 일부만 써졌을 수 있으므로 다음 시도는 파일의 마지막 봉을 다시 읽어 중복을 건너뜀
+                self._last_written.pop(path, None)
+                failed[(folder, code)] = rows
+        with self._cond:
+            self._written += done
+            self._retrying = sum(len(rows) for rows in failed.values())
+            self._cond.notify_all()
+        return failed
+
+    def flush(self, timeout=None):
+        """지금까지 큐에 넣은 봉이 파일에 기록될 때까지 대기 (재시도 포함) -> 완료되면 True"""
+        with self._cond:
+            target = self._enqueued
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self):
+        with self._cond:
+            if self._closed: return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self):
+        return {'ticks': self.ticks, 'late_ticks': self.late_ticks, 'open_minute_bars': len(self._minute),
+                'queued': self._enqueued - self._written, 'retrying': self._retrying,
+                'bars_written': self.bars_written,
+                'bars_skipped': self.bars_skipped, 'appends': self.appends,
+                'bytes_written': self.bytes_written, 'errors': self.errors}
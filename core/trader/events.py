@@ -0,0 +1,192 @@
+"""
+[체결 이벤트 / 이벤트 버스]
+- FillEvent: 체결통보(REAL) 한 건을 숫자 필드로 파싱한 가벼운 이벤트 (__slots__)
+- EventBus: 여러 비동기 구독자(리스크/포지션/UI)에게 각자의 제한된 큐로 이벤트를 나눠 줌
+    - 큐가 가득 찼을 때 정책: 'drop_oldest'(기본) / 'drop_new' / 'block'
+    - 느린 구독자는 자기 큐에서만 이벤트를 잃고, 다른 구독자와 발행자는 영향을 받지 않음
+      (단, 'block' 구독자는 자리가 날 때까지 발행자를 기다리게 함)
+"""
+import time
+import asyncio
+
+# 체결통보 FID
+FID_ACCOUNT = '9201'     # 계좌번호
+FID_ORDER_NO = '9203'    # 주문번호
+FID_CODE = '9001'        # 종목코드
+FID_NAME = '302'         # 종목명
+FID_STATUS = '913'       # 주문상태 (접수/체결/확인)
+FID_ORDER_QTY = '900'    # 주문수량
+FID_ORDER_PRICE = '901'  # 주문가격
+FID_UNFILLED = '902'     # 미체결수량
+FID_ORDER_TYPE = '905'   # 주문구분 (+매수, -매도 ...)
+FID_SIDE = '907'         # 매도수구분 (1:매도, 2:매수)
+FID_TIME = '908'         # 주문/체결시간 (HHMMSS)
+FID_FILL_PRICE = '910'   # 체결가
+FID_FILL_QTY = '911'     # 체결량
+
+POLICIES = ('drop_oldest', 'drop_new', 'block')
+
+
+def _num(value):
+    """'+72500', '-00072500', '1,000', '' -> 72500 / 1000 / 0 (등락 부호 제거)"""
+    if value is None: return 0
+    text = str(value).strip().replace(',', '').lstrip('+-')
+    if not text: return 0
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return int(float(text))
+        except ValueError:
+            return 0
+
+
+class FillEvent:
+    """주문 접수/체결 이벤트 한 건"""
+    __slots__ = ('order_no', 'code', 'name', 'status', 'side', 'order_type', 'price', 'qty',
+                 'order_qty', 'order_price', 'unfilled_qty', 'account', 'time', 'kind', 'received_at')
+
+    def __init__(self, order_no, code, name='', status='', side='', order_type='', price=0, qty=0,
+                 order_qty=0, order_price=0, unfilled_qty=0, account='', time='', kind='', received_at=0.0):
+        self.order_no = order_no
+        self.code = code
+        self.name = name
+        self.status = status
+        self.side = side              # 'BUY' / 'SELL' / ''
+        self.order_type = order_type
+        self.price = price            # 체결가 (int)
+        self.qty = qty                # 체결량 (int)
+        self.order_qty = order_qty
+        self.order_price = order_price
+        self.unfilled_qty = unfilled_qty
+        self.account = account
+        self.time = time
+        self.kind = kind              # REAL 항목 type ('00': 주문체결, '04': 잔고 ...)
+        self.received_at = received_at
+
+    @classmethod
+    def from_values(cls, values, kind=''):
+        """REAL 항목의 values(FID -> 문자열)에서 이벤트 생성, 주문번호가 없으면 None"""
+        order_no = values.get(FID_ORDER_NO)
+        if not order_no:
+            return None
+
+        side_code = str(values.get(FID_SIDE, '')).strip()
+        order_type = str(values.get(FID_ORDER_TYPE, '')).strip()
+        if side_code == '2' or order_type.startswith('+'):
+            side = 'BUY'
+        elif side_code == '1' or order_type.startswith('-'):
+            side = 'SELL'
+        else:
+            side = ''
+
+        return cls(
+            order_no=str(order_no).strip(),
+            code=str(values.get(FID_CODE, '')).strip().replace('A', ''),
+            name=str(values.get(FID_NAME, '')).strip(),
+            status=str(values.get(FID_STATUS, '')).strip(),
+            side=side,
+            order_type=order_type,
+            price=_num(values.get(FID_FILL_PRICE)),
+            qty=_num(values.get(FID_FILL_QTY)),
+            order_qty=_num(values.get(FID_ORDER_QTY)),
+            order_price=_num(values.get(FID_ORDER_PRICE)),
+            unfilled_qty=_num(values.get(FID_UNFILLED)),
+            account=str(values.get(FID_ACCOUNT, '')).strip(),
+            time=str(values.get(FID_TIME, '')).strip(),
+            kind=kind,
+            received_at=time.monotonic()
+        )
+
+    @property
+    def is_fill(self):
+        """실제 체결(체결량 > 0)인지 여부 (접수/확인 통보는 False)"""
+        return self.qty > 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"FillEvent({self.code} {self.side or '?'} {self.status} "
+                f"{self.qty}@{self.price} ord={self.order_no})")
+
+
+class Subscription:
+    """구독자 한 명의 제한된 큐 + 수신/손실 카운터 (async for 로 소비)"""
+    def __init__(self, bus, name, maxsize, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 정책: {policy} (사용 가능: {POLICIES})")
+        self.bus = bus
+        self.name = name
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.delivered = 0
+        self.dropped = 0
+
+    async def get(self):
+        event = await self.queue.get()
+        self.queue.task_done()
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def stats(self):
+        return {'policy': self.policy, 'depth': self.queue.qsize(), 'maxsize': self.queue.maxsize,
+                'delivered': self.delivered, 'dropped': self.dropped}
+
+
+class EventBus:
+    """발행 1 : 구독 N 팬아웃 버스 (이벤트 루프 하나 안에서 사용)"""
+    def __init__(self):
+        self._subs = []
+        self.received = 0
+        self.dispatched = 0
+        self.dropped = 0
+
+    def subscribe(self, name=None, maxsize=1000, policy='drop_oldest'):
+        sub = Subscription(self, name or f"sub{len(self._subs)}", maxsize, policy)
+        self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        if sub in self._subs:
+            self._subs.remove(sub)
+
+    async def publish(self, event):
+        """모든 구독자 큐에 이벤트를 넣음 (정책에 따라 버리거나 'block' 구독자는 자리가 날 때까지 대기)"""
+        self.received += 1
+        for sub in tuple(self._subs):
+            queue = sub.queue
+            if sub.policy == 'block':
+                await queue.put(event)
+            elif queue.full():
+                if sub.policy == 'drop_new':
+                    self._drop(sub)
+                    continue
+                queue.get_nowait()  # drop_oldest: 가장 오래된 이벤트를 버리고 새 이벤트를 넣음
+                queue.task_done()
+                self._drop(sub)
+                queue.put_nowait(event)
+            else:
+                queue.put_nowait(event)
+            sub.delivered += 1
+            self.dispatched += 1
+
+    def _drop(self, sub):
+        sub.dropped += 1
+        self.dropped += 1
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'dispatched': self.dispatched,
+            'dropped': self.dropped,
+            'subscribers': {sub.name: sub.stats() for sub in self._subs}
+        }
@@ -1,18 +1,27 @@
 import asyncio
 
+from core.trader.events import EventBus, FillEvent
+from core.tracing import tracer
+
 class ExecutionFeed:
     """
     [통합형 ExecutionFeed]
     - 매니저로부터 'REAL' 데이터를 받아 내 계좌 체결 내역만 필터링
+    - 체결통보를 FillEvent로 파싱해 EventBus로 발행 -> 리스크/포지션/UI가 각자 구독
+        sub = feed.bus.subscribe('position', maxsize=1000, policy='drop_oldest')
+        async for event in sub: ...
     """
-    def __init__(self, manager):
+    def __init__(self, manager, bus=None, verbose=True):
         self.manager = manager
         self.my_queue = None
+        self.bus = bus if bus is not None else EventBus()
+        self.verbose = verbose
+        self.parse_errors = 0
 
     async def run(self):
         # 1. 구독 (REAL 패킷 안에 체결통보가 섞여 옴)
         self.my_queue = await self.manager.register(['REAL'])
-        
+
         # 2. 데이터 소비 루프
         while True:
             data = await self.my_queue.get()
@@ -20,19 +29,23 @@ class ExecutionFeed:
             self.my_queue.task_done()
 
     async def handle_chejan(self, data):
-        try:
-            items = data.get('data', [])
-            for item in items:
-                values = item.get('values', {})
-                
+        items = data.get('data', []) if isinstance(data, dict) else []
+        for item in items:
+            try:
                 # 9203(주문번호)가 있으면 체결/잔고 데이터임
-                ord_no = values.get('9203')
-                if ord_no:
-                    code = values.get('9001', '').replace('A', '')
-                    name = values.get('302', '')
-                    status = values.get('913', '') # 접수/체결
-                    price = values.get('910', '0')
-                    qty = values.get('911', '0')
-                    
-                    print(f" 🔔 [체결알림] {name}({code}) | {status} | {qty}주 @ {price}원")
-        except: pass
\ No newline at end of file
+                event = FillEvent.from_values(item.get('values', {}), kind=item.get('type', ''))
+            except Exception as e:
+                self.parse_errors += 1
+                print(f"⚠️ [체결알림] 파싱 실패: {e}")
+                continue
+            if event is None:
+                continue
+            if tracer.enabled and event.is_fill:
+                tracer.on_fill(event.order_no)
+
+            if self.verbose:
+                print(f" 🔔 [체결알림] {event.name}({event.code}) | {event.status} | {event.qty}주 @ {event.price}원")
+            await self.bus.publish(event)
+
+    def stats(self):
+        return {**self.bus.stats(), 'parse_errors': self.parse_errors}
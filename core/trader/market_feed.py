@@ -0,0 +1,198 @@
+"""
+[실시간 시세 피드 / 실시간 전략 신호]
+- MarketFeed: 연결 매니저의 'REAL' 패킷 중 주식체결(0B)을 TickEvent로 파싱해 EventBus로 발행
+  (ExecutionFeed와 같은 구조, 종목 등록 REG 0B는 연결 매니저 쪽에서)
+- LiveSignals: TickEvent로 종목별 당일 봉(시가/고가/저가/현재가/누적거래량, Time=체결시간 HHMMSS)을 유지하고
+  전략 모듈의 stream()으로 신호를 계산 -> 신호가 바뀐 경우에만 SignalEvent 발행
+    - 장중 틱: peek (상태 변경 없음, 틱당 O(1)) -> '지금 장이 끝나면 나올 신호'
+    - 날짜가 바뀌거나 close_day(): 당일 봉 확정(update) -> calculate(df, i)와 같은 확정 신호
+      (확정 신호가 0이 아니면 장중에 이미 알린 신호라도 final=True로 한 번 더 발행)
+
+사용 예:
+    feed = MarketFeed(ws_manager)
+    live = LiveSignals(Cases_v2)
+    live.add('005930', history_df)          # Backtester.load_data 결과 (과거 일봉)
+    asyncio.create_task(feed.run())
+    asyncio.create_task(live.consume(feed.bus.subscribe('signals')))
+"""
+import time
+from datetime import datetime
+
+from core.trader.events import EventBus, _num
+
+# 주식체결(0B) FID
+FID_PRICE = '10'         # 현재가
+FID_CUM_VOLUME = '13'    # 누적거래량
+FID_TICK_VOLUME = '15'   # 거래량 (체결량, +매수/-매도)
+FID_OPEN = '16'          # 시가
+FID_HIGH = '17'          # 고가
+FID_LOW = '18'           # 저가
+FID_TICK_TIME = '20'     # 체결시간 (HHMMSS)
+
+TICK_TYPES = ('0B',)
+
+
+class TickEvent:
+    """주식체결 틱 한 건 (가격은 부호를 뗀 정수)"""
+    __slots__ = ('code', 'price', 'open', 'high', 'low', 'volume', 'tick_volume', 'time', 'received_at')
+
+    def __init__(self, code, price, open=0, high=0, low=0, volume=0, tick_volume=0, time='', received_at=0.0):
+        self.code = code
+        self.price = price
+        self.open = open
+        self.high = high
+        self.low = low
+        self.volume = volume              # 당일 누적거래량
+        self.tick_volume = tick_volume    # 이번 체결량
+        self.time = time
+        self.received_at = received_at
+
+    @classmethod
+    def from_values(cls, code, values):
+        """REAL 항목(item=종목코드, values=FID -> 문자열)에서 생성, 현재가가 없으면 None"""
+        price = _num(values.get(FID_PRICE))
+        if not code or price <= 0:
+            return None
+        return cls(
+            code=str(code).strip().replace('A', ''),
+            price=price,
+            open=_num(values.get(FID_OPEN)) or price,
+            high=_num(values.get(FID_HIGH)) or price,
+            low=_num(values.get(FID_LOW)) or price,
+            volume=_num(values.get(FID_CUM_VOLUME)),
+            tick_volume=_num(values.get(FID_TICK_VOLUME)),
+            time=str(values.get(FID_TICK_TIME, '')).strip(),
+            received_at=time.monotonic()
+        )
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"TickEvent({self.code} {self.price} vol={self.volume} {self.time})"
+
+
+class MarketFeed:
+    """REAL 시세 -> TickEvent -> EventBus"""
+    def __init__(self, manager, bus=None):
+        self.manager = manager
+        self.my_queue = None
+        self.bus = bus if bus is not None else EventBus()
+        self.parse_errors = 0
+
+    async def run(self):
+        self.my_queue = await self.manager.register(['REAL'])
+        while True:
+            data = await self.my_queue.get()
+            await self.handle_real(data)
+            self.my_queue.task_done()
+
+    async def handle_real(self, data):
+        items = data.get('data', []) if isinstance(data, dict) else []
+        for item in items:
+            if item.get('type') not in TICK_TYPES:
+                continue  # 주문체결(00) 등은 ExecutionFeed 담당
+            try:
+                event = TickEvent.from_values(item.get('item'), item.get('values', {}))
+            except Exception as e:
+                self.parse_errors += 1
+                print(f"⚠️ [시세] 파싱 실패: {e}")
+                continue
+            if event is not None:
+                await self.bus.publish(event)
+
+    def stats(self):
+        return {**self.bus.stats(), 'parse_errors': self.parse_errors}
+
+
+class SignalEvent:
+    """종목 신호 변경 한 건 (final=True면 봉 확정 신호)"""
+    __slots__ = ('code', 'signal', 'reason', 'price', 'day', 'final')
+
+    def __init__(self, code, signal, reason, price, day, final):
+        self.code = code
+        self.signal = signal
+        self.reason = reason
+        self.price = price
+        self.day = day
+        self.final = final
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"SignalEvent({self.code} {self.signal:+d} {self.reason} @ {self.price} {'확정' if self.final else '장중'})"
+
+
+class LiveSignals:
+    """종목별 전략 스트림 묶음 (이벤트 루프 하나 안에서 사용)"""
+    def __init__(self, strategy_module, config=None, bus=None):
+        if not hasattr(strategy_module, 'stream'):
+            raise ValueError(f"{getattr(strategy_module, '__name__', strategy_module)}에 stream()이 없습니다.")
+        self.strategy = strategy_module
+        self.config = config
+        self.bus = bus if bus is not None else EventBus()
+        self._streams = {}   # code -> 전략 스트림
+        self._bars = {}      # code -> (날짜, 당일 봉 dict)
+        self._last = {}      # code -> 마지막으로 알린 (signal, reason)
+        self.ticks = 0
+        self.changes = 0
+
+    def add(self, code, history=None):
+        """종목 등록 + 과거 일봉(날짜순 DataFrame)으로 지표 채우기"""
+        stream = self.strategy.stream(self.config)
+        if history is not None and len(history):
+            if 'Date' in history.columns:
+                history = history.sort_values('Date')
+            stream.warmup(history)
+        self._streams[code] = stream
+        self._last[code] = (0, "")
+        return stream
+
+    def on_tick(self, event, day=None):
+        """틱 반영 -> 신호가 바뀌었으면 SignalEvent 목록 (바뀐 게 없으면 빈 목록)"""
+        stream = self._streams.get(event.code)
+        if stream is None:
+            return []
+        self.ticks += 1
+        day = day or datetime.now().strftime('%Y%m%d')
+
+        changed = []
+        current = self._bars.get(event.code)
+        if current is not None and current[0] != day:
+            changed += self._commit(event.code)
+
+        bar = {'Open': event.open, 'High': event.high, 'Low': event.low,
+               'Close': event.price, 'Volume': event.volume, 'Time': _num(event.time)}
+        self._bars[event.code] = (day, bar)
+        changed += self._notify(event.code, stream.peek(bar), bar, day, final=False)
+        return changed
+
+    def close_day(self):
+        """장 마감: 모든 종목의 당일 봉을 확정 -> 확정 신호가 바뀐 종목의 SignalEvent 목록"""
+        changed = []
+        for code in list(self._bars):
+            changed += self._commit(code)
+        return changed
+
+    def _commit(self, code):
+        day, bar = self._bars.pop(code)
+        return self._notify(code, self._streams[code].update(bar), bar, day, final=True)
+
+    def _notify(self, code, result, bar, day, final):
+        signal, reason = result
+        # 장중 신호는 바뀔 때만, 확정 신호는 0이 아니면 장중과 같아도 다시 알림
+        if (signal, reason) == self._last.get(code) and not (final and signal):
+            return []
+        self._last[code] = (signal, reason)
+        self.changes += 1
+        return [SignalEvent(code, signal, reason, bar['Close'], day, final)]
+
+    async def consume(self, sub):
+        """MarketFeed 구독 큐를 소비하며 바뀐 신호를 bus로 발행"""
+        async for event in sub:
+            for signal_event in self.on_tick(event):
+                await self.bus.publish(signal_event)
+
+    def stats(self):
+        return {'symbols': len(self._streams), 'ticks': self.ticks, 'changes': self.changes}
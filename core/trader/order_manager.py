@@ -4,8 +4,13 @@ import hashlib
 import hmac
 import sys
 import os
+import time
+import asyncio
 import logging
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # -----------------------------------------------------------
 # [경로 설정]
@@ -20,9 +25,21 @@ config_dir = os.path.join(root_dir, 'config')
 if config_dir not in sys.path: sys.path.append(config_dir)
 
 try:
-    from config import load_secrets
+    from config import load_secrets, get_token_provider
 except ImportError:
     def load_secrets(): return {}
+    get_token_provider = None
+
+# 비동기 HTTP 클라이언트 (없으면 스레드 풀에서 동기 세션을 돌리는 방식으로 대체)
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from core.metrics import LatencyRecorder
+from core.request_scheduler import get_request_scheduler
+from core.trader.safety_journal import SafetyJournal
+from core.tracing import tracer
 
 # 로깅 설정
 logger = logging.getLogger("OrderMgr")
@@ -35,12 +52,20 @@ class KiwoomOrderManager:
     - 기능 2: 중복 매수 방지 및 일일 매수 종목 수 제한
     - 기능 3: Streamer와의 호환성을 위한 통합 인터페이스 제공
     """
-    def __init__(self, mode='2', account_no=None):
+    def __init__(self, mode='2', account_no=None, connect_timeout=3.0, read_timeout=10.0, pool_size=10, host=None,
+                 token_provider=None, scheduler=None, journal=None):
+        """
+        :param journal: 매수 기록 저널 (SafetyJournal 또는 스냅샷 경로). 없으면 core/trader/trading_history.json
+                        (시뮬레이터/벤치마크는 실제 매매 기록을 건드리지 않도록 임시 경로를 넘김)
+        """
         self.mode = mode
         self.account_no = account_no
         
-        # 1. 호스트 설정
-        if self.mode == '2':
+        # 1. 호스트 설정 (host를 주면 로컬 시뮬레이터 등으로 대체)
+        if host:
+            self.host = host.rstrip('/')
+            logger.info(f"🔧 [Trader] 사용자 지정 호스트: {self.host}")
+        elif self.mode == '2':
             self.host = 'https://mockapi.kiwoom.com'
             logger.info("🔧 [Trader] 모의투자 주문 모드")
         else:
@@ -48,18 +73,42 @@ class KiwoomOrderManager:
             logger.info("🔧 [Trader] 실전투자 주문 모드")
             
         self.endpoint = '/api/dostk/ordr'
+
+        # 🔌 [연결 풀] 주문마다 TLS 핸드셰이크를 새로 하지 않도록 keep-alive 세션 재사용
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._async_session = None  # aiohttp 세션은 이벤트 루프 안에서 처음 주문할 때 생성
+
+        # ⏱️ 주문 전송 ~ 접수 응답까지 걸린 시간 (호출 제한 대기 시간은 scheduler.stats()에 따로 기록)
+        self.order_latency = LatencyRecorder()
+
+        # 🚦 [호출 제한] 계좌 조회와 같은 한도를 나눠 쓰되 주문이 항상 먼저 전송됨
+        self.scheduler = scheduler if scheduler is not None else get_request_scheduler(self.mode)
         
         # 2. 키 정보 로드
         self.app_key = None
         self.app_secret = None
-        self.access_token = None
+        self.access_token = None  # set_token()으로 고정한 토큰 (있으면 토큰 관리자보다 우선)
+        self.token_provider = token_provider
         self._load_keys()
 
         # 🛡️ [안전장치 설정]
         self.max_daily_stocks = 5  # 하루 최대 매수 종목 수
-        self.history_file = os.path.join(core_trader_dir, 'trading_history.json')
+        if journal is None:
+            journal = os.path.join(core_trader_dir, 'trading_history.json')
+        # 매수 기록은 {스냅샷}.journal에 추가 기록, 스냅샷은 저널 압축 시 갱신
+        self.journal = journal if isinstance(journal, SafetyJournal) else SafetyJournal(journal)
+        self.history_file = self.journal.snapshot_path
         self.bought_today = set()  # 오늘 매수한 종목 코드 집합
+        self.pending_buys = set()  # 안전검사를 통과해 전송 중인 매수 (동시 주문이 한도를 넘지 않도록 예약)
+        self._safety_lock = threading.RLock()
         self.today_date = datetime.now().strftime("%Y%m%d")
+        self.basket_concurrency = pool_size  # 바스켓 주문 동시 전송 수 기본값
         
         # 프로그램 시작 시 과거 기록 로드 (재실행 대비)
         self._load_history()
@@ -73,96 +122,133 @@ class KiwoomOrderManager:
         :param type: "BUY" or "SELL"
         :param trade_type: '00'(지정가), '03'(시장가). 기본값은 시장가.
         """
+        # 비동기 경로로 전송 -> 주문 응답을 기다리는 동안에도 웹소켓 피드 루프가 멈추지 않음
         if type == "BUY":
-            # 동기 함수지만 HTTP 요청이므로 await 없이 호출 (비동기 래핑 필요 없음)
-            return self.send_buy_order(code, qty, price, trade_type)
+            return await self.send_buy_order_async(code, qty, price, trade_type)
         elif type == "SELL":
-            return self.send_sell_order(code, qty, price, trade_type)
+            return await self.send_sell_order_async(code, qty, price, trade_type)
         else:
             logger.error(f"❌ 알 수 없는 주문 타입: {type}")
             return None
 
+    async def close(self):
+        """연결 풀 정리 (프로그램 종료 시 호출)"""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self.session.close()
+        self.journal.close()
+
+    def latency_report(self):
+        """주문 전송 ~ 접수 응답 지연시간 요약 (ms)"""
+        return self.order_latency.summary()
+
     # -------------------------------------------------------
     # 🛡️ 안전장치 로직 (Safety Guard)
     # -------------------------------------------------------
     def _load_history(self):
-        """파일에서 오늘 매매 기록을 불러옴"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    saved_date = data.get('date')
-                    
-                    # 날짜가 오늘과 같으면 기록 복구
-                    if saved_date == self.today_date:
-                        self.bought_today = set(data.get('bought_codes', []))
-                        logger.info(f"💾 [History] 금일 매매 복원: {len(self.bought_today)}종목 ({list(self.bought_today)})")
-                    else:
-                        logger.info("📅 [History] 날짜가 변경되어 매매 기록을 초기화합니다.")
-                        self.bought_today = set()
-            except Exception as e:
-                logger.error(f"⚠️ 기록 로드 실패: {e}")
-                self.bought_today = set()
+        """스냅샷 + 저널을 재생해 오늘 매매 기록을 복원"""
+        try:
+            self.bought_today = self.journal.load(self.today_date)
+            if self.bought_today:
+                logger.info(f"💾 [History] 금일 매매 복원: {len(self.bought_today)}종목 ({list(self.bought_today)})")
+            else:
+                logger.info("📅 [History] 오늘 매수 기록이 없어 빈 상태로 시작합니다.")
+        except Exception as e:
+            logger.error(f"⚠️ 기록 로드 실패: {e}")
+            self.bought_today = set()
 
-    def _save_history(self):
-        """매매 기록을 파일에 저장"""
+    def _record_history(self, code=None):
+        """매수(code) 또는 날짜 변경(code=None)을 저널에 추가 (디스크 확정은 백그라운드에서 묶어서 fsync)"""
         try:
-            data = {
-                'date': self.today_date,
-                'bought_codes': list(self.bought_today)
-            }
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            if code is None:
+                self.journal.record_reset(self.today_date)
+            else:
+                self.journal.record_buy(self.today_date, code)
         except Exception as e:
             logger.error(f"⚠️ 기록 저장 실패: {e}")
 
     def _check_safety(self, code):
-        """주문 전 안전 규칙 검사"""
-        current_date = datetime.now().strftime("%Y%m%d")
-        if current_date != self.today_date:
-            self.today_date = current_date
-            self.bought_today = set()
-            self._save_history()
+        """주문 전 안전 규칙 검사 (전송 중인 매수도 오늘 매수한 것으로 간주)"""
+        with self._safety_lock:
+            current_date = datetime.now().strftime("%Y%m%d")
+            if current_date != self.today_date:
+                self.today_date = current_date
+                self.bought_today = set()
+                self._record_history()
 
-        # 1. 중복 매수 체크
-        if code in self.bought_today:
-            logger.warning(f"⛔ [매수거부] 중복 진입 방지: 이미 오늘 매수한 종목입니다. ({code})")
-            return False
+            # 1. 중복 매수 체크
+            if code in self.bought_today or code in self.pending_buys:
+                logger.warning(f"⛔ [매수거부] 중복 진입 방지: 이미 오늘 매수한 종목입니다. ({code})")
+                return False
 
-        # 2. 종목 수 제한 체크
-        if len(self.bought_today) >= self.max_daily_stocks:
-            logger.warning(f"⛔ [매수거부] 일일 한도 초과: 오늘 이미 {len(self.bought_today)}종목을 매수했습니다.")
-            return False
-            
-        return True
+            # 2. 종목 수 제한 체크
+            used = len(self.bought_today) + len(self.pending_buys)
+            if used >= self.max_daily_stocks:
+                logger.warning(f"⛔ [매수거부] 일일 한도 초과: 오늘 이미 {used}종목을 매수(전송 중 포함)했습니다.")
+                return False
+
+            return True
+
+    def _reserve_buy(self, code):
+        """안전검사와 예약을 한 번에 (검사~체결 사이에 다른 주문이 끼어들어도 한도 유지)"""
+        with self._safety_lock:
+            if not self._check_safety(code):
+                return False
+            self.pending_buys.add(code)
+            return True
+
+    def _finish_buy(self, code, result):
+        """예약 해제 + 성공 시 매수 기록 반영"""
+        with self._safety_lock:
+            self.pending_buys.discard(code)
+            if result and result.get('rt_cd') == '0':
+                self.bought_today.add(code)
+                self._record_history(code)
+                logger.info(f"✅ [Safety] 금일 매수 목록 업데이트: {len(self.bought_today)}/{self.max_daily_stocks}")
 
     # -------------------------------------------------------
     # 🛒 매수 주문 (Buy) - 안전장치 적용
     # -------------------------------------------------------
     def send_buy_order(self, code, qty, price=0, trade_type='03'):
-        # [Step 1] 안전장치 검사
-        if not self._check_safety(code):
+        # [Step 1] 안전장치 검사 + 예약
+        if not self._reserve_buy(code):
             return None 
 
         # [Step 2] 주문 전송 (시장가인 경우 가격 0으로 설정)
         final_price = "0" if trade_type == '03' else str(price)
-        
-        result = self._send_order(
-            api_id='kt10000',
-            code=code, 
-            qty=qty, 
-            price=final_price, 
-            trade_type=trade_type
-        )
-        
-        # [Step 3] 성공 시 기록 업데이트
-        if result and result.get('rt_cd') == '0':
-            self.bought_today.add(code)
-            self._save_history()
-            logger.info(f"✅ [Safety] 금일 매수 목록 업데이트: {len(self.bought_today)}/{self.max_daily_stocks}")
+        result = None
+        try:
+            result = self._send_order(
+                api_id='kt10000',
+                code=code, 
+                qty=qty, 
+                price=final_price, 
+                trade_type=trade_type
+            )
+        finally:
+            # [Step 3] 예약 해제, 성공 시 기록 업데이트
+            self._finish_buy(code, result)
             
         return result
 
+    async def send_buy_order_async(self, code, qty, price=0, trade_type='03'):
+        """send_buy_order와 같은 안전장치를 거치는 비동기 버전"""
+        # [Step 1] 안전장치 검사 + 예약
+        if not self._reserve_buy(code):
+            return None
+
+        # [Step 2] 주문 전송 (시장가인 경우 가격 0으로 설정)
+        final_price = "0" if trade_type == '03' else str(price)
+        result = None
+        try:
+            result = await self._send_order_async('kt10000', code, qty, final_price, trade_type)
+        finally:
+            # [Step 3] 예약 해제, 성공 시 기록 업데이트
+            self._finish_buy(code, result)
+
+        return result
+
     # -------------------------------------------------------
     # 📉 매도 주문 (Sell) - 매도는 제한 없음
     # -------------------------------------------------------
@@ -176,35 +262,169 @@ class KiwoomOrderManager:
             trade_type=trade_type
         )
 
+    async def send_sell_order_async(self, code, qty, price=0, trade_type='03'):
+        final_price = "0" if trade_type == '03' else str(price)
+        return await self._send_order_async('kt10001', code, qty, final_price, trade_type)
+
+    # -------------------------------------------------------
+    # 🧺 바스켓 주문 - 여러 종목을 한 번에 (동시 전송 수 제한)
+    # -------------------------------------------------------
+    @staticmethod
+    def _normalize_leg(leg):
+        """(code, side, qty[, price[, trade_type]]) 또는 dict -> dict"""
+        if isinstance(leg, dict):
+            code, side, qty = leg['code'], leg['side'], leg['qty']
+            price, trade_type = leg.get('price', 0), leg.get('trade_type', '03')
+        else:
+            code, side, qty, *rest = leg
+            price = rest[0] if len(rest) > 0 else 0
+            trade_type = rest[1] if len(rest) > 1 else '03'
+        return {'code': code, 'side': str(side).upper(), 'qty': qty, 'price': price, 'trade_type': trade_type}
+
+    def _reserve_basket(self, legs):
+        """
+        바스켓 전체의 매수 안전검사를 한 번에 수행하고 통과한 다리를 예약합니다.
+        입력 순서대로 한도를 배정하므로 앞쪽 종목이 우선입니다.
+        :return: 각 다리의 거부 사유 목록 (통과면 None)
+        """
+        reasons = []
+        with self._safety_lock:
+            for leg in legs:
+                if leg['side'] == 'SELL':
+                    reasons.append(None)
+                elif leg['side'] != 'BUY':
+                    reasons.append(f"알 수 없는 주문 타입: {leg['side']}")
+                elif self._reserve_buy(leg['code']):
+                    reasons.append(None)
+                elif leg['code'] in self.bought_today or leg['code'] in self.pending_buys:
+                    reasons.append("안전장치 거부: 중복 매수")
+                else:
+                    reasons.append("안전장치 거부: 일일 매수 종목 수 한도")
+        return reasons
+
+    def _leg_report(self, leg, status, result=None, error=None, queued=0.0, latency=0.0, done=0.0):
+        return {
+            **leg,
+            'status': status,            # 'accepted' / 'failed' / 'rejected'
+            'result': result,
+            'error': error,
+            'queued_ms': round(queued * 1000, 3),    # 바스켓 시작 ~ 이 다리 전송 시작
+            'latency_ms': round(latency * 1000, 3),  # 전송 ~ 응답
+            'done_ms': round(done * 1000, 3)         # 바스켓 시작 ~ 응답
+        }
+
+    async def send_basket_async(self, legs, max_concurrency=None):
+        """
+        여러 주문을 동시에 전송합니다. (aiohttp 경로, 동시 전송 수는 max_concurrency로 제한)
+        :param legs: [(code, side, qty, price, trade_type), ...] - side는 "BUY"/"SELL"
+        :return: 입력 순서와 같은 다리별 결과/시간 목록
+        """
+        legs = [self._normalize_leg(leg) for leg in legs]
+        reasons = self._reserve_basket(legs)
+        sem = asyncio.Semaphore(max_concurrency or self.basket_concurrency)
+        basket_start = time.perf_counter()
+
+        async def run_leg(leg, reason):
+            if reason:
+                return self._leg_report(leg, 'rejected', error=reason)
+            async with sem:
+                start = time.perf_counter()
+                result, error = None, None
+                final_price = "0" if leg['trade_type'] == '03' else str(leg['price'])
+                api_id = 'kt10000' if leg['side'] == 'BUY' else 'kt10001'
+                try:
+                    result = await self._send_order_async(api_id, leg['code'], leg['qty'], final_price, leg['trade_type'])
+                except Exception as e:
+                    error = str(e)
+                finally:
+                    if leg['side'] == 'BUY':
+                        self._finish_buy(leg['code'], result)
+                end = time.perf_counter()
+            return self._leg_report(leg, 'accepted' if result else 'failed', result, error,
+                                    start - basket_start, end - start, end - basket_start)
+
+        return list(await asyncio.gather(*(run_leg(leg, reason) for leg, reason in zip(legs, reasons))))
+
+    def send_basket(self, legs, max_concurrency=None):
+        """send_basket_async의 동기 버전 (스레드 풀에서 동시 전송)"""
+        legs = [self._normalize_leg(leg) for leg in legs]
+        reasons = self._reserve_basket(legs)
+        basket_start = time.perf_counter()
+
+        def run_leg(leg):
+            start = time.perf_counter()
+            result, error = None, None
+            final_price = "0" if leg['trade_type'] == '03' else str(leg['price'])
+            api_id = 'kt10000' if leg['side'] == 'BUY' else 'kt10001'
+            try:
+                result = self._send_order(api_id, leg['code'], leg['qty'], final_price, leg['trade_type'])
+            except Exception as e:
+                error = str(e)
+            finally:
+                if leg['side'] == 'BUY':
+                    self._finish_buy(leg['code'], result)
+            end = time.perf_counter()
+            return self._leg_report(leg, 'accepted' if result else 'failed', result, error,
+                                    start - basket_start, end - start, end - basket_start)
+
+        reports = [None] * len(legs)
+        workers = max(1, min(max_concurrency or self.basket_concurrency, len(legs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="basket") as pool:
+            futures = {}
+            for k, (leg, reason) in enumerate(zip(legs, reasons)):
+                if reason:
+                    reports[k] = self._leg_report(leg, 'rejected', error=reason)
+                else:
+                    futures[k] = pool.submit(run_leg, leg)
+            for k, future in futures.items():
+                reports[k] = future.result()
+        return reports
+
     # -------------------------------------------------------
     # 🔑 기타 내부 메서드
     # -------------------------------------------------------
     def set_token(self, token):
         self.access_token = token
 
+    def _current_token(self):
+        """주문 직전 토큰 조회: 메모리에서 바로 반환 (만료 전 재발급은 TokenProvider가 백그라운드로 처리)"""
+        if self.access_token:
+            return self.access_token
+        if self.token_provider is not None:
+            return self.token_provider.get_token()
+        return None
+
+    async def _current_token_async(self):
+        """비동기 주문용 토큰 조회: 발급이 필요해도 이벤트 루프를 막지 않음"""
+        if self.access_token:
+            return self.access_token
+        provider = self.token_provider
+        if provider is None:
+            return None
+        if hasattr(provider, 'get_token_async'):
+            return await provider.get_token_async()
+        return await asyncio.to_thread(provider.get_token)
+
     def _load_keys(self):
-        secrets = load_secrets()
+        secrets = load_secrets() or {}
         key_name = 'MOCK' if self.mode == '2' else 'REAL'
         key_info = secrets.get(key_name, {})
         self.app_key = key_info.get('APP_KEY')
         self.app_secret = key_info.get('SECRET_KEY')
         if not self.account_no:
             self.account_no = key_info.get('ACCOUNT')
-        if not self.access_token:
-            token_path = os.path.join(config_dir, 'ACCESS_TOKEN.txt')
-            if os.path.exists(token_path):
-                try:
-                    with open(token_path, 'r', encoding='utf-8') as f:
-                        self.access_token = f.read().strip()
-                except: pass
+        # 토큰은 모드별 공용 관리자가 메모리에 보관 (저장된 토큰 파일은 관리자 생성 시 1회만 읽음)
+        if self.token_provider is None and get_token_provider is not None:
+            self.token_provider = get_token_provider(self.mode)
 
     def _generate_hashkey(self, data: dict) -> str:
         if not self.app_secret: return ""
         json_data = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
         return hmac.new(self.app_secret.encode('utf-8'), json_data.encode('utf-8'), hashlib.sha256).hexdigest()
 
-    def _send_order(self, api_id, code, qty, price, trade_type):
-        if not self.access_token or not self.app_key:
+    def _build_order_request(self, api_id, code, qty, price, trade_type, token):
+        """주문 요청의 (url, headers, body)를 만듭니다. 토큰/앱키가 없으면 None"""
+        if not token or not self.app_key:
             logger.error("❌ 토큰 또는 앱키 누락")
             return None
 
@@ -220,7 +440,7 @@ class KiwoomOrderManager:
 
         headers = {
             'Content-Type': 'application/json;charset=UTF-8',
-            'authorization': f'Bearer {self.access_token}',
+            'authorization': f'Bearer {token}',
             'appKey': self.app_key,
             'appSecret': self.app_secret,
             'api-id': api_id,
@@ -229,27 +449,102 @@ class KiwoomOrderManager:
         }
         
         url = f"{self.host}{self.endpoint}"
+
+        side = "매수" if api_id == 'kt10000' else "매도"
+        type_str = "시장가" if trade_type == '03' else "지정가"
+        logger.info(f"🚀 [{side}/{type_str}] {code} {qty}주 전송 중...")
+        return url, headers, request_body
+
+    def _handle_order_response(self, status_code, res_json, text):
+        if status_code == 200:
+            if res_json.get('rt_cd') == '0':
+                ord_no = res_json.get('ord_no')
+                logger.info(f"✅ 주문 접수 완료 (번호: {ord_no})")
+                return res_json
+            else:
+                logger.error(f"❌ 주문 거부: {res_json.get('msg1')}")
+        else:
+            logger.error(f"💥 통신 실패: {status_code} | {text}")
+        return None
+
+    def _trace_result(self, span, result):
+        if result:
+            tracer.on_ack(span, result.get('ord_no'))
+        else:
+            tracer.on_reject(span)
+
+    def _send_order(self, api_id, code, qty, price, trade_type):
+        span = tracer.on_submit(code) if tracer.enabled else None
+        request = self._build_order_request(api_id, code, qty, price, trade_type, self._current_token())
+        if request is None:
+            tracer.on_reject(span)  # 시작한 추적은 항상 닫음
+            return None
+        url, headers, request_body = request
         
         try:
-            side = "매수" if api_id == 'kt10000' else "매도"
-            type_str = "시장가" if trade_type == '03' else "지정가"
-            logger.info(f"🚀 [{side}/{type_str}] {code} {qty}주 전송 중...")
-            
-            response = requests.post(url, headers=headers, json=request_body)
-            
-            if response.status_code == 200:
-                res_json = response.json()
-                if res_json.get('rt_cd') == '0':
-                    ord_no = res_json.get('ord_no')
-                    logger.info(f"✅ 주문 접수 완료 (번호: {ord_no})")
-                    return res_json
-                else:
-                    logger.error(f"❌ 주문 거부: {res_json.get('msg1')}")
-            else:
-                logger.error(f"💥 통신 실패: {response.status_code} | {response.text}")
+            self.scheduler.acquire(api_id)
+            if span is not None: tracer.on_dispatch(span)
+            start = time.perf_counter()
+            response = self.session.post(url, headers=headers, json=request_body,
+                                         timeout=(self.connect_timeout, self.read_timeout))
+            self.order_latency.record(time.perf_counter() - start)
+            if response.status_code == 429:
+                self.scheduler.penalize()
+
+            res_json = response.json() if response.status_code == 200 else {}
+            result = self._handle_order_response(response.status_code, res_json, response.text)
+            if span is not None: self._trace_result(span, result)
+            return result
                 
         except Exception as e:
             logger.error(f"⚠️ 주문 에러: {e}")
+            if span is not None and span.t_ack is None:
+                tracer.on_reject(span)
+        return None
+
+    def _get_async_session(self):
+        if self._async_session is None or self._async_session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            timeout = aiohttp.ClientTimeout(total=self.connect_timeout + self.read_timeout,
+                                            sock_connect=self.connect_timeout)
+            self._async_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._async_session
+
+    async def _send_order_async(self, api_id, code, qty, price, trade_type):
+        """
+        이벤트 루프를 막지 않는 주문 전송.
+        aiohttp가 없으면 동기 세션 호출을 스레드로 넘겨서 루프를 막지 않게 함
+        """
+        if aiohttp is None:
+            return await asyncio.to_thread(self._send_order, api_id, code, qty, price, trade_type)
+
+        span = tracer.on_submit(code) if tracer.enabled else None
+        token = await self._current_token_async()
+        request = self._build_order_request(api_id, code, qty, price, trade_type, token)
+        if request is None:
+            tracer.on_reject(span)  # 시작한 추적은 항상 닫음
+            return None
+        url, headers, request_body = request
+
+        try:
+            session = self._get_async_session()
+            await self.scheduler.acquire_async(api_id)
+            if span is not None: tracer.on_dispatch(span)
+            start = time.perf_counter()
+            async with session.post(url, headers=headers, json=request_body) as response:
+                text = await response.text()
+                self.order_latency.record(time.perf_counter() - start)
+                if response.status == 429:
+                    self.scheduler.penalize()
+                res_json = json.loads(text) if response.status == 200 else {}
+                result = self._handle_order_response(response.status, res_json, text)
+                if span is not None: self._trace_result(span, result)
+                return result
+
+        except Exception as e:
+            logger.error(f"⚠️ 주문 에러: {e}")
+            if span is not None and span.t_ack is None:
+                tracer.on_reject(span)
         return None
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""
+[실시간 포지션/주문 장부]
+- ExecutionFeed의 FillEvent로 보유 종목과 미체결 주문을 증분 갱신합니다. (REST 조회 없음)
+- 증권사 잔고(kt00018)와는 주기적으로, 또는 장부가 어긋난 것이 감지되면 대조(reconcile)합니다.
+- position(code) / has_open_order(code) / available_cash() 는 모두 dict 조회 O(1)
+
+사용 예:
+    book = PositionBook()
+    asyncio.create_task(book.consume(feed.bus.subscribe('position', policy='block')))
+    asyncio.create_task(book.run_reconcile(account_manager, interval=300))
+"""
+import time
+import asyncio
+import threading
+
+# 주문이 더 이상 살아 있지 않은 상태
+_CLOSED_STATUS = ('취소', '거부')
+
+
+class Position:
+    __slots__ = ('code', 'qty', 'avg_price', 'realized_pnl', 'last_price', 'updated_at')
+
+    def __init__(self, code, qty=0, avg_price=0.0, realized_pnl=0.0, last_price=0, updated_at=0.0):
+        self.code = code
+        self.qty = qty
+        self.avg_price = avg_price
+        self.realized_pnl = realized_pnl
+        self.last_price = last_price
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"Position({self.code} {self.qty}주 @ {self.avg_price:,.0f})"
+
+
+class OpenOrder:
+    __slots__ = ('order_no', 'code', 'side', 'order_qty', 'order_price', 'filled_qty', 'unfilled_qty', 'status', 'updated_at')
+
+    def __init__(self, order_no, code, side='', order_qty=0, order_price=0, filled_qty=0, unfilled_qty=0, status='', updated_at=0.0):
+        self.order_no = order_no
+        self.code = code
+        self.side = side
+        self.order_qty = order_qty
+        self.order_price = order_price
+        self.filled_qty = filled_qty
+        self.unfilled_qty = unfilled_qty
+        self.status = status
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"OpenOrder({self.order_no} {self.code} {self.side} {self.filled_qty}/{self.order_qty} {self.status})"
+
+
+class PositionBook:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.positions = {}       # code -> Position
+        self.orders = {}          # order_no -> OpenOrder (미체결만)
+        self._orders_by_code = {} # code -> {order_no}
+        self.cash = None          # 주문가능금액 (대조 시 설정, 체결로 증감)
+
+        self.events_applied = 0
+        self.reconciles = 0
+        self.reconcile_retries = 0
+        self.mismatches = 0
+        self._fill_seq = 0            # 포지션/예수금을 바꾼 체결 수 (대조 중 끼어든 체결 감지용)
+        self.reconcile_deferred = False
+        self.last_reconciled = 0.0
+        self._needs_reconcile = None  # run_reconcile()이 이벤트 루프 안에서 생성
+
+    # -----------------------------------------------------------
+    # 조회 (O(1))
+    # -----------------------------------------------------------
+    def position(self, code):
+        return self.positions.get(code)
+
+    def position_qty(self, code):
+        pos = self.positions.get(code)
+        return pos.qty if pos else 0
+
+    def has_open_order(self, code, side=None):
+        order_nos = self._orders_by_code.get(code)
+        if not order_nos: return False
+        if side is None: return True
+        return any(self.orders[no].side == side for no in order_nos)
+
+    def open_orders(self, code=None):
+        if code is None:
+            return list(self.orders.values())
+        return [self.orders[no] for no in self._orders_by_code.get(code, ())]
+
+    def available_cash(self):
+        """마지막 대조 이후 체결을 반영한 주문가능금액 추정치 (대조 전이면 None)"""
+        return self.cash
+
+    # -----------------------------------------------------------
+    # 체결 이벤트 반영
+    # -----------------------------------------------------------
+    def apply(self, event):
+        """
+        FillEvent 한 건 반영.
+        911(체결량)은 주문 단위 누적값이므로 이전 누적과의 차이만 포지션에 더합니다.
+        (같은 통보가 중복으로 와도 포지션이 두 번 바뀌지 않음)
+        """
+        with self._lock:
+            self.events_applied += 1
+            now = time.time()
+            order = self.orders.get(event.order_no)
+            if order is None:
+                order = OpenOrder(event.order_no, event.code, event.side, event.order_qty, event.order_price)
+                self.orders[event.order_no] = order
+                self._orders_by_code.setdefault(event.code, set()).add(event.order_no)
+
+            if event.side and not order.side: order.side = event.side
+            if event.order_qty: order.order_qty = event.order_qty
+            order.status = event.status
+            order.unfilled_qty = event.unfilled_qty
+            order.updated_at = now
+
+            delta = event.qty - order.filled_qty
+            if delta > 0:
+                order.filled_qty = event.qty
+                self._apply_fill(event.code, order.side, delta, event.price, now)
+            elif delta < 0:
+                self._flag_mismatch(f"체결량 감소 {event.order_no}: {order.filled_qty} -> {event.qty}")
+
+            if order.order_qty:
+                done = order.filled_qty >= order.order_qty
+            else:
+                done = event.qty > 0 and event.unfilled_qty == 0
+            if done or event.status in _CLOSED_STATUS:
+                self._close_order(order)
+
+    def _apply_fill(self, code, side, qty, price, now):
+        self._fill_seq += 1
+        pos = self.positions.get(code)
+        if side == 'BUY':
+            if pos is None:
+                pos = self.positions[code] = Position(code)
+            total = pos.qty + qty
+            pos.avg_price = (pos.avg_price * pos.qty + price * qty) / total
+            pos.qty = total
+            if self.cash is not None: self.cash -= price * qty
+        elif side == 'SELL':
+            if pos is None or pos.qty < qty:
+                self._flag_mismatch(f"보유 수량보다 많은 매도 체결 {code}: 보유 {pos.qty if pos else 0}, 매도 {qty}")
+                if pos is None:
+                    return
+                qty = pos.qty
+            pos.realized_pnl += (price - pos.avg_price) * qty
+            pos.qty -= qty
+            if self.cash is not None: self.cash += price * qty
+            if pos.qty <= 0:
+                del self.positions[code]
+                return
+        else:
+            self._flag_mismatch(f"매수/매도 구분 없는 체결 {code}")
+            return
+        pos.last_price = price
+        pos.updated_at = now
+
+    def _close_order(self, order):
+        self.orders.pop(order.order_no, None)
+        codes = self._orders_by_code.get(order.code)
+        if codes is not None:
+            codes.discard(order.order_no)
+            if not codes: del self._orders_by_code[order.code]
+
+    def _flag_mismatch(self, reason):
+        self.mismatches += 1
+        print(f"⚠️ [PositionBook] 장부 불일치 감지 -> 잔고 대조 예약: {reason}")
+        if self._needs_reconcile is not None:
+            self._needs_reconcile.set()
+
+    async def consume(self, subscription):
+        """EventBus 구독을 끝까지 소비하며 장부 갱신"""
+        async for event in subscription:
+            self.apply(event)
+
+    # -----------------------------------------------------------
+    # 잔고 대조 (kt00018)
+    # -----------------------------------------------------------
+    def reconcile(self, account_manager, max_attempts=3):
+        """
+        증권사 잔고로 보유 종목을 덮어씁니다. (미체결 주문 장부는 유지)
+        조회(REST)하는 동안 체결이 반영되면 그 스냅샷은 이미 지난 상태일 수 있으므로 덮어쓰지 않고 다시 조회합니다.
+        (체결은 주문별 누적량으로 반영되어 다시 오지 않으므로, 덮어쓰면 그 체결이 장부에서 영영 사라짐)
+        :return: 달라진 종목 코드 목록, 조회 실패 또는 max_attempts번 모두 체결이 끼어들면 None
+        """
+        for attempt in range(max_attempts):
+            with self._lock:
+                seq = self._fill_seq
+            snap = account_manager.snapshot()  # 잔고 + 예수금 동시 조회
+            balance, deposit = snap.balance, snap.deposit
+            if balance is None:
+                return None
+            with self._lock:
+                if self._fill_seq == seq:
+                    return self._overwrite(balance, deposit)
+            self.reconcile_retries += 1
+
+        print(f"⚠️ [PositionBook] 잔고 대조 보류: 조회 중 체결이 계속 들어옴 ({max_attempts}회) -> 잠시 후 다시 대조")
+        self.reconcile_deferred = True
+        return None
+
+    def _overwrite(self, balance, deposit):
+        """(self._lock을 잡은 상태) 잔고 스냅샷으로 보유 종목/예수금 교체"""
+        broker = {h.code: h for h in balance.holdings if h.qty > 0}
+        changed = [code for code in set(broker) | set(self.positions)
+                   if self.position_qty(code) != (broker[code].qty if code in broker else 0)]
+
+        now = time.time()
+        positions = {}
+        for code, h in broker.items():
+            old = self.positions.get(code)
+            positions[code] = Position(code, h.qty, float(h.avg_price),
+                                       old.realized_pnl if old else 0.0, h.cur_price, now)
+        self.positions = positions
+        if deposit is not None:
+            self.cash = deposit.orderable
+
+        self.reconciles += 1
+        self.last_reconciled = now
+        self.reconcile_deferred = False
+        if changed:
+            print(f"🔄 [PositionBook] 잔고 대조: {len(changed)}종목 보정 {sorted(changed)}")
+        return changed
+
+    async def run_reconcile(self, account_manager, interval=300, retry_delay=1.0):
+        """interval초마다, 또는 불일치가 감지되면 즉시 대조 (REST 호출은 스레드에서, 보류되면 retry_delay초 뒤 재시도)"""
+        self._needs_reconcile = asyncio.Event()
+        while True:
+            await asyncio.to_thread(self.reconcile, account_manager)
+            self._needs_reconcile.clear()
+            try:
+                await asyncio.wait_for(self._needs_reconcile.wait(),
+                                       timeout=retry_delay if self.reconcile_deferred else interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        return {
+            'positions': len(self.positions),
+            'open_orders': len(self.orders),
+            'events_applied': self.events_applied,
+            'reconciles': self.reconciles,
+            'reconcile_retries': self.reconcile_retries,
+            'mismatches': self.mismatches,
+            'last_reconciled': self.last_reconciled
+        }
@@ -0,0 +1,235 @@
+"""
+[안전장치 저널]
+- 금일 매수 기록(중복 매수 방지용)을 추가 전용(append-only) 저널에 한 줄씩 남깁니다.
+    {"op": "buy", "date": "20250101", "code": "005930", "ts": ...}
+    {"op": "reset", "date": "20250102", "ts": ...}
+- 주문 경로는 큐에 넣기만 하고(O(1)), 백그라운드 스레드가 모아서 쓰고 fsync 한 번으로 확정 (group commit)
+    - 쓰기/fsync가 실패한 묶음은 확정으로 치지 않고 보관했다가 retry_interval초 뒤 다음 묶음과 함께 다시 씀
+      (기록은 재생해도 결과가 같으므로 일부만 써진 줄이 다시 써져도 안전)
+    - flush()는 확정되면 True, 그 기록을 포함한 쓰기가 실패했으면 (재시도와 별개로) 바로 False
+- compact_every건마다 현재 상태를 스냅샷(trading_history.json, 기존 형식)으로 원자적으로 교체하고 저널을 비움
+- 시작 시 load(): 스냅샷 + 저널을 재생해 금일 매수 종목 집합을 복원 (마지막 줄이 잘렸으면 무시)
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+
+
+class SafetyJournal:
+    def __init__(self, snapshot_path, journal_path=None, compact_every=1000, retry_interval=1.0):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + '.journal'
+        self.compact_every = compact_every
+        self.retry_interval = retry_interval
+
+        # 기록 스레드가 쓰는 상태 (저널에 쓴 내용과 항상 일치)
+        self._date = None
+        self._codes = set()
+        self._since_compact = 0
+        self._file = None
+
+        self._queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._enqueued = 0
+        self._durable = 0
+        self._failed_seq = 0   # 마지막으로 쓰기에 실패한 묶음의 마지막 번호 (확정되면 _durable이 따라잡음)
+        self._pending = []     # 쓰기에 실패해 다시 써야 하는 기록
+        self._thread = None
+        self._closed = False
+
+        self.fsyncs = 0
+        self.compactions = 0
+        self.errors = 0
+
+    # -----------------------------------------------------------
+    # 복원
+    # -----------------------------------------------------------
+    def load(self, today):
+        """스냅샷 + 저널 재생 -> 오늘 날짜의 매수 종목 집합 (다른 날짜면 빈 집합)"""
+        date, codes = None, set()
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                date, codes = data.get('date'), set(data.get('bought_codes', []))
+            except Exception as e:
+                print(f"⚠️ [Journal] 스냅샷 로드 실패 (저널만 재생): {e}")
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 중단되어 잘린 줄
+                    date, codes = self._apply(date, codes, rec)
+                    replayed += 1
+
+        with self._cond:
+            self._date, self._codes = date, set(codes)
+            self._since_compact = replayed
+        return set(codes) if date == today else set()
+
+    @staticmethod
+    def _apply(date, codes, rec):
+        rec_date = rec.get('date')
+        if rec.get('op') == 'reset':
+            return rec_date, set()
+        if rec.get('op') == 'buy':
+            if rec_date != date:
+                date, codes = rec_date, set()
+            codes.add(rec.get('code'))
+        return date, codes
+
+    # -----------------------------------------------------------
+    # 기록 (주문 경로: 큐에 넣기만 함)
+    # -----------------------------------------------------------
+    def record_buy(self, date, code):
+        return self._append({'op': 'buy', 'date': date, 'code': code, 'ts': time.time()})
+
+    def record_reset(self, date):
+        return self._append({'op': 'reset', 'date': date, 'ts': time.time()})
+
+    def _append(self, rec):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SafetyJournal is closed")
+            self._enqueued += 1
+            seq = self._enqueued
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="safety-journal", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        self._queue.put((seq, rec))
+        return seq
+
+    def flush(self, timeout=None):
+        """지금까지 넣은 기록이 디스크에 확정될 때까지 대기 -> 확정되면 True, 쓰기 실패/시간 초과면 False"""
+        with self._cond:
+            target = self._enqueued
+            self._cond.wait_for(lambda: self._durable >= target or self._failed_seq >= target, timeout)
+            return self._durable >= target
+
+    # -----------------------------------------------------------
+    # 기록 스레드
+    # -----------------------------------------------------------
+    def _writer(self):
+        while True:
+            try:
+                # 다시 써야 할 기록이 있으면 새 기록이 없어도 retry_interval마다 재시도
+                item = self._queue.get(timeout=self.retry_interval if self._pending else None)
+                batch = [item]
+            except queue.Empty:
+                batch = []
+            while True:  # 대기 중인 기록을 모두 모아 한 번에 fsync
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is None for entry in batch)
+            records = self._pending + [entry for entry in batch if entry is not None]
+            self._pending = []
+            if records and not self._write_batch(records):
+                self._pending = records
+                if stop:  # 종료 시 마지막으로 한 번 더 시도
+                    time.sleep(self.retry_interval)
+                    if not self._write_batch(records):
+                        print(f"❌ [Journal] 종료 전 {len(records)}건을 디스크에 확정하지 못했습니다.")
+            if stop:
+                return
+
+    def _write_batch(self, records):
+        """묶음을 쓰고 fsync -> 성공하면 True (실패하면 상태/확정 번호를 바꾸지 않음)"""
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            date, codes = self._date, set(self._codes)
+            lines = []
+            for _, rec in records:
+                date, codes = self._apply(date, codes, rec)
+                lines.append(json.dumps(rec, ensure_ascii=False))
+            # 직전 시도가 줄 중간에서 끊겼을 수 있으면 새 줄에서 시작 (빈 줄/잘린 줄은 load()가 건너뜀)
+            self._file.write(("\n" if self._failed_seq > self._durable else "") + "\n".join(lines) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ [Journal] 기록 실패 ({len(records)}건, {self.retry_interval}초 뒤 재시도): {e}")
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except Exception:
+                    pass
+                self._file = None  # 다음 시도는 파일을 다시 열어서
+            with self._cond:
+                self._failed_seq = max(self._failed_seq, records[-1][0])
+                self._cond.notify_all()
+            return False
+
+        self._date, self._codes = date, codes
+        self.fsyncs += 1
+        self._since_compact += len(records)
+        with self._cond:
+            self._durable = max(self._durable, records[-1][0])
+            self._cond.notify_all()
+        if self._since_compact >= self.compact_every:
+            try:
+                self.compact()
+            except Exception as e:
+                self.errors += 1  # 저널에는 이미 확정됨 -> 다음 압축에서 다시 시도
+                print(f"⚠️ [Journal] 압축 실패: {e}")
+        return True
+
+    # -----------------------------------------------------------
+    # 압축 (기록 스레드 또는 close()에서만 호출)
+    # -----------------------------------------------------------
+    def compact(self):
+        """현재 상태를 스냅샷으로 원자적 교체 후 저널을 비움 (중간에 죽어도 재생 결과는 같음)"""
+        _atomic_write(self.snapshot_path, json.dumps(
+            {'date': self._date, 'bought_codes': sorted(self._codes)}, ensure_ascii=False, indent=4))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        _atomic_write(self.journal_path, "")
+        self._since_compact = 0
+        self.compactions += 1
+
+    def close(self):
+        with self._cond:
+            if self._closed: return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self):
+        return {'enqueued': self._enqueued, 'durable': self._durable, 'pending_retry': len(self._pending),
+                'fsyncs': self.fsyncs, 'compactions': self.compactions, 'errors': self.errors}
+
+
+def _atomic_write(path, text):
+    """임시 파일에 쓰고 fsync 후 os.replace -> 읽는 쪽은 이전 내용 또는 새 내용만 봄"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    try:  # 디렉터리 항목까지 확정 (지원하지 않는 OS는 생략)
+        fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
@@ -0,0 +1,155 @@
+"""
+[전 종목 실시간 스캐너]
+- 2,000개 이상 종목의 상태를 종목 인덱스로 접근하는 연속된 NumPy 배열에 보관합니다.
+    today[col][k]    : 종목 k의 형성 중인 당일 봉 (시가/고가/저가/현재가/누적거래량, Time=마지막 체결시간 HHMMSS)
+    hist[col][k, :]  : 종목 k의 확정된 과거 봉 (오래된 순, 부족하면 앞쪽 NaN)
+- apply(ticks): TickEvent 묶음을 한 번에 반영하고, 이번 배치에서 틱이 온 종목만 전략 조건을 벡터 연산으로 평가
+  -> 신호가 바뀐 종목만 [(code, signal), ...]으로 반환
+- 전략 조건은 전략 모듈의 scan_condition(config)가 제공 (prepare: 하루 한 번 부분 집계, evaluate: 배치마다 O(배치 크기))
+- close_day(): 당일 봉을 과거 배열로 밀어 넣고 조건을 다시 준비 (틱이 없던 종목(거래정지 등)은 그대로)
+
+사용 예:
+    scanner = UniverseScanner(codes, Cases_v2)
+    scanner.load_history(frames)                            # {code: 과거 일봉 DataFrame}
+    asyncio.create_task(scanner.consume(feed.bus.subscribe('scanner', maxsize=100000)))
+    sub = scanner.bus.subscribe('ui')                       # (code, signal) 변경 알림
+"""
+import numpy as np
+
+from core.trader.events import EventBus, _num
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+class UniverseScanner:
+    def __init__(self, codes, strategy_module, config=None, bus=None, max_batch=5000):
+        if not hasattr(strategy_module, 'scan_condition'):
+            raise ValueError(f"{getattr(strategy_module, '__name__', strategy_module)}에 scan_condition()이 없습니다.")
+        self.codes = np.asarray(list(codes), dtype=object)
+        self.index = {code: k for k, code in enumerate(self.codes)}
+        self.condition = strategy_module.scan_condition(config)
+        self.lookback = max(1, self.condition.lookback)
+        self.bus = bus if bus is not None else EventBus()
+        self.max_batch = max_batch
+
+        n = len(self.codes)
+        self.hist = {col: np.full((n, self.lookback), np.nan) for col in COLUMNS}
+        self.count = np.zeros(n, dtype=np.int64)            # 확정된 봉 수 (= 당일 봉의 인덱스 i)
+        self.today = {col: np.zeros(n) for col in COLUMNS + ('Time',)}
+        self.touched = np.zeros(n, dtype=bool)              # 오늘 틱이 한 번이라도 온 종목
+        self.signal = np.zeros(n, dtype=np.int8)
+
+        self.batches = 0
+        self.ticks = 0
+        self.changes = 0
+        self.condition.prepare(self.hist, self.count)
+
+    # -----------------------------------------------------------
+    # 과거 봉
+    # -----------------------------------------------------------
+    def load_history(self, frames):
+        """{code: 날짜순 일봉 DataFrame} -> 마지막 lookback개 봉과 전체 봉 수를 배열에 채움"""
+        for code, df in frames.items():
+            k = self.index.get(code)
+            if k is None or df is None or len(df) == 0:
+                continue
+            tail = df.iloc[-self.lookback:]
+            m = len(tail)
+            for col in COLUMNS:
+                row = self.hist[col][k]
+                row[:] = np.nan
+                row[-m:] = tail[col].to_numpy(dtype=np.float64)
+            self.count[k] = len(df)
+        self.condition.prepare(self.hist, self.count)
+
+    # -----------------------------------------------------------
+    # 장중 배치
+    # -----------------------------------------------------------
+    def apply(self, ticks):
+        """TickEvent 묶음 반영 -> 신호가 바뀐 종목 [(code, signal), ...]"""
+        latest = {}
+        for event in ticks:
+            k = self.index.get(event.code)
+            if k is not None:
+                latest[k] = event  # 같은 배치 안에서는 마지막 틱이 당일 봉의 최신 상태
+        self.batches += 1
+        self.ticks += len(ticks)
+        if not latest:
+            return []
+
+        idx = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        events = list(latest.values())
+        bar = {
+            'Open': np.fromiter((e.open for e in events), dtype=np.float64, count=len(events)),
+            'High': np.fromiter((e.high for e in events), dtype=np.float64, count=len(events)),
+            'Low': np.fromiter((e.low for e in events), dtype=np.float64, count=len(events)),
+            'Close': np.fromiter((e.price for e in events), dtype=np.float64, count=len(events)),
+            'Volume': np.fromiter((e.volume for e in events), dtype=np.float64, count=len(events)),
+            'Time': np.fromiter((_num(e.time) for e in events), dtype=np.float64, count=len(events))
+        }
+        for col in self.today:
+            self.today[col][idx] = bar[col]
+        self.touched[idx] = True
+        return self._update_signals(idx, bar)
+
+    def _update_signals(self, idx, bar):
+        new = self.condition.evaluate(idx, bar)
+        moved = new != self.signal[idx]
+        if not moved.any():
+            return []
+        changed_idx = idx[moved]
+        self.signal[changed_idx] = new[moved]
+        self.changes += len(changed_idx)
+        return list(zip(self.codes[changed_idx].tolist(), new[moved].tolist()))
+
+    def evaluate_all(self):
+        """오늘 틱이 온 모든 종목을 다시 평가 (condition 교체 후 등)"""
+        idx = np.flatnonzero(self.touched)
+        if len(idx) == 0:
+            return []
+        return self._update_signals(idx, {col: values[idx] for col, values in self.today.items()})
+
+    def signals(self):
+        """현재 신호가 0이 아닌 종목 {code: signal}"""
+        hit = np.flatnonzero(self.signal)
+        return dict(zip(self.codes[hit].tolist(), self.signal[hit].tolist()))
+
+    # -----------------------------------------------------------
+    # 장 마감
+    # -----------------------------------------------------------
+    def close_day(self):
+        """당일 봉 확정 -> 확정 신호가 0이 아닌 종목 {code: signal} (다음 날을 위해 신호는 0으로 초기화)"""
+        rows = np.flatnonzero(self.touched)
+        self.today['Time'][rows] = 0  # 체결시간 없음 = 확정 봉으로 다시 평가
+        self.evaluate_all()
+        final = self.signals()
+        if len(rows):
+            for col in COLUMNS:
+                block = self.hist[col][rows]
+                block[:, :-1] = block[:, 1:]
+                block[:, -1] = self.today[col][rows]
+                self.hist[col][rows] = block
+            for values in self.today.values():
+                values[rows] = 0
+            self.count[rows] += 1
+        self.touched[:] = False
+        self.signal[:] = 0
+        self.condition.prepare(self.hist, self.count)
+        return final
+
+    # -----------------------------------------------------------
+    # 피드 연결
+    # -----------------------------------------------------------
+    async def consume(self, sub):
+        """MarketFeed 구독 큐에서 쌓인 틱을 한 번에(최대 max_batch) 꺼내 반영하고 변경을 bus로 발행"""
+        while True:
+            batch = [await sub.get()]
+            while len(batch) < self.max_batch and not sub.queue.empty():
+                batch.append(sub.queue.get_nowait())
+                sub.queue.task_done()
+            for change in self.apply(batch):
+                await self.bus.publish(change)
+
+    def stats(self):
+        return {'symbols': len(self.codes), 'batches': self.batches, 'ticks': self.ticks,
+                'changes': self.changes, 'active': int(self.signal.astype(bool).sum())}
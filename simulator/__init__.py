@@ -0,0 +1,4 @@
+# simulator/__init__.py
+
+# 키움 REST/WebSocket 로컬 시뮬레이터와 부하 드라이버 (aiohttp 필요)
+# 서버 실행: python -m simulator.server / 부하 측정: python -m simulator.load_driver
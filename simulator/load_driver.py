@@ -0,0 +1,259 @@
+"""
+[시뮬레이터 부하 드라이버]
+- simulator.server를 띄우고(또는 --url의 서버에 붙어) 실제 클래스로 부하를 겁니다.
+    1. 주문: KiwoomOrderManager.send_order (비동기 경로, 동시 전송 수 제한)
+    2. 조회: AccountManager.snapshot (잔고 + 예수금 동시 조회)
+    3. 체결: REAL 웹소켓 -> ExecutionFeed.handle_chejan -> EventBus 구독자
+- 초당 처리량과 p50/p99 지연시간을 출력하고 --out으로 JSON 저장
+
+사용 예:
+    python -m simulator.load_driver --orders 500 --concurrency 20 --latency-ms 20
+    python -m simulator.load_driver --rate-limit 20 --client-rate 19   # 서버 제한 아래로 스케줄링
+    python -m simulator.load_driver --trace                             # 구간별 지연 추적 저장 (Streamlit에서 확인)
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+root_path = os.path.dirname(SIM_DIR)
+if root_path not in sys.path:
+    sys.path.append(root_path)
+
+from config.config import TokenProvider, _parse_expiry
+from core.metrics import LatencyRecorder
+from core.tracing import tracer
+from core.request_scheduler import RequestScheduler
+from core.account_manager import AccountManager
+from core.trader.order_manager import KiwoomOrderManager
+from core.trader.execution_feed import ExecutionFeed
+from simulator.server import SimConfig, run_in_thread
+
+
+def sim_token_provider(base_url):
+    """시뮬레이터의 /oauth2/token에서 토큰을 받는 TokenProvider (파일 저장 없음)"""
+    def fetch():
+        res = requests.post(f"{base_url}/oauth2/token", json={'grant_type': 'client_credentials'}, timeout=5).json()
+        return res['token'], _parse_expiry(res.get('expires_dt'))
+    return TokenProvider('2', fetcher=fetch, persist=False)
+
+
+class SimRealFeed:
+    """
+    ExecutionFeed가 기대하는 웹소켓 매니저(register)의 최소 구현.
+    LOGIN -> REG 후 받은 REAL 패킷을 구독 큐로 넘깁니다.
+    """
+    def __init__(self, base_url, token):
+        self.ws_url = base_url.replace('http', 'ws', 1) + '/api/dostk/websocket'
+        self.token = token
+        self.queue = asyncio.Queue()
+        self.session = None
+        self.ws = None
+        self._reader = None
+
+    async def connect(self):
+        self.session = aiohttp.ClientSession()
+        self.ws = await self.session.ws_connect(self.ws_url)
+        await self.ws.send_json({'trnm': 'LOGIN', 'token': self.token})
+        await self.ws.receive_json()
+        await self.ws.send_json({'trnm': 'REG', 'grp_no': '1', 'refresh': '1', 'data': [{'item': [''], 'type': ['00']}]})
+        await self.ws.receive_json()
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        async for msg in self.ws:
+            if msg.type != aiohttp.WSMsgType.TEXT: continue
+            data = json.loads(msg.data)
+            if data.get('trnm') == 'REAL':
+                await self.queue.put(data)
+
+    async def register(self, trnms):
+        return self.queue
+
+    async def close(self):
+        if self._reader: self._reader.cancel()
+        if self.ws: await self.ws.close()
+        if self.session: await self.session.close()
+
+
+# -----------------------------------------------------------
+# 시나리오
+# -----------------------------------------------------------
+async def drive_orders(base_url, provider, orders, concurrency, client_rate, journal_dir):
+    """주문 부하 + 체결 피드 수신을 함께 측정"""
+    scheduler = RequestScheduler(default_limit=None, global_limit=(client_rate, 1) if client_rate else None)
+    # 저널을 생성자로 넘겨야 실제 매매 기록(core/trader/trading_history.*)을 한 번도 열지 않음
+    mgr = KiwoomOrderManager(mode='2', account_no='SIM-ACCOUNT', host=base_url, token_provider=provider,
+                             scheduler=scheduler, journal=os.path.join(journal_dir, 'trading_history.json'))
+    mgr.app_key, mgr.app_secret = 'sim-key', 'sim-secret'
+
+    feed_client = SimRealFeed(base_url, await provider.get_token_async())
+    await feed_client.connect()
+    feed = ExecutionFeed(feed_client, verbose=False)
+    sub = feed.bus.subscribe('driver', maxsize=orders * 4 + 10)
+    feed_task = asyncio.create_task(feed.run())
+
+    sent_at, filled_at = {}, {}
+    all_filled = asyncio.Event()
+
+    async def one(k):
+        code = f"{k:06d}"
+        if tracer.enabled: tracer.signal(code)
+        async with sem:
+            result = await mgr.send_order('SELL', code, 1)
+            if result:
+                sent_at[result['ord_no']] = time.perf_counter()
+            return result
+
+    async def collect():
+        # 주문 전송과 동시에 소비해야 체결 통보 지연이 큐 대기 시간에 묻히지 않음
+        while True:
+            event = await sub.get()
+            if event.is_fill and event.order_no not in filled_at:
+                filled_at[event.order_no] = time.perf_counter()
+                if done_sending and len(filled_at) >= expected_fills:
+                    all_filled.set()
+
+    done_sending, expected_fills = False, 0
+    collector = asyncio.create_task(collect())
+    sem = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(k) for k in range(orders)))
+    elapsed = time.perf_counter() - start
+    expected_fills, done_sending = sum(1 for r in results if r), True
+    if len(filled_at) < expected_fills:
+        try:
+            await asyncio.wait_for(all_filled.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            pass
+    collector.cancel()
+
+    fill_latency = LatencyRecorder()
+    for ord_no, t_sent in sent_at.items():
+        if ord_no in filled_at:
+            fill_latency.record(max(0.0, filled_at[ord_no] - t_sent))
+
+    feed_task.cancel()
+    await feed_client.close()
+    await mgr.close()
+    return {
+        'orders': orders,
+        'accepted': expected_fills,
+        'elapsed_s': round(elapsed, 3),
+        'orders_per_s': round(orders / elapsed, 1),
+        'ack_latency': mgr.latency_report(),
+        'fill_latency': fill_latency.summary(),
+        'feed': feed.stats()['subscribers']['driver'],
+        'scheduler': scheduler.stats()
+    }
+
+def drive_account(base_url, provider, queries, concurrency, client_rate=None):
+    """AccountManager.snapshot() 동시 호출 부하 (워커 스레드마다 자기 AccountManager/연결 풀 사용)"""
+    scheduler = RequestScheduler(default_limit=None, global_limit=(client_rate, 1) if client_rate else None)
+    managers = []
+    local = threading.local()
+    latency = LatencyRecorder()
+    ok = [0]
+    lock = threading.Lock()
+
+    def one(_):
+        mgr = getattr(local, 'mgr', None)
+        if mgr is None:
+            mgr = local.mgr = AccountManager(token=None, account_num='SIM-ACCOUNT', base_url=base_url,
+                                             token_provider=provider, scheduler=scheduler)
+            with lock: managers.append(mgr)
+        with latency.time():
+            snap = mgr.snapshot()
+        if snap.balance is not None and snap.deposit is not None:
+            with lock: ok[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(queries)))
+    elapsed = time.perf_counter() - start
+    for mgr in managers: mgr.close()
+    return {
+        'snapshots': queries,
+        'ok': ok[0],
+        'elapsed_s': round(elapsed, 3),
+        'snapshots_per_s': round(queries / elapsed, 1),
+        'latency': latency.summary()
+    }
+
+
+def _print(name, report, latency_key):
+    lat = report[latency_key]
+    rate_key = 'orders_per_s' if 'orders_per_s' in report else 'snapshots_per_s'
+    print(f"[{name}] {report[rate_key]}/초 | p50 {lat['p50_ms']}ms p99 {lat['p99_ms']}ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="키움 시뮬레이터 부하 드라이버")
+    parser.add_argument('--url', default=None, help="이미 떠 있는 시뮬레이터 주소 (없으면 내부에서 실행)")
+    parser.add_argument('--orders', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--client-rate', type=float, default=None, help="클라이언트 스케줄러 초당 한도")
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--reject-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help="시뮬레이터 초당 허용 호출 수")
+    parser.add_argument('--fill-delay-ms', type=float, default=50.0)
+    parser.add_argument('--out', default=None, help="결과 JSON 경로")
+    parser.add_argument('--trace', nargs='?', const='', default=None,
+                        help="주문 지연 추적을 켜고 결과 저장 (경로 생략 시 기본 위치)")
+    args = parser.parse_args(argv)
+    if args.trace is not None:
+        tracer.reset()
+        tracer.enable()
+
+    config = SimConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.reject_rate,
+                       args.rate_limit, args.fill_delay_ms)
+
+    def run(base_url, sim=None):
+        provider = sim_token_provider(base_url)
+        with tempfile.TemporaryDirectory() as journal_dir:
+            orders = asyncio.run(drive_orders(base_url, provider, args.orders, args.concurrency,
+                                              args.client_rate, journal_dir))
+        _print('order', orders, 'ack_latency')
+        print(f"[fill ] 주문 -> 체결 통보 p50 {orders['fill_latency']['p50_ms']}ms p99 {orders['fill_latency']['p99_ms']}ms "
+              f"| 수신 {orders['feed']['delivered']} 손실 {orders['feed']['dropped']}")
+        if args.rate_limit:
+            time.sleep(1.0)  # 서버 측 1초 창 초기화
+        account = drive_account(base_url, provider, args.queries, args.concurrency, args.client_rate)
+        _print('acnt ', account, 'latency')
+        provider.stop()
+        return {'config': vars(config), 'orders': orders, 'account': account,
+                'server': dict(sim.counters) if sim else None}
+
+    if args.url:
+        report = run(args.url.rstrip('/'))
+    else:
+        with run_in_thread(config) as (base_url, sim):
+            report = run(base_url, sim)
+        print(f"[sim  ] {report['server']}")
+
+    if args.trace is not None:
+        path = tracer.dump(args.trace or None)
+        for name, stage in tracer.summary().items():
+            print(f"[trace] {name:<16} n={stage['count']:<5} p50 {stage['p50_ms']}ms p99 {stage['p99_ms']}ms")
+        print(f"✅ 추적 저장: {path}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ 결과 저장: {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+[키움 REST/WebSocket 로컬 시뮬레이터]
+- 부하 테스트용 가짜 서버입니다. (aiohttp 필요)
+    POST /oauth2/token              토큰 발급
+    POST /api/dostk/ordr            kt10000(매수) / kt10001(매도)
+    POST /api/dostk/acnt            kt00018(잔고) / kt00001(예수금)
+    POST /api/dostk/chart           ka10081(일봉) / ka10080(분봉), 최신순 + cont-yn/next-key 연속 조회
+    GET  /api/dostk/websocket       LOGIN / REG / PING, 주문이 체결되면 REAL(주문체결) 전송
+- 응답 지연, 오류율, 거부율, 초당 호출 제한(초과 시 429), 체결 지연/분할 체결을 설정할 수 있습니다.
+
+사용 예:
+    python -m simulator.server --port 8089 --latency-ms 20 --error-rate 0.01 --rate-limit 20
+"""
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+import functools
+import threading
+import contextlib
+from collections import deque
+from datetime import datetime, timedelta
+
+from aiohttp import web, WSMsgType
+
+
+class SimConfig:
+    def __init__(self, latency_ms=20.0, jitter_ms=5.0, error_rate=0.0, reject_rate=0.0, rate_limit=None,
+                 fill_delay_ms=50.0, fill_chunks=1, initial_cash=100_000_000, seed=0,
+                 chart_end=None, chart_days=2500, minute_days=5, page_size=600):
+        self.latency_ms = latency_ms        # 응답 지연 평균
+        self.jitter_ms = jitter_ms          # 응답 지연 표준편차
+        self.error_rate = error_rate        # HTTP 500 비율
+        self.reject_rate = reject_rate      # 주문 거부(rt_cd '1') 비율
+        self.rate_limit = rate_limit        # 초당 허용 REST 호출 수 (None이면 무제한)
+        self.fill_delay_ms = fill_delay_ms  # 접수 후 체결 통보까지 지연
+        self.fill_chunks = fill_chunks      # 분할 체결 횟수
+        self.initial_cash = initial_cash
+        self.seed = seed
+        self.chart_end = chart_end          # 차트 마지막 날짜 ('YYYY-MM-DD', None이면 오늘)
+        self.chart_days = chart_days        # 종목별 일봉 개수
+        self.minute_days = minute_days      # 분봉을 제공하는 최근 영업일 수
+        self.page_size = page_size          # 차트 조회 1회 응답 행 수
+
+
+# 차트는 항상 이 구간 전체를 같은 난수로 만든 뒤 chart_end까지 잘라서 씀
+# (생성 길이가 chart_end에 따라 바뀌면 난수 순서가 달라져 과거 봉까지 바뀜)
+CHART_START = '2010-01-04'
+CHART_LAST = '2035-12-31'
+
+
+@functools.lru_cache(maxsize=4)
+def _chart_length(end):
+    """CHART_START부터 end까지 영업일 수"""
+    import pandas as pd
+    return len(pd.bdate_range(CHART_START, end))
+
+
+def _price_of(code):
+    """종목 코드별로 항상 같은 가상 현재가"""
+    return 1000 + zlib.crc32(code.encode('utf-8')) % 300 * 500
+
+
+class KiwoomSimulator:
+    def __init__(self, config=None):
+        self.config = config or SimConfig()
+        self.rng = random.Random(self.config.seed)
+        self.tokens = set()
+        self.cash = self.config.initial_cash
+        self.holdings = {}          # code -> [qty, avg_price]
+        self.order_seq = 0
+        self.clients = set()        # REAL 구독 중인 웹소켓
+        self._recent = deque()
+        self._charts = {}           # (api_id, code) -> 최신순 차트 행
+        self.counters = {'requests': 0, 'throttled': 0, 'errors': 0, 'orders': 0, 'rejected': 0, 'fills': 0,
+                         'ws_sent': 0, 'chart_pages': 0}
+
+    # -----------------------------------------------------------
+    # 공통: 제한 / 지연 / 오류
+    # -----------------------------------------------------------
+    def _throttled(self):
+        limit = self.config.rate_limit
+        if not limit: return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= limit:
+            return True
+        self._recent.append(now)
+        return False
+
+    async def _latency(self):
+        cfg = self.config
+        delay = max(0.0, self.rng.gauss(cfg.latency_ms, cfg.jitter_ms)) / 1000.0
+        if delay: await asyncio.sleep(delay)
+
+    async def _gate(self, request):
+        """호출 제한/인증/오류 주입. 통과하면 None, 아니면 돌려줄 응답"""
+        self.counters['requests'] += 1
+        if self._throttled():
+            self.counters['throttled'] += 1
+            return web.json_response({'return_code': 5, 'return_msg': '허용된 요청 개수를 초과하였습니다'}, status=429)
+        await self._latency()
+        if self.rng.random() < self.config.error_rate:
+            self.counters['errors'] += 1
+            return web.json_response({'return_code': 99, 'return_msg': '시뮬레이터 오류 주입'}, status=500)
+        auth = request.headers.get('authorization', '')
+        if not auth.startswith('Bearer ') or auth[7:] not in self.tokens:
+            return web.json_response({'return_code': 3, 'return_msg': '인증 실패'}, status=401)
+        return None
+
+    # -----------------------------------------------------------
+    # REST
+    # -----------------------------------------------------------
+    async def token(self, request):
+        await self._latency()
+        token = f"sim-{self.rng.getrandbits(64):016x}"
+        self.tokens.add(token)
+        expires = datetime.now() + timedelta(days=1)
+        return web.json_response({'return_code': 0, 'return_msg': '정상', 'token_type': 'bearer',
+                                  'token': token, 'expires_dt': expires.strftime("%Y%m%d%H%M%S")})
+
+    async def order(self, request):
+        blocked = await self._gate(request)
+        if blocked is not None: return blocked
+
+        api_id = request.headers.get('api-id')
+        body = await request.json()
+        if api_id not in ('kt10000', 'kt10001'):
+            return web.json_response({'rt_cd': '1', 'msg1': f'지원하지 않는 api-id: {api_id}'})
+        if self.rng.random() < self.config.reject_rate:
+            self.counters['rejected'] += 1
+            return web.json_response({'rt_cd': '1', 'msg1': '주문 거부 (시뮬레이터)'})
+
+        self.order_seq += 1
+        self.counters['orders'] += 1
+        ord_no = f"{self.order_seq:07d}"
+        code = str(body.get('stk_cd', ''))
+        qty = int(body.get('ord_qty') or 0)
+        price = int(float(body.get('ord_uv') or 0)) or _price_of(code)
+        side = 'BUY' if api_id == 'kt10000' else 'SELL'
+        asyncio.get_running_loop().create_task(self._execute(ord_no, code, side, qty, price))
+        return web.json_response({'rt_cd': '0', 'return_code': 0, 'ord_no': ord_no, 'msg1': '정상적으로 처리되었습니다'})
+
+    async def account(self, request):
+        blocked = await self._gate(request)
+        if blocked is not None: return blocked
+
+        api_id = request.headers.get('api-id')
+        if api_id == 'kt00018':
+            rows, total_pur, total_eval = [], 0, 0
+            for code, (qty, avg) in sorted(self.holdings.items()):
+                if qty <= 0: continue
+                cur = _price_of(code)
+                total_pur += int(qty * avg)
+                total_eval += qty * cur
+                rows.append({'stk_cd': f"A{code}", 'stk_nm': f"SIM{code}", 'rmnd_qty': f"{qty:012d}",
+                             'pur_pric': f"{int(avg):012d}", 'cur_prc': f"{cur:012d}"})
+            pl = total_eval - total_pur
+            rate = (pl / total_pur * 100) if total_pur else 0.0
+            return web.json_response({
+                'tot_pur_amt': f"{total_pur:015d}", 'tot_evlt_amt': f"{total_eval:015d}",
+                'tot_evlt_pl': f"{pl:015d}", 'tot_prft_rt': f"{rate:.2f}",
+                'prsm_dpst_aset_amt': f"{self.cash + total_eval:015d}",
+                'acnt_evlt_remn_indv_tot': rows, 'return_code': 0
+            })
+        if api_id == 'kt00001':
+            cash = f"{max(0, self.cash):015d}"
+            return web.json_response({'entr': cash, 'pymn_alow_amt': cash, 'ord_alow_amt': cash,
+                                      'd2_entra': cash, 'return_code': 0})
+        return web.json_response({'return_code': 1, 'return_msg': f'지원하지 않는 api-id: {api_id}'})
+
+    async def chart(self, request):
+        blocked = await self._gate(request)
+        if blocked is not None: return blocked
+
+        api_id = request.headers.get('api-id')
+        body = await request.json()
+        code = str(body.get('stk_cd', ''))
+        if api_id == 'ka10081':
+            key = 'stk_dt_pole_chart_qry'
+        elif api_id == 'ka10080':
+            key = 'stk_min_pole_chart_qry'
+        else:
+            return web.json_response({'return_code': 1, 'return_msg': f'지원하지 않는 api-id: {api_id}'})
+
+        rows = self._chart_rows(api_id, code)
+        if api_id == 'ka10081' and body.get('base_dt'):
+            base = str(body['base_dt'])
+            rows = [row for row in rows if row['dt'] <= base]
+        start = int(request.headers.get('next-key') or 0) if request.headers.get('cont-yn') == 'Y' else 0
+        page = rows[start:start + self.config.page_size]
+        more = start + len(page) < len(rows)
+        self.counters['chart_pages'] += 1
+        headers = {'api-id': api_id, 'cont-yn': 'Y' if more else 'N', 'next-key': str(start + len(page)) if more else ''}
+        return web.json_response({'stk_cd': code, key: page, 'return_code': 0, 'return_msg': '정상'}, headers=headers)
+
+    def _chart_rows(self, api_id, code):
+        """종목별 가상 차트 (benchmarks.synthetic과 같은 생성기, 최신순, 키움 응답 형식)"""
+        cached = self._charts.get((api_id, code))
+        if cached is not None: return cached
+
+        import numpy as np
+        import pandas as pd
+        from benchmarks.synthetic import generate_ohlcv
+
+        cfg = self.config
+        # 생성 구간(CHART_START ~ CHART_LAST)을 고정해 두어야 chart_end만 바꿔도 과거 봉이 그대로 (증분 다운로드 확인용)
+        end = cfg.chart_end or datetime.now().strftime('%Y-%m-%d')
+        daily = generate_ohlcv(code, _chart_length(CHART_LAST), seed=cfg.seed, start=CHART_START)
+        daily = daily[daily['Date'] <= end].tail(cfg.chart_days)
+        sign = lambda v: f"+{v}" if v >= 0 else str(v)  # 실제 응답처럼 부호가 붙은 문자열
+
+        if api_id == 'ka10081':
+            rows = [{'dt': d.replace('-', ''), 'open_pric': sign(o), 'high_pric': sign(h), 'low_pric': sign(l),
+                     'cur_prc': sign(c), 'trde_qty': str(v)}
+                    for d, o, h, l, c, v in daily[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].itertuples(index=False)]
+        else:
+            rows = []
+            for d, close in daily[['Date', 'Close']].tail(cfg.minute_days).itertuples(index=False):
+                # 날짜별 시드 -> 같은 날의 분봉은 chart_end와 관계없이 항상 같음
+                rng = np.random.default_rng(zlib.crc32(f"min:{code}:{d}:{cfg.seed}".encode('utf-8')))
+                stamps = pd.date_range(f"{d} 09:00", f"{d} 15:19", freq='min').strftime('%Y%m%d%H%M%S')
+                path = close * np.exp(np.cumsum(rng.normal(0, 0.001, len(stamps))))
+                close_ = np.round(path).astype(np.int64)
+                open_ = np.concatenate(([close_[0]], close_[:-1]))
+                high, low = np.maximum(open_, close_), np.minimum(open_, close_)
+                volume = rng.integers(100, 10000, len(stamps))
+                rows.extend({'cntr_tm': t, 'open_pric': sign(o), 'high_pric': sign(h), 'low_pric': sign(l),
+                             'cur_prc': sign(c), 'trde_qty': str(v)}
+                            for t, o, h, l, c, v in zip(stamps, open_.tolist(), high.tolist(), low.tolist(),
+                                                        close_.tolist(), volume.tolist()))
+        rows.reverse()  # 키움 차트 조회는 최신 봉부터 돌려줌
+        self._charts[(api_id, code)] = rows
+        return rows
+
+    # -----------------------------------------------------------
+    # 체결 + REAL 전송
+    # -----------------------------------------------------------
+    async def _execute(self, ord_no, code, side, qty, price):
+        await self._broadcast(self._fill_values(ord_no, code, side, '접수', qty, price, 0, 0))
+        chunks = max(1, min(self.config.fill_chunks, qty or 1))
+        filled = 0
+        for k in range(chunks):
+            await asyncio.sleep(self.config.fill_delay_ms / 1000.0 / chunks)
+            step = qty // chunks + (1 if k < qty % chunks else 0)
+            if step <= 0: continue
+            filled += step
+            self._book(code, side, step, price)
+            self.counters['fills'] += 1
+            await self._broadcast(self._fill_values(ord_no, code, side, '체결', qty, price, filled, qty - filled))
+
+    def _book(self, code, side, qty, price):
+        held, avg = self.holdings.get(code, [0, 0.0])
+        if side == 'BUY':
+            self.holdings[code] = [held + qty, (held * avg + qty * price) / (held + qty)]
+            self.cash -= qty * price
+        else:
+            self.holdings[code] = [held - qty, avg]
+            self.cash += qty * price
+
+    @staticmethod
+    def _fill_values(ord_no, code, side, status, order_qty, price, filled, unfilled):
+        return {
+            '9201': 'SIM-ACCOUNT', '9203': ord_no, '9001': f"A{code}", '302': f"SIM{code}",
+            '913': status, '900': str(order_qty), '901': str(price), '902': str(unfilled),
+            '905': '+매수' if side == 'BUY' else '-매도', '907': '2' if side == 'BUY' else '1',
+            '908': datetime.now().strftime("%H%M%S"),
+            '910': str(price) if filled else '', '911': str(filled) if filled else ''
+        }
+
+    async def _broadcast(self, values):
+        if not self.clients: return
+        message = json.dumps({'trnm': 'REAL', 'data': [{'type': '00', 'name': '주문체결', 'item': '', 'values': values}]},
+                             ensure_ascii=False)
+        for ws in tuple(self.clients):
+            try:
+                await ws.send_str(message)
+                self.counters['ws_sent'] += 1
+            except (ConnectionError, RuntimeError):
+                self.clients.discard(ws)
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT: continue
+                data = json.loads(msg.data)
+                trnm = data.get('trnm')
+                if trnm == 'LOGIN':
+                    ok = data.get('token') in self.tokens
+                    await ws.send_json({'trnm': 'LOGIN', 'return_code': 0 if ok else 3,
+                                        'return_msg': '정상' if ok else '인증 실패'})
+                    if not ok: break
+                elif trnm == 'REG':
+                    self.clients.add(ws)
+                    await ws.send_json({'trnm': 'REG', 'return_code': 0, 'return_msg': ''})
+                elif trnm == 'REMOVE':
+                    self.clients.discard(ws)
+                    await ws.send_json({'trnm': 'REMOVE', 'return_code': 0, 'return_msg': ''})
+                elif trnm == 'PING':
+                    await ws.send_json(data)
+        finally:
+            self.clients.discard(ws)
+        return ws
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_post('/api/dostk/ordr', self.order)
+        app.router.add_post('/api/dostk/acnt', self.account)
+        app.router.add_post('/api/dostk/chart', self.chart)
+        app.router.add_get('/api/dostk/websocket', self.websocket)
+        return app
+
+
+@contextlib.contextmanager
+def run_in_thread(config=None, host='127.0.0.1', port=0):
+    """
+    시뮬레이터를 백그라운드 스레드의 이벤트 루프에서 실행
+    :return: (base_url, KiwoomSimulator)
+    """
+    sim = KiwoomSimulator(config)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    async def start():
+        runner = web.AppRunner(sim.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port, backlog=1024)
+        await site.start()
+        state['runner'] = runner
+        state['port'] = runner.addresses[0][1]
+        ready.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()),
+                              name="kiwoom-sim", daemon=True)
+    thread.start()
+    ready.wait(10)
+    try:
+        yield f"http://{host}:{state['port']}", sim
+    finally:
+        asyncio.run_coroutine_threadsafe(state['runner'].cleanup(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        loop.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="키움 REST/WebSocket 로컬 시뮬레이터")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--reject-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help="초당 허용 REST 호출 수")
+    parser.add_argument('--fill-delay-ms', type=float, default=50.0)
+    parser.add_argument('--fill-chunks', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = SimConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.reject_rate, args.rate_limit,
+                       args.fill_delay_ms, args.fill_chunks, seed=args.seed)
+    print(f"🧪 키움 시뮬레이터: http://{args.host}:{args.port}  (ws: /api/dostk/websocket)")
+    web.run_app(KiwoomSimulator(config).app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()